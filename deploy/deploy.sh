@@ -221,6 +221,12 @@ run_django_commands() {
     # Run migrations
     python manage.py migrate
     
+    # Drop cached pages rendered by the previous release
+    python manage.py clear_page_cache
+    
+    # Regenerate the cached XML sitemaps
+    python manage.py build_sitemaps
+    
     # Create superuser (only if it doesn't exist)
     echo "Creating superuser (if needed)..."
     python manage.py shell -c "
@@ -242,6 +248,7 @@ setup_systemd_services() {
     
     # Copy service files
     sudo cp deployment/systemd/onehux-web.service /etc/systemd/system/
+    sudo cp deployment/systemd/onehux-web-asgi.service /etc/systemd/system/
     sudo cp deployment/systemd/onehux-web.socket /etc/systemd/system/
     sudo cp deployment/systemd/onehux-celery.service /etc/systemd/system/
     sudo cp deployment/systemd/onehux-celery-beat.service /etc/systemd/system/
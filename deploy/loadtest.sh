@@ -0,0 +1,84 @@
+#!/bin/bash
+
+# loadtest.sh
+# Throughput / tail-latency comparison of the WSGI (gevent) and ASGI (uvicorn)
+# deployments: the gevent service serves the sync views, the ASGI service the
+# async ones (ASGI_DEPLOYMENT, pages.async_helpers.for_deployment)
+#
+# Usage:
+#   ./loadtest.sh LABEL [BASE_URL]
+#
+#   1. Run with onehux-web.service active:       ./loadtest.sh wsgi-gevent
+#   2. Switch to onehux-web-asgi.service, rerun: ./loadtest.sh asgi-uvicorn
+#   3. Compare the two result files in loadtest-results/
+#
+# Environment:
+#   SESSION_ID   sessionid cookie of a test account (dashboard, my-quotes, quote detail)
+#   QUOTE_ID     UUID of a quote owned by that account (quote detail)
+#   CSRF_TOKEN   csrftoken cookie value (newsletter subscribe POST)
+#   RATELIMIT_EXEMPT  set to 1 once this machine's IP is in the target's
+#                RATELIMIT_EXEMPT_IPS; the newsletter POST is rate limited
+#                (3/h per email, 10/h per IP) and is skipped otherwise, since
+#                it would only measure 429 responses
+#   DURATION     seconds per endpoint (default 30)
+#   CONCURRENCY  concurrent connections (default 50)
+#
+# Requires `hey` (https://github.com/rakyll/hey). Run it from a separate
+# machine against a staging copy; each endpoint is measured with the page
+# cache warm, since that is how production traffic sees them. The
+# error_responses column counts 4xx/5xx replies; a run with errors does not
+# measure the view.
+#
+# Author: Isaac
+
+set -e
+
+LABEL="${1:?Usage: $0 LABEL [BASE_URL]}"
+BASE_URL="${2:-http://127.0.0.1}"
+DURATION="${DURATION:-30}"
+CONCURRENCY="${CONCURRENCY:-50}"
+OUT_DIR="loadtest-results"
+OUT_FILE="$OUT_DIR/$LABEL-$(date +%Y%m%d-%H%M%S).tsv"
+
+command -v hey >/dev/null || { echo "hey is not installed" >&2; exit 1; }
+mkdir -p "$OUT_DIR"
+
+# Run one endpoint and append "label  name  requests/sec  p99 (s)  errors"
+run() {
+    local name="$1"; shift
+    local report
+    report=$(hey -z "${DURATION}s" -c "$CONCURRENCY" "$@")
+    local rps p99 errors
+    rps=$(echo "$report" | awk '/Requests\/sec:/ {print $2}')
+    p99=$(echo "$report" | awk '/ 99% in / {print $3}')
+    errors=$(echo "$report" | awk '/^ *\[[0-9]+\]/ {code = substr($1, 2, 3); if (code >= 400) n += $2} END {print n + 0}')
+    printf '%s\t%s\t%s\t%s\t%s\n' "$LABEL" "$name" "$rps" "$p99" "$errors" | tee -a "$OUT_FILE"
+    if [[ "$errors" -gt 0 ]]; then
+        echo "warning: $name returned $errors error responses" >&2
+    fi
+}
+
+printf 'mode\tendpoint\trequests_per_sec\tp99_seconds\terror_responses\n' | tee "$OUT_FILE"
+
+run home "$BASE_URL/"
+run estimate_cost "$BASE_URL/api/estimate-cost/?type=business&features[]=cms&features[]=seo"
+
+if [[ -n "$CSRF_TOKEN" && "$RATELIMIT_EXEMPT" == "1" ]]; then
+    run newsletter_subscribe -m POST \
+        -H "Cookie: csrftoken=$CSRF_TOKEN" -H "X-CSRFToken: $CSRF_TOKEN" \
+        -H "Referer: $BASE_URL/" -T "application/json" \
+        -d '{"email": "loadtest@example.com", "name": "Load Test"}' \
+        "$BASE_URL/api/newsletter/subscribe/"
+elif [[ -n "$CSRF_TOKEN" ]]; then
+    echo "Skipping newsletter_subscribe: set RATELIMIT_EXEMPT=1 after exempting this host" >&2
+fi
+
+if [[ -n "$SESSION_ID" ]]; then
+    run dashboard -H "Cookie: sessionid=$SESSION_ID" "$BASE_URL/dashboard/"
+    run my_quotes -H "Cookie: sessionid=$SESSION_ID" "$BASE_URL/my-quotes/"
+    if [[ -n "$QUOTE_ID" ]]; then
+        run quote_detail -H "Cookie: sessionid=$SESSION_ID" "$BASE_URL/quote/$QUOTE_ID/"
+    fi
+fi
+
+echo "Results written to $OUT_FILE"
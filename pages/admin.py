@@ -1,3 +1,21 @@
+# pages/admin.py
+"""
+Django admin configuration for pages app
+========================================
+Admin for the sitemap URL registry (manual entries and signal-maintained ones).
+
+Author: Isaac
+"""
+
 from django.contrib import admin
 
-# Register your models here.
+from .models import SitemapEntry
+
+
+@admin.register(SitemapEntry)
+class SitemapEntryAdmin(admin.ModelAdmin):
+    list_display = ('url', 'lastmod', 'priority', 'changefreq', 'content_type')
+    list_filter = ('changefreq', 'content_type')
+    search_fields = ('url',)
+    ordering = ('-lastmod',)
+    readonly_fields = ('content_type', 'object_id')
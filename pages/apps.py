@@ -1,6 +1,19 @@
+# pages/apps.py
+"""
+Pages app configuration
+=======================
+Django app configuration for the pages application.
+
+Author: Isaac
+"""
+
 from django.apps import AppConfig
 
 
 class PagesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'pages'
+    
+    def ready(self):
+        """Register the sitemap registry signals"""
+        from . import signals
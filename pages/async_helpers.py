@@ -0,0 +1,45 @@
+# pages/async_helpers.py
+"""
+Helpers for async (ASGI-native) views
+=====================================
+Async views must not touch the ORM from the event loop, and the lazy
+`request.user` does exactly that the first time a context processor or
+template reads it. aget_user() resolves the user with request.auser() and
+pins it on request.user, so rendering afterwards needs no query.
+
+Usage:
+    @login_required
+    async def adashboard(request):
+        ...
+        return await arender(request, 'users/dashboard.html', context)
+
+    path('dashboard/', for_deployment(views.dashboard, views.adashboard), ...)
+
+Async views only pay off under ASGI: the default gevent WSGI service would
+run each of them through async_to_sync. for_deployment() routes to the
+async view only when settings.ASGI_DEPLOYMENT is set
+(deploy/onehux-web-asgi.service) and to the sync view otherwise.
+
+Author: Isaac
+"""
+
+from django.conf import settings
+from django.shortcuts import render
+
+
+async def aget_user(request):
+    """Resolve the current user without blocking the event loop"""
+    user = await request.auser()
+    request.user = user
+    return user
+
+
+async def arender(request, template_name, context=None, **kwargs):
+    """render() for async views: the user is resolved before the template runs"""
+    await aget_user(request)
+    return render(request, template_name, context, **kwargs)
+
+
+def for_deployment(sync_view, async_view):
+    """`async_view` under the ASGI deployment, `sync_view` under WSGI"""
+    return async_view if getattr(settings, 'ASGI_DEPLOYMENT', False) else sync_view
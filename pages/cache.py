@@ -0,0 +1,347 @@
+# pages/cache.py
+"""
+Full-page cache for anonymous visitors
+======================================
+Serves anonymous GET/HEAD requests for static pages straight from the
+default (Redis) cache. Authenticated users, POSTs and requests carrying
+flash messages always bypass the cache.
+
+Query strings are normalised before keying: tracking parameters (utm_*,
+fbclid, ...) are dropped, parameters listed in PAGE_CACHE_QUERY_PARAMS are
+kept in sorted order, and any other parameter bypasses the cache, so random
+query strings cannot fill it.
+
+CSRF tokens are never shared between visitors: the token is swapped for a
+placeholder before storing and a fresh token for the current visitor is
+substituted when serving a hit.
+
+Invalidation:
+    - PAGE_CACHE_VERSION (release/content version) is part of every key
+    - invalidate_page_cache() bumps a generation stamp (run on deploy via
+      `python manage.py clear_page_cache`)
+
+cache_policy() adds Cache-Control and a body-derived ETag on top, so
+browsers can revalidate with 304s instead of downloading the page again.
+
+Author: Isaac
+"""
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.utils import translation
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import quote_etag
+from functools import wraps
+from urllib.parse import urlencode
+import hashlib
+import logging
+import re
+import time
+
+from .async_helpers import aget_user
+
+logger = logging.getLogger(__name__)
+
+PAGE_CACHE_GENERATION_KEY = 'page_cache_generation'
+CSRF_PLACEHOLDER = '__onehux_csrf_token__'
+
+# Matches the hidden input rendered by {% csrf_token %}
+_CSRF_INPUT_RE = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+# Response headers that are safe to replay from the cache
+_REPLAYED_HEADERS = ('Content-Type', 'Content-Language', 'Vary', 'X-Frame-Options')
+
+
+def get_page_cache_generation():
+    """Return the current generation stamp (unix time of the last invalidation)"""
+    generation = cache.get(PAGE_CACHE_GENERATION_KEY)
+    if generation is None:
+        generation = int(time.time())
+        cache.add(PAGE_CACHE_GENERATION_KEY, generation, None)
+    return generation
+
+
+def invalidate_page_cache():
+    """Invalidate every cached page by bumping the generation stamp"""
+    generation = int(time.time())
+    cache.set(PAGE_CACHE_GENERATION_KEY, generation, None)
+    logger.info(f"Page cache invalidated (generation {generation})")
+    return generation
+
+
+def _is_htmx(request):
+    return request.headers.get('HX-Request') == 'true'
+
+
+def _is_ignored_param(name):
+    return name.startswith('utm_') or name in getattr(settings, 'PAGE_CACHE_IGNORED_PARAMS', ())
+
+
+def _normalized_query(request):
+    """
+    Query string to key the page on: allowed parameters only, sorted.
+    None when the request carries a parameter that is neither allowed nor
+    ignored (such requests are not cached).
+    """
+    allowed = getattr(settings, 'PAGE_CACHE_QUERY_PARAMS', ())
+    params = []
+    for name, values in request.GET.lists():
+        if name in allowed:
+            params.extend((name, value) for value in values)
+        elif not _is_ignored_param(name):
+            return None
+    return urlencode(sorted(params))
+
+
+def _page_cache_key(request):
+    """Cache key from path + allowed query + language + HTMX-ness + content version"""
+    query = _normalized_query(request)
+    if query is None:
+        return None
+    path_hash = hashlib.md5(f'{request.path}?{query}'.encode()).hexdigest()
+    return 'page_cache:{}:{}:{}:{}'.format(
+        getattr(settings, 'PAGE_CACHE_VERSION', ''),
+        translation.get_language() or settings.LANGUAGE_CODE,
+        'hx' if _is_htmx(request) else 'full',
+        path_hash,
+    )
+
+
+def _can_use_cache(request):
+    """Only anonymous GET/HEAD requests without pending flash messages"""
+    if not getattr(settings, 'PAGE_CACHE_ENABLED', True):
+        return False
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    if 'messages' in request.COOKIES:
+        return False
+    return not request.user.is_authenticated
+
+
+def _messages_used(request):
+    """True if flash messages were displayed or added while handling the request"""
+    messages = getattr(request, '_messages', None)
+    return messages is not None and bool(getattr(messages, 'used', False) or getattr(messages, '_queued_messages', None))
+
+
+def _can_store(request, response):
+    """Only plain, successful, cookie-free responses are stored"""
+    if response.status_code != 200 or response.streaming:
+        return False
+    if response.cookies:
+        return False
+    if 'private' in response.get('Cache-Control', '') or 'no-store' in response.get('Cache-Control', ''):
+        return False
+    # Messages shown or added while rendering must reach this visitor only
+    return not _messages_used(request)
+
+
+def _serialize(response, generation):
+    """Build a JSON-serializable cache entry with the CSRF token masked"""
+    content = response.content.decode(response.charset)
+    match = _CSRF_INPUT_RE.search(content)
+    if match:
+        content = content.replace(match.group(1), CSRF_PLACEHOLDER)
+    return {
+        'generation': generation,
+        'status': response.status_code,
+        'content': content,
+        'has_csrf': bool(match),
+        'headers': [(h, response[h]) for h in _REPLAYED_HEADERS if response.has_header(h)],
+    }
+
+
+def _deserialize(request, entry):
+    """Rebuild a response from a cache entry for the current visitor"""
+    content = entry['content']
+    if entry['has_csrf']:
+        content = content.replace(CSRF_PLACEHOLDER, get_token(request))
+    response = HttpResponse(content, status=entry['status'])
+    for header, value in entry['headers']:
+        response[header] = value
+    response['X-Page-Cache'] = 'HIT'
+    return response
+
+
+def _cache_entry(request, response, generation, timeout):
+    """(entry, timeout) to store for a freshly rendered page, or None if it must not be cached"""
+    response['X-Page-Cache'] = 'MISS'
+    if not _can_store(request, response):
+        return None
+    return _serialize(response, generation), timeout or getattr(settings, 'PAGE_CACHE_TIMEOUT', 900)
+
+
+def anonymous_page_cache(timeout=None):
+    """
+    View decorator caching the full page for anonymous visitors.
+    Works for both sync and async views (async views use the async cache API).
+
+    Usage:
+        @anonymous_page_cache()
+        def about(request): ...
+    """
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def _async_wrapped_view(request, *args, **kwargs):
+                await aget_user(request)
+                if not _can_use_cache(request):
+                    return await view_func(request, *args, **kwargs)
+
+                key = _page_cache_key(request)
+                if key is None:
+                    return await view_func(request, *args, **kwargs)
+                try:
+                    cached = await cache.aget_many([key, PAGE_CACHE_GENERATION_KEY])
+                except Exception as e:
+                    logger.error(f"Page cache read failed: {e}")
+                    return await view_func(request, *args, **kwargs)
+
+                generation = cached.get(PAGE_CACHE_GENERATION_KEY)
+                if generation is None:
+                    generation = await sync_to_async(get_page_cache_generation)()
+
+                entry = cached.get(key)
+                if entry and entry.get('generation') == generation:
+                    response = _deserialize(request, entry)
+                else:
+                    response = await view_func(request, *args, **kwargs)
+                    stored = _cache_entry(request, response, generation, timeout)
+                    if stored:
+                        try:
+                            await cache.aset(key, *stored)
+                        except Exception as e:
+                            logger.error(f"Page cache write failed: {e}")
+
+                patch_vary_headers(response, ('HX-Request',))
+                return response
+            return _async_wrapped_view
+
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if not _can_use_cache(request):
+                return view_func(request, *args, **kwargs)
+
+            key = _page_cache_key(request)
+            if key is None:
+                return view_func(request, *args, **kwargs)
+            try:
+                cached = cache.get_many([key, PAGE_CACHE_GENERATION_KEY])
+            except Exception as e:
+                logger.error(f"Page cache read failed: {e}")
+                return view_func(request, *args, **kwargs)
+
+            generation = cached.get(PAGE_CACHE_GENERATION_KEY)
+            if generation is None:
+                generation = get_page_cache_generation()
+
+            entry = cached.get(key)
+            if entry and entry.get('generation') == generation:
+                response = _deserialize(request, entry)
+            else:
+                response = view_func(request, *args, **kwargs)
+                stored = _cache_entry(request, response, generation, timeout)
+                if stored:
+                    try:
+                        cache.set(key, *stored)
+                    except Exception as e:
+                        logger.error(f"Page cache write failed: {e}")
+
+            patch_vary_headers(response, ('HX-Request',))
+            return response
+        return _wrapped_view
+    return decorator
+
+
+# ============================================================================
+# HTTP CACHE POLICY (ETag / Last-Modified / Cache-Control / Vary)
+# ============================================================================
+
+def _policy_applies(request, per_user):
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    return not (per_user and request.user.is_authenticated)
+
+
+def _is_visitor_specific(request, response):
+    """
+    True when the response must not be stored by shared caches: it carries a
+    CSRF token, sets cookies, or may depend on the visitor's session/messages.
+    """
+    if request.META.get('CSRF_COOKIE_NEEDS_UPDATE') or response.cookies:
+        return True
+    if settings.SESSION_COOKIE_NAME in request.COOKIES or 'messages' in request.COOKIES:
+        return True
+    if _messages_used(request):
+        return True
+    return not response.streaming and bool(_CSRF_INPUT_RE.search(response.content.decode(response.charset, 'replace')))
+
+
+def _content_etag(request, response):
+    """
+    ETag of the rendered body. The per-render CSRF mask is removed and the
+    visitor's CSRF secret mixed in, so the tag is stable for one visitor and
+    a 304 never confirms a body whose form token no longer matches.
+    """
+    content = _CSRF_INPUT_RE.sub(
+        f'name="csrfmiddlewaretoken" value="{CSRF_PLACEHOLDER}"',
+        response.content.decode(response.charset, 'replace'),
+    )
+    digest = hashlib.md5(content.encode())
+    digest.update(request.META.get('CSRF_COOKIE', '').encode())
+    return quote_etag(digest.hexdigest())
+
+
+def cache_policy(max_age=0, s_maxage=None, per_user=True):
+    """
+    Declarative HTTP cache policy for a view, applied in urls.py.
+
+    - Anonymous (or per_user=False) GET/HEAD requests get an ETag derived
+      from the rendered body, and matching conditional requests are answered
+      with a 304 (no body is sent, though the view still runs).
+    - Cache-Control is public with max_age/s_maxage only for responses that
+      are the same for every visitor. Pages carrying a CSRF token or session
+      dependent output are private (max_age, no s_maxage), and logged-in
+      users of per-user views get private/no-cache.
+
+    Usage:
+        path('about/', cache_policy(max_age=600)(views.about), name='about')
+    """
+    def decorator(view_func):
+        def _apply_policy(request, response):
+            if _policy_applies(request, per_user) and response.status_code == 200 and not response.streaming:
+                response['ETag'] = _content_etag(request, response)
+                if _is_visitor_specific(request, response):
+                    patch_cache_control(response, private=True, max_age=max_age)
+                else:
+                    patch_cache_control(response, public=True, max_age=max_age)
+                    if s_maxage is not None:
+                        patch_cache_control(response, s_maxage=s_maxage)
+                response = get_conditional_response(request, etag=response['ETag'], response=response)
+            elif request.method in ('GET', 'HEAD'):
+                patch_cache_control(response, private=True, no_cache=True, max_age=0)
+
+            vary = ['HX-Request', 'Accept-Language']
+            if per_user:
+                vary.append('Cookie')
+            patch_vary_headers(response, vary)
+            return response
+
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def _async_wrapped_view(request, *args, **kwargs):
+                # The policy checks request.user: resolve it off the event loop
+                await aget_user(request)
+                response = await view_func(request, *args, **kwargs)
+                return _apply_policy(request, response)
+            return _async_wrapped_view
+
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            response = view_func(request, *args, **kwargs)
+            return _apply_policy(request, response)
+        return _wrapped_view
+    return decorator
@@ -8,16 +8,57 @@ Author: Isaac
 """
 
 from django.conf import settings
-from django.urls import reverse
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.urls import reverse, get_urlconf
 from django.utils import timezone
-from django.contrib.sites.models import Site
+from django.utils.functional import LazyObject
+from collections import Counter, defaultdict
+from functools import lru_cache
+from types import MappingProxyType
 import json
 
 
-def site_context(request):
+def _freeze(value):
+    """Recursively convert dicts/lists into read-only mappings/tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+@lru_cache(maxsize=None)
+def _structured_data():
+    """Structured data for SEO (JSON-LD), serialized once"""
+    return json.dumps({
+        '@context': 'https://schema.org',
+        '@type': 'Organization',
+        'name': settings.ONEHUX_COMPANY_INFO.get('NAME'),
+        'description': settings.SITE_META.get('site_description', ''),
+        'url': settings.BASE_URL,
+        'email': settings.ONEHUX_COMPANY_INFO.get('CONTACT_EMAIL'),
+        'telephone': settings.ONEHUX_COMPANY_INFO.get('PHONE_SUPPORT'),
+        'sameAs': list(settings.ONEHUX_COMPANY_INFO.get('SOCIAL_MEDIA', {}).values()),
+        'address': {
+            '@type': 'PostalAddress',
+            'addressLocality': 'Worldwide',
+            'addressCountry': 'Global'
+        },
+        'areaServed': 'Worldwide',
+        'serviceType': 'Website Development',
+        'priceRange': '$500-$10000+'
+    })
+
+
+@lru_cache(maxsize=None)
+def _static_context(urlconf):
     """
-    Add site-wide context variables to all templates
+    Build the request-independent part of the site context.
+    Computed once per process (per URLconf) and shared read-only by all requests.
     """
+    quote_url = reverse('users:quote_request', urlconf=urlconf)
+    
     context = {
         # Company information
         'company': settings.ONEHUX_COMPANY_INFO,
@@ -28,9 +69,6 @@ def site_context(request):
         # Site metadata
         'site_meta': getattr(settings, 'SITE_META', {}),
         
-        # Current year for copyright
-        'current_year': timezone.now().year,
-        
         # Environment information
         'environment': getattr(settings, 'ENVIRONMENT', 'unknown'),
         'debug': settings.DEBUG,
@@ -42,17 +80,17 @@ def site_context(request):
         'main_nav': [
             {
                 'name': 'Home',
-                'url': reverse('pages:home'),
+                'url': reverse('pages:home', urlconf=urlconf),
                 'active_patterns': ['pages:home']
             },
             {
                 'name': 'About',
-                'url': reverse('pages:about'),
+                'url': reverse('pages:about', urlconf=urlconf),
                 'active_patterns': ['pages:about']
             },
             {
                 'name': 'Services',
-                'url': reverse('pages:services'),
+                'url': reverse('pages:services', urlconf=urlconf),
                 'active_patterns': ['pages:services']
             },
             {
@@ -62,7 +100,7 @@ def site_context(request):
             },
             {
                 'name': 'Contact',
-                'url': reverse('pages:contact'),
+                'url': reverse('pages:contact', urlconf=urlconf),
                 'active_patterns': ['pages:contact']
             },
         ],
@@ -70,22 +108,22 @@ def site_context(request):
         # Footer navigation
         'footer_nav': {
             'company': [
-                {'name': 'About Us', 'url': reverse('pages:about')},
-                {'name': 'Our Services', 'url': reverse('pages:services')},
-                {'name': 'Contact Us', 'url': reverse('pages:contact')},
-                {'name': 'FAQ', 'url': reverse('pages:faq')},
+                {'name': 'About Us', 'url': reverse('pages:about', urlconf=urlconf)},
+                {'name': 'Our Services', 'url': reverse('pages:services', urlconf=urlconf)},
+                {'name': 'Contact Us', 'url': reverse('pages:contact', urlconf=urlconf)},
+                {'name': 'FAQ', 'url': reverse('pages:faq', urlconf=urlconf)},
             ],
             'services': [
-                {'name': 'Business Websites', 'url': reverse('users:quote_request') + '?type=business'},
-                {'name': 'E-commerce Stores', 'url': reverse('users:quote_request') + '?type=ecommerce'},
-                {'name': 'Web Applications', 'url': reverse('users:quote_request') + '?type=web_app'},
-                {'name': 'Portfolio Sites', 'url': reverse('users:quote_request') + '?type=portfolio'},
+                {'name': 'Business Websites', 'url': quote_url + '?type=business'},
+                {'name': 'E-commerce Stores', 'url': quote_url + '?type=ecommerce'},
+                {'name': 'Web Applications', 'url': quote_url + '?type=web_app'},
+                {'name': 'Portfolio Sites', 'url': quote_url + '?type=portfolio'},
             ],
             'support': [
-                {'name': 'Get Quote', 'url': reverse('users:quote_request')},
-                {'name': 'Login', 'url': reverse('users:login')},
-                {'name': 'Register', 'url': reverse('users:register')},
-                {'name': 'Privacy Policy', 'url': reverse('pages:privacy')},
+                {'name': 'Get Quote', 'url': quote_url},
+                {'name': 'Login', 'url': reverse('users:login', urlconf=urlconf)},
+                {'name': 'Register', 'url': reverse('users:register', urlconf=urlconf)},
+                {'name': 'Privacy Policy', 'url': reverse('pages:privacy', urlconf=urlconf)},
             ],
         },
         
@@ -103,7 +141,7 @@ def site_context(request):
         'cta_buttons': {
             'primary': {
                 'text': 'Get Free Quote',
-                'url': reverse('users:quote_request'),
+                'url': quote_url,
                 'class': 'btn-primary'
             },
             'secondary': {
@@ -113,128 +151,226 @@ def site_context(request):
             }
         },
         
-        # Feature highlights for homepage
-        'features': [
-            {
-                'icon': 'rocket',
-                'title': 'Fast Delivery',
-                'description': 'Quick turnaround times without compromising quality'
-            },
-            {
-                'icon': 'shield-check',
-                'title': 'Secure & Reliable',
-                'description': 'Built with security best practices and reliable hosting'
-            },
-            {
-                'icon': 'device-mobile',
-                'title': 'Mobile Responsive',
-                'description': 'Perfectly optimized for all devices and screen sizes'
-            },
-            {
-                'icon': 'search',
-                'title': 'SEO Optimized',
-                'description': 'Search engine optimized to help your business grow'
-            },
-            {
-                'icon': 'support',
-                'title': '24/7 Support',
-                'description': 'Ongoing support and maintenance for your peace of mind'
-            },
-            {
-                'icon': 'dollar',
-                'title': 'Affordable Pricing',
-                'description': 'Competitive pricing with no hidden fees or surprises'
-            },
-        ],
-        
-        # Testimonials (can be moved to database later)
-        'testimonials': [
-            {
-                'name': 'Sarah Johnson',
-                'company': 'Johnson Consulting',
-                'text': 'Onehux Web Service delivered exactly what we needed. Professional, fast, and affordable.',
-                'rating': 5,
-                'image': '/static/images/testimonials/sarah-j.jpg'
-            },
-            {
-                'name': 'Mike Chen',
-                'company': 'Chen\'s Restaurant',
-                'text': 'Our new website has brought in so many more customers. Thank you for the amazing work!',
-                'rating': 5,
-                'image': '/static/images/testimonials/mike-c.jpg'
-            },
-            {
-                'name': 'Lisa Rodriguez',
-                'company': 'Rodriguez Law Firm',
-                'text': 'Professional service from start to finish. Our law firm website looks fantastic.',
-                'rating': 5,
-                'image': '/static/images/testimonials/lisa-r.jpg'
-            },
-        ],
+        # Maintenance mode info
+        'maintenance_mode': getattr(settings, 'MAINTENANCE_MODE', False),
         
-        # FAQ data (can be moved to database later)
-        'common_faqs': [
-            {
-                'question': 'How long does it take to build a website?',
-                'answer': 'Typical websites take 2-4 weeks, depending on complexity and features required.'
-            },
-            {
-                'question': 'Do you provide hosting services?',
-                'answer': 'Yes, we offer reliable hosting services optimized for the websites we build.'
-            },
-            {
-                'question': 'Can I update my website content myself?',
-                'answer': 'Absolutely! We can include a user-friendly content management system.'
-            },
-            {
-                'question': 'Do you offer ongoing support?',
-                'answer': 'Yes, we provide ongoing support and maintenance packages for all our clients.'
-            },
-        ],
+        # Organization JSON-LD, rendered by base.html on every page
+        'structured_data': _structured_data(),
     }
     
-    # Add current page info for navigation highlighting
-    current_url_name = None
-    if hasattr(request, 'resolver_match') and request.resolver_match:
-        current_url_name = request.resolver_match.url_name
-        context['current_url_name'] = current_url_name
-    
-    # Add user-specific context
-    if request.user.is_authenticated:
-        context['user_nav'] = [
-            {'name': 'Dashboard', 'url': reverse('users:dashboard')},
-            {'name': 'My Quotes', 'url': reverse('users:my_quotes')},
-            {'name': 'Profile', 'url': reverse('users:profile')},
-            {'name': 'Logout', 'url': reverse('users:logout')},
+    return _freeze(context)
+
+
+@lru_cache(maxsize=None)
+def _user_nav(urlconf, is_authenticated):
+    """Build the (frozen) user navigation for logged-in or anonymous visitors"""
+    if is_authenticated:
+        nav = [
+            {'name': 'Dashboard', 'url': reverse('users:dashboard', urlconf=urlconf)},
+            {'name': 'My Quotes', 'url': reverse('users:my_quotes', urlconf=urlconf)},
+            {'name': 'Profile', 'url': reverse('users:profile', urlconf=urlconf)},
+            {'name': 'Logout', 'url': reverse('users:logout', urlconf=urlconf)},
         ]
     else:
-        context['user_nav'] = [
-            {'name': 'Login', 'url': reverse('users:login')},
-            {'name': 'Register', 'url': reverse('users:register')},
+        nav = [
+            {'name': 'Login', 'url': reverse('users:login', urlconf=urlconf)},
+            {'name': 'Register', 'url': reverse('users:register', urlconf=urlconf)},
         ]
+    return _freeze(nav)
+
+# ============================================================================
+# LAZY CONTEXT VALUES
+# ============================================================================
+# Large, rarely used values are only built (once per process) when a template
+# actually dereferences them. In DEBUG, usage is counted per view so unused
+# keys can be pruned further.
+
+@lru_cache(maxsize=None)
+def _features():
+    """Feature highlights for homepage"""
+    return _freeze([
+        {
+            'icon': 'rocket',
+            'title': 'Fast Delivery',
+            'description': 'Quick turnaround times without compromising quality'
+        },
+        {
+            'icon': 'shield-check',
+            'title': 'Secure & Reliable',
+            'description': 'Built with security best practices and reliable hosting'
+        },
+        {
+            'icon': 'device-mobile',
+            'title': 'Mobile Responsive',
+            'description': 'Perfectly optimized for all devices and screen sizes'
+        },
+        {
+            'icon': 'search',
+            'title': 'SEO Optimized',
+            'description': 'Search engine optimized to help your business grow'
+        },
+        {
+            'icon': 'support',
+            'title': '24/7 Support',
+            'description': 'Ongoing support and maintenance for your peace of mind'
+        },
+        {
+            'icon': 'dollar',
+            'title': 'Affordable Pricing',
+            'description': 'Competitive pricing with no hidden fees or surprises'
+        },
+    ])
+
+
+@lru_cache(maxsize=None)
+def _testimonials():
+    """Testimonials (can be moved to database later)"""
+    return _freeze([
+        {
+            'name': 'Sarah Johnson',
+            'company': 'Johnson Consulting',
+            'text': 'Onehux Web Service delivered exactly what we needed. Professional, fast, and affordable.',
+            'rating': 5,
+            'image': '/static/images/testimonials/sarah-j.jpg'
+        },
+        {
+            'name': 'Mike Chen',
+            'company': 'Chen\'s Restaurant',
+            'text': 'Our new website has brought in so many more customers. Thank you for the amazing work!',
+            'rating': 5,
+            'image': '/static/images/testimonials/mike-c.jpg'
+        },
+        {
+            'name': 'Lisa Rodriguez',
+            'company': 'Rodriguez Law Firm',
+            'text': 'Professional service from start to finish. Our law firm website looks fantastic.',
+            'rating': 5,
+            'image': '/static/images/testimonials/lisa-r.jpg'
+        },
+    ])
+
+
+@lru_cache(maxsize=None)
+def _common_faqs():
+    """FAQ data (can be moved to database later)"""
+    return _freeze([
+        {
+            'question': 'How long does it take to build a website?',
+            'answer': 'Typical websites take 2-4 weeks, depending on complexity and features required.'
+        },
+        {
+            'question': 'Do you provide hosting services?',
+            'answer': 'Yes, we offer reliable hosting services optimized for the websites we build.'
+        },
+        {
+            'question': 'Can I update my website content myself?',
+            'answer': 'Absolutely! We can include a user-friendly content management system.'
+        },
+        {
+            'question': 'Do you offer ongoing support?',
+            'answer': 'Yes, we provide ongoing support and maintenance packages for all our clients.'
+        },
+    ])
+
+
+LAZY_CONTEXT_BUILDERS = {
+    'features': _features,
+    'testimonials': _testimonials,
+    'common_faqs': _common_faqs,
+}
+
+# {view_name: Counter({'requests': n, '<key>': n, ...})}, resolved views only,
+# so the number of entries is bounded by the URLconf
+_context_usage = defaultdict(Counter)
+
+
+def _usage_tracking_enabled():
+    return settings.DEBUG and getattr(settings, 'SITE_CONTEXT_USAGE_TRACKING', True)
+
+
+def _view_name(request):
+    resolver_match = getattr(request, 'resolver_match', None)
+    return resolver_match.view_name if resolver_match else None
+
+
+class LazyContextValue(LazyObject):
+    """
+    Lazily materialized, memoized context value.
+    Only built when a template dereferences it (iteration, truthiness, str()).
+    """
     
-    # Add maintenance mode info
-    context['maintenance_mode'] = getattr(settings, 'MAINTENANCE_MODE', False)
+    def __init__(self, key, builder, usage=None):
+        self.__dict__['_key'] = key
+        self.__dict__['_builder'] = builder
+        self.__dict__['_usage'] = usage
+        super().__init__()
     
-    # Add structured data for SEO (JSON-LD)
-    context['structured_data'] = {
-        '@context': 'https://schema.org',
-        '@type': 'Organization',
-        'name': settings.ONEHUX_COMPANY_INFO.get('NAME'),
-        'description': settings.SITE_META.get('site_description', ''),
-        'url': settings.BASE_URL,
-        'email': settings.ONEHUX_COMPANY_INFO.get('CONTACT_EMAIL'),
-        'telephone': settings.ONEHUX_COMPANY_INFO.get('PHONE_SUPPORT'),
-        'sameAs': list(settings.ONEHUX_COMPANY_INFO.get('SOCIAL_MEDIA', {}).values()),
-        'address': {
-            '@type': 'PostalAddress',
-            'addressLocality': 'Worldwide',
-            'addressCountry': 'Global'
-        },
-        'areaServed': 'Worldwide',
-        'serviceType': 'Website Development',
-        'priceRange': '$500-$10000+'
+    def _setup(self):
+        if self._usage is not None:
+            self._usage[self._key] += 1
+        self._wrapped = self._builder()
+
+
+@lru_cache(maxsize=None)
+def _shared_lazy_values():
+    """Process-wide lazy values, used when usage tracking is off"""
+    return {
+        key: LazyContextValue(key, builder)
+        for key, builder in LAZY_CONTEXT_BUILDERS.items()
     }
+
+
+def get_context_usage():
+    """Return per-view counts of requests and of lazy keys actually used"""
+    return {view: dict(counts) for view, counts in _context_usage.items()}
+
+
+def reset_context_usage():
+    """Clear the collected usage counters"""
+    _context_usage.clear()
+
+
+@receiver(setting_changed)
+def reset_site_context(**kwargs):
+    """Drop the precompiled context when settings (or ROOT_URLCONF) change"""
+    _static_context.cache_clear()
+    _user_nav.cache_clear()
+    _structured_data.cache_clear()
+    for builder in LAZY_CONTEXT_BUILDERS.values():
+        builder.cache_clear()
+    _shared_lazy_values.cache_clear()
+
+
+def site_context(request):
+    """
+    Add site-wide context variables to all templates
+    """
+    urlconf = get_urlconf() or settings.ROOT_URLCONF
+    context = dict(_static_context(urlconf))
+    
+    # Current year for copyright
+    context['current_year'] = timezone.now().year
+    
+    # Add current page info for navigation highlighting
+    if hasattr(request, 'resolver_match') and request.resolver_match:
+        context['current_url_name'] = request.resolver_match.url_name
+    
+    # Runtime maintenance flag (set by MaintenanceMiddleware)
+    if hasattr(request, 'maintenance_mode'):
+        context['maintenance_mode'] = request.maintenance_mode
+    
+    # Add user-specific navigation
+    context['user_nav'] = _user_nav(urlconf, request.user.is_authenticated)
+    
+    # Large values are only materialized if the template uses them
+    view_name = _view_name(request)
+    if view_name and _usage_tracking_enabled():
+        usage = _context_usage[view_name]
+        usage['requests'] += 1
+        for key, builder in LAZY_CONTEXT_BUILDERS.items():
+            context[key] = LazyContextValue(key, builder, usage)
+    else:
+        context.update(_shared_lazy_values())
     
     return context
 
@@ -0,0 +1,64 @@
+# pages/management/commands/benchmark_site_context.py
+"""
+Micro-benchmark for pages.context_processors.site_context
+=========================================================
+Compares the per-request cost of the previous context processor, which
+built the whole site-wide context on every call (kept verbatim in
+_baseline_site_context.py), against the current one with its precompiled,
+per-process context.
+
+Usage:
+    python manage.py benchmark_site_context --iterations 20000
+
+Author: Isaac
+"""
+
+from django.core.management.base import BaseCommand
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory
+from django.urls import resolve
+import timeit
+
+from pages import context_processors
+
+from ._baseline_site_context import baseline_site_context
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the per-request cost of the site_context context processor'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=10000,
+            help='Number of context processor calls per run'
+        )
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        request.resolver_match = resolve('/')
+        
+        def previous_implementation():
+            baseline_site_context(request)
+        
+        def precompiled():
+            context_processors.site_context(request)
+        
+        before = timeit.timeit(previous_implementation, number=iterations)
+        context_processors.reset_site_context()
+        context_processors.site_context(request)  # Warm the per-process context
+        after = timeit.timeit(precompiled, number=iterations)
+        
+        before_us = before / iterations * 1_000_000
+        after_us = after / iterations * 1_000_000
+        
+        self.stdout.write(f"Iterations:            {iterations}")
+        self.stdout.write(f"Previous processor:    {before_us:.2f} us/call")
+        self.stdout.write(f"Precompiled context:   {after_us:.2f} us/call")
+        self.stdout.write(self.style.SUCCESS(
+            f"Speedup:               {before_us / after_us:.1f}x"
+        ))
@@ -0,0 +1,25 @@
+# pages/management/commands/build_sitemaps.py
+"""
+Regenerate the cached XML sitemaps
+==================================
+Run on deploy or after content changes.
+
+Usage:
+    python manage.py build_sitemaps
+
+Author: Isaac
+"""
+
+from django.core.management.base import BaseCommand
+
+from pages.sitemaps import build_all_sitemaps
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the sitemap index and every child sitemap into the cache'
+
+    def handle(self, *args, **options):
+        built = build_all_sitemaps()
+        self.stdout.write(self.style.SUCCESS(
+            f"Sitemap index and {built} child sitemaps rebuilt"
+        ))
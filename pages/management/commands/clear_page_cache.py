@@ -0,0 +1,25 @@
+# pages/management/commands/clear_page_cache.py
+"""
+Invalidate the anonymous full-page cache
+========================================
+Run on deploy or after content changes.
+
+Usage:
+    python manage.py clear_page_cache
+
+Author: Isaac
+"""
+
+from django.core.management.base import BaseCommand
+
+from pages.cache import invalidate_page_cache
+
+
+class Command(BaseCommand):
+    help = 'Invalidate all pages cached for anonymous visitors'
+
+    def handle(self, *args, **options):
+        generation = invalidate_page_cache()
+        self.stdout.write(self.style.SUCCESS(
+            f"Page cache invalidated (generation {generation})"
+        ))
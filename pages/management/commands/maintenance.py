@@ -0,0 +1,41 @@
+# pages/management/commands/maintenance.py
+"""
+Toggle maintenance mode at runtime
+==================================
+Sets or clears the maintenance flag in the default cache. Every web worker
+picks it up within MAINTENANCE_FLAG_CHECK_INTERVAL seconds, no redeploy needed.
+
+Usage:
+    python manage.py maintenance on
+    python manage.py maintenance off
+    python manage.py maintenance status
+
+Author: Isaac
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from pages.middleware import get_maintenance_mode, set_maintenance_mode
+
+
+class Command(BaseCommand):
+    help = 'Turn maintenance mode on/off without redeploying'
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['on', 'off', 'status'])
+
+    def handle(self, *args, **options):
+        action = options['action']
+        
+        if action == 'on':
+            set_maintenance_mode(True)
+        elif action == 'off':
+            set_maintenance_mode(False)
+            if getattr(settings, 'MAINTENANCE_MODE', False):
+                self.stdout.write(self.style.WARNING(
+                    'MAINTENANCE_MODE is set in settings; the site stays in maintenance.'
+                ))
+        
+        state = 'ON' if get_maintenance_mode() else 'OFF'
+        self.stdout.write(self.style.SUCCESS(f'Maintenance mode: {state}'))
@@ -1,15 +1,167 @@
-# maintenance_middleware.py
-from django.shortcuts import render
+# pages/middleware.py
+"""
+Maintenance mode middleware
+===========================
+Serves a pre-rendered 503 page while the site is under maintenance.
+
+- Toggle at runtime (no redeploy) with `python manage.py maintenance on|off`;
+  the flag lives in the default cache and is re-read at most every
+  MAINTENANCE_FLAG_CHECK_INTERVAL seconds per process.
+- MAINTENANCE_MODE in settings still forces maintenance on.
+- Clients in ALLOWED_IP_DURING_SITE_MAINTENANCE (IPs or CIDR ranges) bypass it.
+- Sits before the session/auth middleware, so a blocked request costs one
+  in-process flag check and an IP match: no DB, cache or template work.
+
+Author: Isaac
+"""
+
 from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+import ipaddress
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+MAINTENANCE_FLAG_KEY = 'maintenance_mode'
+
+# Used when the maintenance.html template is not available
+FALLBACK_MAINTENANCE_HTML = (
+    '<!DOCTYPE html><html><head><meta charset="utf-8">'
+    '<title>Maintenance - {name}</title></head><body>'
+    '<h1>We\'ll be back soon</h1>'
+    '<p>{name} is undergoing scheduled maintenance. Please check back shortly.</p>'
+    '</body></html>'
+)
+
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+def get_client_ip(request):
+    """
+    Return the client IP address.
+    Behind nginx on a unix socket REMOTE_ADDR is empty, so fall back to the
+    last X-Forwarded-For hop (the one appended by our own nginx).
+    """
+    ip = request.META.get('REMOTE_ADDR')
+    if not ip:
+        forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR', '')
+        if forwarded_for:
+            ip = forwarded_for.split(',')[-1].strip()
+    return ip or ''
+
+
+class IPAllowList:
+    """Compiled matcher for a list of IP addresses and CIDR ranges"""
+
+    def __init__(self, entries):
+        self.addresses = set()
+        self.networks = []
+
+        for entry in entries:
+            entry = entry.strip()
+            if not entry:
+                continue
+            if entry == 'localhost':
+                self.addresses.update({'127.0.0.1', '::1'})
+                continue
+            try:
+                network = ipaddress.ip_network(entry, strict=False)
+            except ValueError:
+                logger.warning(f"Ignoring invalid maintenance allow-list entry: {entry}")
+                continue
+            if network.num_addresses == 1:
+                self.addresses.add(str(network.network_address))
+            else:
+                self.networks.append(network)
+
+        self.addresses = frozenset(self.addresses)
+        self.networks = tuple(self.networks)
+
+    def __contains__(self, ip):
+        if ip in self.addresses:
+            return True
+        if not self.networks:
+            return False
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            return False
+        return any(address in network for network in self.networks)
+
+
+def set_maintenance_mode(enabled):
+    """Turn the runtime maintenance flag on or off for every worker"""
+    if enabled:
+        cache.set(MAINTENANCE_FLAG_KEY, True, None)
+    else:
+        cache.delete(MAINTENANCE_FLAG_KEY)
+    logger.warning(f"Maintenance mode {'enabled' if enabled else 'disabled'}")
+
+
+def get_maintenance_mode():
+    """Return the current maintenance state (settings or runtime flag)"""
+    if getattr(settings, 'MAINTENANCE_MODE', False):
+        return True
+    return bool(cache.get(MAINTENANCE_FLAG_KEY, False))
+
+
+# ============================================================================
+# MIDDLEWARE
+# ============================================================================
 
 class MaintenanceMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
+        self.allow_list = IPAllowList(
+            getattr(settings, 'ALLOWED_IP_DURING_SITE_MAINTENANCE', [])
+        )
+        self.check_interval = getattr(settings, 'MAINTENANCE_FLAG_CHECK_INTERVAL', 5)
+        self.retry_after = str(getattr(settings, 'MAINTENANCE_RETRY_AFTER', 3600))
+        self._enabled = getattr(settings, 'MAINTENANCE_MODE', False)
+        self._checked_at = 0.0
+        self._body = None
+
+    def is_enabled(self):
+        """Per-process view of the maintenance flag, refreshed periodically"""
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            try:
+                self._enabled = get_maintenance_mode()
+            except Exception as e:
+                logger.error(f"Failed to read maintenance flag: {e}")
+            self._checked_at = now
+        return self._enabled
+
+    def get_body(self):
+        """Render the maintenance page once per process"""
+        if self._body is None:
+            company = settings.ONEHUX_COMPANY_INFO
+            try:
+                html = render_to_string('maintenance.html', {
+                    'company': company,
+                    'site_meta': getattr(settings, 'SITE_META', {}),
+                    'base_url': settings.BASE_URL,
+                })
+            except Exception as e:
+                logger.error(f"Failed to render maintenance page: {e}")
+                html = FALLBACK_MAINTENANCE_HTML.format(name=company.get('NAME', ''))
+            self._body = html.encode('utf-8')
+        return self._body
 
     def __call__(self, request):
-        # Check if maintenance mode is on
-        if getattr(settings, 'MAINTENANCE_MODE', False):
-            return render(request, 'maintenance.html')
-        
+        enabled = self.is_enabled()
+        request.maintenance_mode = enabled
+
+        if enabled and get_client_ip(request) not in self.allow_list:
+            response = HttpResponse(self.get_body(), status=503)
+            response['Retry-After'] = self.retry_after
+            response['Cache-Control'] = 'no-store'
+            return response
+
         response = self.get_response(request)
         return response
@@ -0,0 +1,36 @@
+# Generated by Django 5.2 on 2026-10-18 01:37
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SitemapEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.CharField(help_text='Site-relative URL, e.g. /portfolio/acme-store/', max_length=500, unique=True)),
+                ('lastmod', models.DateTimeField(default=django.utils.timezone.now)),
+                ('priority', models.DecimalField(decimal_places=1, default=0.5, max_digits=2)),
+                ('changefreq', models.CharField(choices=[('always', 'Always'), ('hourly', 'Hourly'), ('daily', 'Daily'), ('weekly', 'Weekly'), ('monthly', 'Monthly'), ('yearly', 'Yearly'), ('never', 'Never')], default='monthly', max_length=10)),
+                ('object_id', models.CharField(blank=True, max_length=64)),
+                ('content_type', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+            options={
+                'verbose_name': 'Sitemap Entry',
+                'verbose_name_plural': 'Sitemap Entries',
+                'db_table': 'pages_sitemap_entry',
+                'ordering': ['lastmod', 'id'],
+                'indexes': [models.Index(fields=['lastmod', 'id'], name='pages_sitemap_lastmod_idx'), models.Index(fields=['content_type', 'object_id'], name='pages_sitemap_source_idx')],
+            },
+        ),
+    ]
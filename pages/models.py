@@ -1 +1,59 @@
-from django.db import models
\ No newline at end of file
+# pages/models.py
+"""
+Models for pages app
+====================
+SitemapEntry is the URL registry behind pages.sitemaps.PagesSitemap: one
+row per public page that is not a fixed URL (portfolio items, service
+pages, landing pages, ...). Rows are maintained by model signals (see
+pages.signals.register_sitemap_model) or edited in the admin.
+
+Author: Isaac
+"""
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class SitemapEntry(models.Model):
+    """
+    One URL listed in the dynamic sitemap
+    """
+    
+    CHANGEFREQ_CHOICES = [
+        ('always', _('Always')),
+        ('hourly', _('Hourly')),
+        ('daily', _('Daily')),
+        ('weekly', _('Weekly')),
+        ('monthly', _('Monthly')),
+        ('yearly', _('Yearly')),
+        ('never', _('Never')),
+    ]
+    
+    url = models.CharField(
+        max_length=500,
+        unique=True,
+        help_text=_("Site-relative URL, e.g. /portfolio/acme-store/")
+    )
+    lastmod = models.DateTimeField(default=timezone.now)
+    priority = models.DecimalField(max_digits=2, decimal_places=1, default=0.5)
+    changefreq = models.CharField(max_length=10, choices=CHANGEFREQ_CHOICES, default='monthly')
+    
+    # Source object for entries maintained by signals (empty for manual entries)
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, null=True, blank=True)
+    object_id = models.CharField(max_length=64, blank=True)
+    
+    class Meta:
+        db_table = 'pages_sitemap_entry'
+        verbose_name = _('Sitemap Entry')
+        verbose_name_plural = _('Sitemap Entries')
+        ordering = ['lastmod', 'id']
+        indexes = [
+            # PagesSitemap reads pages in (lastmod, id) order
+            models.Index(fields=['lastmod', 'id'], name='pages_sitemap_lastmod_idx'),
+            models.Index(fields=['content_type', 'object_id'], name='pages_sitemap_source_idx'),
+        ]
+    
+    def __str__(self):
+        return self.url
@@ -0,0 +1,329 @@
+# pages/ratelimit.py
+"""
+Redis rate limiter
+==================
+Sliding-window rate limits for abuse-prone endpoints (quote requests,
+contact form, newsletter signups), enforced before the view runs: no form
+validation, database write or email task happens for a rejected request.
+
+- Each (rule, client key) pair is a Redis sorted set of request times.
+- One Lua script trims and counts every window of a view before touching
+  any of them, then reserves a slot in all of them or in none, atomically
+  and in a single round-trip. A request rejected by one key does not use
+  up the budget of the others.
+- Client rules ('ip', 'user', callables) always keep their slot, so junk
+  and probing traffic from one client is still cut off before the view
+  runs. Per-field rules ('post:'/'json:') give their slot back unless the
+  submission was accepted (`counts`, by default a redirect or a JSON reply
+  with success=true): a visitor's typo does not lock out their email.
+- Rates can be overridden per rule in RATELIMIT_RATES.
+- RATELIMIT_ENABLE switches enforcement off (counters included) and
+  RATELIMIT_USE_CACHE picks the django-redis cache holding the windows.
+- If Redis is unreachable requests are allowed (and the error logged).
+- Clients in RATELIMIT_EXEMPT_IPS (IPs or CIDR ranges, e.g. a load-test
+  machine on staging) are never limited.
+
+Usage:
+    @ratelimit('quote_request', {'ip': '10/h', 'post:email': '3/h'})
+    def quote_request(request): ...
+
+Keys: 'ip', 'user' (falls back to ip for anonymous visitors),
+'post:<field>', 'json:<field>', or a callable(request) -> str.
+
+Author: Isaac
+"""
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
+from django.template import TemplateDoesNotExist
+from django.shortcuts import render
+from django_redis import get_redis_connection
+from functools import lru_cache, wraps
+import hashlib
+import json
+import logging
+import math
+import re
+import uuid
+
+from .async_helpers import aget_user
+from .middleware import IPAllowList, get_client_ip
+
+logger = logging.getLogger(__name__)
+
+STATS_KEY = 'ratelimit:stats'
+
+_RATE_RE = re.compile(r'^(\d+)/(\d*)([smhd])$')
+_PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# KEYS: one window (sorted set) per rule, then the stats hash
+# ARGV: unique member, then window_ms, limit, rule name for each rule
+# Returns {allowed (0/1), retry_after_ms}
+SLIDING_WINDOW_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local stats = KEYS[#KEYS]
+local blocked = false
+local retry = 0
+
+for i = 1, #KEYS - 1 do
+    local window = tonumber(ARGV[3 * i - 1])
+    local limit = tonumber(ARGV[3 * i])
+    redis.call('ZREMRANGEBYSCORE', KEYS[i], 0, now - window)
+    if redis.call('ZCARD', KEYS[i]) >= limit then
+        blocked = true
+        local oldest = redis.call('ZRANGE', KEYS[i], 0, 0, 'WITHSCORES')
+        local wait = window
+        if oldest[2] then
+            wait = tonumber(oldest[2]) + window - now
+        end
+        retry = math.max(retry, wait)
+        redis.call('HINCRBY', stats, ARGV[3 * i + 1] .. ':blocked', 1)
+    end
+end
+
+if blocked then
+    return {0, retry}
+end
+
+for i = 1, #KEYS - 1 do
+    redis.call('ZADD', KEYS[i], now, ARGV[1])
+    redis.call('PEXPIRE', KEYS[i], ARGV[3 * i - 1])
+end
+return {1, 0}
+"""
+
+_script = None
+
+
+def parse_rate(rate):
+    """'5/m' -> (5, 60); '3/10m' -> (3, 600)"""
+    match = _RATE_RE.match(rate.strip())
+    if not match:
+        raise ValueError(f"Invalid rate: {rate!r} (expected e.g. '5/m' or '3/10m')")
+    count, multiplier, unit = match.groups()
+    return int(count), int(multiplier or 1) * _PERIODS[unit]
+
+
+def _connection():
+    return get_redis_connection(getattr(settings, 'RATELIMIT_USE_CACHE', 'default'))
+
+
+def _get_script():
+    global _script
+    if _script is None:
+        _script = _connection().register_script(SLIDING_WINDOW_SCRIPT)
+    return _script
+
+
+@lru_cache(maxsize=8)
+def _exempt_ips(entries):
+    return IPAllowList(entries)
+
+
+def _is_exempt(request):
+    entries = tuple(getattr(settings, 'RATELIMIT_EXEMPT_IPS', ()))
+    return bool(entries) and get_client_ip(request) in _exempt_ips(entries)
+
+
+def _client_key(request, key):
+    """Identifier of the client for `key` ('' when it cannot be determined)"""
+    if callable(key):
+        return key(request) or ''
+    if key == 'ip':
+        return get_client_ip(request)
+    if key == 'user':
+        user = request.user
+        return f'user:{user.pk}' if user.is_authenticated else f'ip:{get_client_ip(request)}'
+    if key.startswith('post:'):
+        return request.POST.get(key[5:], '').strip().lower()
+    if key.startswith('json:'):
+        try:
+            data = json.loads(request.body)
+        except (ValueError, UnicodeDecodeError):
+            return ''
+        value = data.get(key[5:], '') if isinstance(data, dict) else ''
+        return str(value).strip().lower()
+    raise ValueError(f"Unknown rate limit key: {key!r}")
+
+
+def hit(rules):
+    """
+    Check every (rule, client, rate, refundable) in `rules` and, only if all
+    of them allow it, reserve one request in each window.
+    Returns (allowed, retry_after_seconds, reservation); pass the
+    reservation to settle() once the outcome of the request is known.
+    """
+    member = uuid.uuid4().hex
+    keys, args, windows = [], [member], []
+    for rule, client, rate, refundable in rules:
+        limit, period = parse_rate(rate)
+        window_key = cache.make_key(f'ratelimit:{rule}:{hashlib.md5(client.encode()).hexdigest()}')
+        keys.append(window_key)
+        args += [period * 1000, limit, rule]
+        windows.append((rule, window_key, refundable))
+    keys.append(cache.make_key(STATS_KEY))
+
+    try:
+        allowed, retry_ms = _get_script()(keys=keys, args=args)
+    except Exception as e:
+        logger.error(f"Rate limit check failed for {', '.join(window[0] for window in windows)}: {e}")
+        return True, 0, None
+    if not allowed:
+        return False, math.ceil(int(retry_ms) / 1000), None
+    return True, 0, (member, windows)
+
+
+def settle(reservation, counted):
+    """
+    Keep the reserved requests (and count them as allowed); refundable
+    windows give their slot back when the request did not count.
+    """
+    if reservation is None:
+        return
+    member, windows = reservation
+    try:
+        pipe = _connection().pipeline(transaction=False)
+        for rule, window_key, refundable in windows:
+            if counted or not refundable:
+                pipe.hincrby(cache.make_key(STATS_KEY), f'{rule}:allowed', 1)
+            else:
+                pipe.zrem(window_key, member)
+        pipe.execute()
+    except Exception as e:
+        logger.error(f"Failed to settle rate limit reservation: {e}")
+
+
+def accepted_submission(response):
+    """Default `counts`: a redirect (form accepted) or a JSON reply with success=true"""
+    if 300 <= response.status_code < 400:
+        return True
+    if response.status_code < 400 and response.get('Content-Type', '').startswith('application/json'):
+        try:
+            return json.loads(response.content).get('success') is True
+        except (ValueError, AttributeError):
+            return False
+    return False
+
+
+def get_ratelimit_stats():
+    """{rule: {'allowed': n, 'blocked': n}} since the counters were last reset"""
+    try:
+        raw = _connection().hgetall(cache.make_key(STATS_KEY))
+    except Exception as e:
+        logger.error(f"Failed to read rate limit stats: {e}")
+        return {}
+
+    stats = {}
+    for field, value in raw.items():
+        field = field.decode() if isinstance(field, bytes) else field
+        rule, _, outcome = field.rpartition(':')
+        stats.setdefault(rule, {'allowed': 0, 'blocked': 0})[outcome] = int(value)
+    return stats
+
+
+def reset_ratelimit_stats():
+    _connection().delete(cache.make_key(STATS_KEY))
+
+
+def ratelimited_response(request, retry_after):
+    """429 response: JSON for AJAX/API requests, the error page otherwise"""
+    message = 'Too many requests. Please try again later.'
+    if request.content_type == 'application/json' or 'application/json' in request.headers.get('Accept', ''):
+        response = JsonResponse({'success': False, 'message': message}, status=429)
+    else:
+        try:
+            response = render(request, 'errors/error.html', {
+                'page_title': '429 - Too Many Requests',
+                'error_code': '429',
+                'error_title': 'Too Many Requests',
+                'error_message': message,
+            }, status=429)
+        except TemplateDoesNotExist:
+            response = HttpResponse(message, status=429, content_type='text/plain')
+    response['Retry-After'] = str(max(retry_after, 1))
+    return response
+
+
+def _is_refundable(key):
+    """Per-field keys are refunded for unaccepted submissions, client keys never"""
+    return isinstance(key, str) and key.startswith(('post:', 'json:'))
+
+
+def _check(request, rules):
+    """(allowed, retry_after, reservation) for one request; keys with no value are skipped"""
+    if _is_exempt(request):
+        return True, 0, None
+    clients = []
+    for rule, key, rate in rules:
+        client = _client_key(request, key)
+        if client:
+            clients.append((rule, client, rate, _is_refundable(key)))
+    if not clients:
+        return True, 0, None
+    allowed, retry_after, reservation = hit(clients)
+    if not allowed:
+        logger.warning(f"Rate limit exceeded by {get_client_ip(request)} ({', '.join(c[0] for c in clients)})")
+    return allowed, retry_after, reservation
+
+
+def ratelimit(group, rates, methods=('POST',), counts=accepted_submission):
+    """
+    View decorator enforcing `rates` ({key: rate}) for requests in `methods`.
+    All keys are checked before any request is recorded. 'ip'/'user' keys
+    count every request that reaches the view; 'post:'/'json:' keys only
+    when counts(response) is true. Rules are named
+    '<group>:<key>'; settings.RATELIMIT_RATES may override a rule's rate,
+    e.g. {'quote_request:ip': '20/h'}.
+    """
+    rules = []
+    for key, rate in rates.items():
+        parse_rate(rate)  # fail at import time on a bad rate
+        rules.append((f'{group}:{key if isinstance(key, str) else key.__name__}', key, rate))
+
+    def applies(request):
+        return getattr(settings, 'RATELIMIT_ENABLE', True) and request.method in methods
+
+    def current_rules():
+        overrides = getattr(settings, 'RATELIMIT_RATES', {})
+        return [(rule, key, overrides.get(rule, rate)) for rule, key, rate in rules]
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def _async_wrapped_view(request, *args, **kwargs):
+                if not applies(request):
+                    return await view_func(request, *args, **kwargs)
+                await aget_user(request)
+                allowed, retry_after, reservation = await sync_to_async(_check, thread_sensitive=False)(
+                    request, current_rules()
+                )
+                if not allowed:
+                    return ratelimited_response(request, retry_after)
+                try:
+                    response = await view_func(request, *args, **kwargs)
+                except Exception:
+                    await sync_to_async(settle, thread_sensitive=False)(reservation, False)
+                    raise
+                await sync_to_async(settle, thread_sensitive=False)(reservation, counts(response))
+                return response
+            return _async_wrapped_view
+
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if not applies(request):
+                return view_func(request, *args, **kwargs)
+            allowed, retry_after, reservation = _check(request, current_rules())
+            if not allowed:
+                return ratelimited_response(request, retry_after)
+            try:
+                response = view_func(request, *args, **kwargs)
+            except Exception:
+                settle(reservation, False)
+                raise
+            settle(reservation, counts(response))
+            return response
+        return _wrapped_view
+    return decorator
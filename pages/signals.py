@@ -0,0 +1,100 @@
+# pages/signals.py
+"""
+Django signals for pages app
+============================
+Keeps the sitemap URL registry (SitemapEntry) in step with the models that
+publish pages, and drops the cached sitemaps whenever it changes.
+
+Registering a model:
+    # in that app's AppConfig.ready()
+    register_sitemap_model(
+        PortfolioItem,
+        priority=0.7,
+        changefreq='monthly',
+        published=lambda item: item.is_published,
+    )
+
+The model must implement get_absolute_url(); `lastmod_field` (default
+'updated_at') supplies the entry's lastmod. Errors (e.g. an IntegrityError
+when two objects claim the same URL) propagate to the save() that caused
+them.
+
+No model in the tree publishes public pages yet, so nothing is registered
+and the registry only holds entries added in the admin.
+
+Author: Isaac
+"""
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import SitemapEntry
+from .sitemaps import invalidate_sitemaps
+
+
+# ============================================================================
+# REGISTRY MAINTENANCE
+# ============================================================================
+
+def _source_filter(instance):
+    return {
+        'content_type': ContentType.objects.get_for_model(instance),
+        'object_id': str(instance.pk),
+    }
+
+
+def sync_sitemap_entry(instance, priority=0.5, changefreq='monthly', published=None, lastmod_field='updated_at'):
+    """Create, update or remove the registry row for one source object"""
+    source = _source_filter(instance)
+    if published is not None and not published(instance):
+        SitemapEntry.objects.filter(**source).delete()
+        return None
+
+    url = instance.get_absolute_url()
+    entry, _ = SitemapEntry.objects.update_or_create(
+        **source,
+        defaults={
+            'url': url,
+            'lastmod': getattr(instance, lastmod_field, None) or timezone.now(),
+            'priority': priority,
+            'changefreq': changefreq,
+        },
+    )
+    return entry
+
+
+def register_sitemap_model(model, priority=0.5, changefreq='monthly', published=None, lastmod_field='updated_at'):
+    """List every (published) instance of `model` in the sitemap"""
+    options = {
+        'priority': priority,
+        'changefreq': changefreq,
+        'published': published,
+        'lastmod_field': lastmod_field,
+    }
+
+    def on_save(sender, instance, raw=False, **kwargs):
+        if not raw:
+            sync_sitemap_entry(instance, **options)
+
+    def on_delete(sender, instance, **kwargs):
+        SitemapEntry.objects.filter(**_source_filter(instance)).delete()
+
+    uid = f'sitemap_registry:{model._meta.label}'
+    post_save.connect(on_save, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(on_delete, sender=model, weak=False, dispatch_uid=uid)
+
+
+# ============================================================================
+# SITEMAP ENTRY SIGNALS
+# ============================================================================
+
+@receiver(post_save, sender=SitemapEntry)
+@receiver(post_delete, sender=SitemapEntry)
+def sitemap_entry_changed(sender, instance, **kwargs):
+    """
+    Drop the cached sitemaps once the change is committed
+    """
+    transaction.on_commit(invalidate_sitemaps)
@@ -4,13 +4,56 @@ Sitemaps for SEO optimization
 ============================
 Generates XML sitemaps for search engines to crawl the website.
 
+/sitemap.xml is a sitemap index pointing at one paginated child sitemap
+per section in SITEMAPS (/sitemap-<section>.xml?p=<page>).
+
+- lastmod is explicit: static pages take the content date configured in
+  settings.SITEMAP_LASTMOD (a page missing from it is a configuration
+  error), dynamic pages the registry row (PagesSitemap reads SitemapEntry,
+  see pages.signals).
+- The XML is precomputed into the cache by `python manage.py
+  build_sitemaps` (run on deploy) and served with ETag/Last-Modified.
+  invalidate_sitemaps() bumps a generation stamp; a child sitemap missing
+  from the cache is generated (and stored) by the request that needs it.
+
 Author: Isaac
 """
 
+from django.conf import settings
 from django.contrib.sitemaps import Sitemap
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Max
 from django.urls import reverse
-from django.utils import timezone
-from datetime import datetime
+from datetime import datetime, timezone as dt_timezone
+from xml.sax.saxutils import escape
+import hashlib
+import logging
+import time
+
+from .models import SitemapEntry
+
+logger = logging.getLogger(__name__)
+
+SITEMAP_GENERATION_KEY = 'sitemap_generation'
+SITEMAP_INDEX_KEY = 'sitemap:index'
+SITEMAP_SECTION_KEY = 'sitemap:{section}:{page}'
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+URLSET_OPEN = '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+URLSET_CLOSE = '</urlset>\n'
+
+
+def configured_lastmod(url_name):
+    """Content date of a static page from settings.SITEMAP_LASTMOD (UTC midnight)"""
+    try:
+        value = settings.SITEMAP_LASTMOD[url_name]
+    except (AttributeError, KeyError):
+        raise ImproperlyConfigured(f"SITEMAP_LASTMOD has no date for {url_name!r}")
+    try:
+        return datetime.fromisoformat(value).replace(tzinfo=dt_timezone.utc)
+    except ValueError:
+        raise ImproperlyConfigured(f"SITEMAP_LASTMOD[{url_name!r}] is not an ISO date: {value!r}")
 
 
 class StaticViewSitemap(Sitemap):
@@ -41,9 +84,8 @@ class StaticViewSitemap(Sitemap):
         return reverse(item)
     
     def lastmod(self, item):
-        """Return last modification date"""
-        # You can customize this based on when each page was last updated
-        return timezone.now().date()
+        """Return last modification time (configured content date)"""
+        return configured_lastmod(item)
     
     def priority(self, item):
         """Return priority for each page"""
@@ -80,27 +122,32 @@ class StaticViewSitemap(Sitemap):
 
 class PagesSitemap(Sitemap):
     """
-    Sitemap for dynamic pages (if you add a blog or portfolio later)
+    Sitemap for dynamic pages, read from the SitemapEntry URL registry
+    (portfolio, service and landing pages; see pages.signals)
     """
-    priority = 0.7
-    changefreq = 'weekly'
     protocol = 'https'
     
     def items(self):
-        """Return dynamic page items"""
-        # This is a placeholder for when you add blog posts, portfolio items, etc.
-        # For now, return empty list
-        return []
+        """Registry rows in (lastmod, id) order; pages are sliced in SQL"""
+        return SitemapEntry.objects.order_by('lastmod', 'id').values_list(
+            'url', 'lastmod', 'priority', 'changefreq'
+        )
     
     def location(self, item):
-        """Return URL for dynamic items"""
-        # Implement based on your dynamic content models
-        pass
+        return item[0]
     
     def lastmod(self, item):
-        """Return last modification date for dynamic items"""
-        # Implement based on your dynamic content models
-        pass
+        return item[1]
+    
+    def priority(self, item):
+        return item[2]
+    
+    def changefreq(self, item):
+        return item[3]
+    
+    def section_lastmod(self):
+        """Latest lastmod of the whole section (one indexed query)"""
+        return SitemapEntry.objects.aggregate(latest=Max('lastmod'))['latest']
 
 
 class ServicesSitemap(Sitemap):
@@ -124,12 +171,12 @@ class ServicesSitemap(Sitemap):
         ]
     
     def location(self, item):
-        """Return URL for each service type"""
-        return f'/services/{item}/'
+        """Return URL for each service type (the quote form preselected for it)"""
+        return f"{reverse('users:quote_request')}?type={item}"
     
     def lastmod(self, item):
-        """Return last modification date"""
-        return timezone.now().date()
+        """Return last modification time (content date of the quote form)"""
+        return configured_lastmod('users:quote_request')
     
     def priority(self, item):
         """Return priority for each service"""
@@ -144,3 +191,198 @@ class ServicesSitemap(Sitemap):
         }
         return priorities.get(item, 0.7)
     
+
+
+# Sections of the sitemap index (/sitemap-<section>.xml)
+SITEMAPS = {
+    'static': StaticViewSitemap,
+    'services': ServicesSitemap,
+    'pages': PagesSitemap,
+}
+
+
+# ============================================================================
+# CACHED XML
+# ============================================================================
+
+def get_sitemap_generation():
+    """Current generation stamp (unix time of the last invalidation)"""
+    generation = cache.get(SITEMAP_GENERATION_KEY)
+    if generation is None:
+        generation = int(time.time())
+        cache.add(SITEMAP_GENERATION_KEY, generation, None)
+    return generation
+
+
+def invalidate_sitemaps():
+    """Mark every cached sitemap stale by bumping the generation stamp"""
+    generation = int(time.time())
+    cache.set(SITEMAP_GENERATION_KEY, generation, None)
+    logger.info(f"Sitemaps invalidated (generation {generation})")
+    return generation
+
+
+def _get_sitemap(section):
+    sitemap = SITEMAPS[section]()
+    sitemap.limit = getattr(settings, 'SITEMAP_PAGE_SIZE', 5000)
+    return sitemap
+
+
+def _attr(sitemap, name, item):
+    value = getattr(sitemap, name, None)
+    return value(item) if callable(value) else value
+
+
+def _w3c(dt):
+    return dt.astimezone(dt_timezone.utc).strftime('%Y-%m-%dT%H:%M:%S+00:00')
+
+
+def _url_xml(sitemap, item):
+    """(<url> element, lastmod) for one item, or (None, None) if it has no location"""
+    location = _attr(sitemap, 'location', item)
+    if not location:
+        return None, None
+    lastmod = _attr(sitemap, 'lastmod', item)
+    changefreq = _attr(sitemap, 'changefreq', item)
+    priority = _attr(sitemap, 'priority', item)
+
+    parts = ['<url><loc>', escape(f"{settings.BASE_URL}{location}"), '</loc>']
+    if lastmod:
+        parts += ['<lastmod>', _w3c(lastmod), '</lastmod>']
+    if changefreq:
+        parts += ['<changefreq>', changefreq, '</changefreq>']
+    if priority is not None:
+        parts += ['<priority>', f'{float(priority):.1f}', '</priority>']
+    parts.append('</url>\n')
+    return ''.join(parts), lastmod
+
+
+def _section_lastmod(sitemap):
+    """Latest lastmod in a section; large sections provide section_lastmod()"""
+    if hasattr(sitemap, 'section_lastmod'):
+        return sitemap.section_lastmod()
+    latest = None
+    for item in sitemap.items():
+        lastmod = _attr(sitemap, 'lastmod', item)
+        if lastmod and (latest is None or lastmod > latest):
+            latest = lastmod
+    return latest
+
+
+def _make_entry(xml, last_modified, generation):
+    return {
+        'xml': xml,
+        'etag': hashlib.md5(xml.encode()).hexdigest(),
+        'last_modified': last_modified.timestamp() if last_modified else None,
+        'generation': generation,
+    }
+
+
+def _store(key, entry):
+    try:
+        cache.set(key, entry, getattr(settings, 'SITEMAP_CACHE_TIMEOUT', 60 * 60 * 24))
+    except Exception as e:
+        logger.error(f"Failed to cache sitemap {key}: {e}")
+
+
+def _cached(key):
+    """Cached entry for `key` if it belongs to the current generation"""
+    try:
+        entry = cache.get(key)
+    except Exception as e:
+        logger.error(f"Failed to read sitemap {key}: {e}")
+        return None
+    if entry and entry.get('generation') == get_sitemap_generation():
+        return entry
+    return None
+
+
+def get_cached_section(section, page):
+    """Cached child sitemap entry (xml, etag, last_modified) or None"""
+    return _cached(SITEMAP_SECTION_KEY.format(section=section, page=page))
+
+
+def build_section(section, page):
+    """
+    Generate one child sitemap into the cache and return its entry.
+    Raises KeyError (unknown section) or EmptyPage/PageNotAnInteger.
+    """
+    generation = get_sitemap_generation()
+    sitemap = _get_sitemap(section)
+    paginator = sitemap.paginator  # (a new Paginator on every attribute access)
+    page = paginator.validate_number(page)
+    items = paginator.page(page).object_list
+    if hasattr(items, 'iterator'):
+        # Read rows in chunks instead of loading the whole page at once
+        items = items.iterator(chunk_size=1000)
+
+    chunks = [XML_HEADER, URLSET_OPEN]
+    latest = None
+    for item in items:
+        xml, lastmod = _url_xml(sitemap, item)
+        if xml is None:
+            continue
+        if lastmod and (latest is None or lastmod > latest):
+            latest = lastmod
+        chunks.append(xml)
+    chunks.append(URLSET_CLOSE)
+
+    entry = _make_entry(''.join(chunks), latest, generation)
+    _store(SITEMAP_SECTION_KEY.format(section=section, page=page), entry)
+    return entry
+
+
+def build_index():
+    """Generate the sitemap index into the cache and return its entry"""
+    generation = get_sitemap_generation()
+    entries = []
+    latest = None
+    for section in SITEMAPS:
+        sitemap = _get_sitemap(section)
+        section_latest = _section_lastmod(sitemap)
+        if section_latest and (latest is None or section_latest > latest):
+            latest = section_latest
+
+        paginator = sitemap.paginator
+        if not paginator.count:
+            continue
+        for page in paginator.page_range:
+            location = reverse('sitemap_section', kwargs={'section': section})
+            if page > 1:
+                location += f'?p={page}'
+            parts = ['<sitemap><loc>', escape(f"{settings.BASE_URL}{location}"), '</loc>']
+            if section_latest:
+                parts += ['<lastmod>', _w3c(section_latest), '</lastmod>']
+            parts.append('</sitemap>\n')
+            entries.append(''.join(parts))
+
+    xml = ''.join([
+        XML_HEADER,
+        '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n',
+        *entries,
+        '</sitemapindex>\n',
+    ])
+    entry = _make_entry(xml, latest, generation)
+    _store(SITEMAP_INDEX_KEY, entry)
+    return entry
+
+
+def get_index():
+    """The sitemap index entry, built on a cache miss"""
+    return _cached(SITEMAP_INDEX_KEY) or build_index()
+
+
+def build_all_sitemaps():
+    """Invalidate and regenerate the index and every child sitemap (on deploy)"""
+    invalidate_sitemaps()
+    build_index()
+    built = 0
+    for section in SITEMAPS:
+        paginator = _get_sitemap(section).paginator
+        if not paginator.count:
+            continue
+        for page in paginator.page_range:
+            build_section(section, page)
+            built += 1
+    logger.info(f"Built sitemap index and {built} child sitemaps")
+    return built
@@ -1,3 +1,244 @@
-from django.test import TestCase
+from django.contrib import messages
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages.storage.session import SessionStorage
+from django.contrib.sessions.backends.cache import SessionStore
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseRedirect
+from django.template import engines
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from unittest import mock
+import hashlib
+import json
+import uuid
 
-# Create your tests here.
+from users import views as user_views
+from users.models import Newsletter
+
+from . import views
+from .cache import _page_cache_key, anonymous_page_cache
+from .ratelimit import get_ratelimit_stats, parse_rate, ratelimit
+
+
+@override_settings(RATELIMIT_ENABLE=True, RATELIMIT_RATES={}, RATELIMIT_EXEMPT_IPS=[])
+class RateLimitTests(TestCase):
+    """Sliding-window limits checked atomically before the view runs"""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.group = f'test_{uuid.uuid4().hex[:8]}'
+        # Keep the counters of the real rules out of the monitoring stats
+        stats_key = f'ratelimit:stats:{self.group}'
+        patcher = mock.patch('pages.ratelimit.STATS_KEY', stats_key)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(cache.delete, stats_key)
+
+    def _clear_windows(self, rule, *clients):
+        for client in clients:
+            self.addCleanup(cache.delete, f'ratelimit:{rule}:{hashlib.md5(client.encode()).hexdigest()}')
+
+    def _view(self, rates, response=HttpResponseRedirect):
+        @ratelimit(self.group, rates)
+        def view(request):
+            return response('/thanks/')
+        return view
+
+    def _post(self, view, email='client@example.com', ip='192.0.2.10', **extra):
+        return view(self.factory.post('/', {'email': email}, REMOTE_ADDR=ip, **extra))
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate('5/m'), (5, 60))
+        self.assertEqual(parse_rate('3/10m'), (3, 600))
+        self.assertEqual(parse_rate('100/d'), (100, 86400))
+        for rate in ('5', '5/w', 'five/m', '5/m/h'):
+            with self.subTest(rate=rate), self.assertRaises(ValueError):
+                parse_rate(rate)
+
+    def test_blocks_after_limit_with_retry_after(self):
+        view = self._view({'ip': '2/m'})
+        self.assertEqual(self._post(view).status_code, 302)
+        self.assertEqual(self._post(view).status_code, 302)
+
+        response = self._post(view)
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(1 <= int(response['Retry-After']) <= 60)
+        # Another client is not affected
+        self.assertEqual(self._post(view, ip='192.0.2.11').status_code, 302)
+
+    def test_json_clients_get_json_429(self):
+        view = self._view({'ip': '1/m'})
+        self._post(view)
+        response = self._post(view, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, 429)
+        self.assertJSONEqual(response.content, {
+            'success': False,
+            'message': 'Too many requests. Please try again later.',
+        })
+
+    def test_safe_methods_are_not_limited(self):
+        view = self._view({'ip': '1/m'})
+        for _ in range(3):
+            self.assertEqual(view(self.factory.get('/', REMOTE_ADDR='192.0.2.10')).status_code, 302)
+
+    def test_rejected_submissions_keep_the_email_budget(self):
+        view = self._view({'post:email': '2/m'}, response=HttpResponse)
+        for _ in range(5):
+            self.assertEqual(self._post(view).status_code, 200)
+
+    def test_rejected_submissions_use_the_ip_budget(self):
+        view = self._view({'ip': '2/m', 'post:email': '2/m'}, response=HttpResponse)
+        self.assertEqual(self._post(view).status_code, 200)
+        self.assertEqual(self._post(view).status_code, 200)
+        self.assertEqual(self._post(view, email='other@example.com').status_code, 429)
+
+    def test_view_errors_give_the_email_slot_back(self):
+        @ratelimit(self.group, {'post:email': '1/m'})
+        def view(request):
+            raise RuntimeError('boom')
+
+        for _ in range(2):
+            with self.assertRaises(RuntimeError):
+                self._post(view)
+
+    def test_one_key_rejecting_does_not_use_other_budgets(self):
+        view = self._view({'ip': '3/m', 'post:email': '1/m'})
+
+        self.assertEqual(self._post(view, email='a@example.com').status_code, 302)
+        self.assertEqual(self._post(view, email='a@example.com').status_code, 429)
+        self.assertEqual(self._post(view, email='b@example.com').status_code, 302)
+        self.assertEqual(self._post(view, email='c@example.com').status_code, 302)
+        self.assertEqual(self._post(view, email='d@example.com').status_code, 429)
+
+        stats = get_ratelimit_stats()
+        self.assertEqual(stats[f'{self.group}:ip'], {'allowed': 3, 'blocked': 1})
+        self.assertEqual(stats[f'{self.group}:post:email'], {'allowed': 3, 'blocked': 1})
+
+    def test_rate_overrides(self):
+        view = self._view({'ip': '1/m'})
+        with self.settings(RATELIMIT_RATES={f'{self.group}:ip': '2/m'}):
+            self.assertEqual(self._post(view).status_code, 302)
+            self.assertEqual(self._post(view).status_code, 302)
+            self.assertEqual(self._post(view).status_code, 429)
+
+    @override_settings(RATELIMIT_EXEMPT_IPS=['10.0.0.0/8'])
+    def test_exempt_ips_are_never_limited(self):
+        view = self._view({'ip': '1/m'})
+        for _ in range(3):
+            self.assertEqual(self._post(view, ip='10.1.2.3').status_code, 302)
+        self.assertEqual(self._post(view).status_code, 302)
+        self.assertEqual(self._post(view).status_code, 429)
+
+    async def test_async_views(self):
+        @ratelimit(self.group, {'ip': '1/m'})
+        async def view(request):
+            return HttpResponseRedirect('/thanks/')
+
+        async def auser():
+            return AnonymousUser()
+
+        request = AsyncRequestFactory().post('/')
+        request.auser = auser  # set by AuthenticationMiddleware
+        self.assertEqual((await view(request)).status_code, 302)
+        self.assertEqual((await view(request)).status_code, 429)
+
+    def test_already_subscribed_probes_are_limited(self):
+        ip = '198.51.100.7'
+        self._clear_windows('newsletter:ip', ip)
+        Newsletter.objects.create(email='member@example.com')
+
+        def signup():
+            request = self.factory.post('/', json.dumps({'email': 'member@example.com'}),
+                                        content_type='application/json', REMOTE_ADDR=ip)
+            return views.quick_newsletter_signup(request)
+
+        for _ in range(10):
+            response = signup()
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(json.loads(response.content)['success'])
+        self.assertEqual(signup().status_code, 429)
+
+    def test_already_subscribed_probes_are_limited_users_api(self):
+        ip = '198.51.100.8'
+        self._clear_windows('newsletter:ip', ip)
+        url = reverse('users:newsletter_subscribe')
+        for i in range(10):
+            email = f'member{i}@example.com'
+            Newsletter.objects.create(email=email)
+            response = self.client.post(url, {'email': email}, content_type='application/json', REMOTE_ADDR=ip)
+            self.assertFalse(response.json()['success'])
+
+        response = self.client.post(url, {'email': 'member0@example.com'},
+                                    content_type='application/json', REMOTE_ADDR=ip)
+        self.assertEqual(response.status_code, 429)
+
+    async def test_already_subscribed_probes_are_limited_async(self):
+        self._clear_windows('newsletter:ip', '127.0.0.1')
+        await Newsletter.objects.acreate(email='member@example.com')
+
+        async def auser():
+            return AnonymousUser()
+
+        async def subscribe():
+            request = AsyncRequestFactory().post('/', {'email': 'member@example.com'},
+                                                 content_type='application/json')
+            request.auser = auser  # set by AuthenticationMiddleware
+            return await user_views.anewsletter_subscribe(request)
+
+        for _ in range(10):
+            self.assertFalse(json.loads((await subscribe()).content)['success'])
+        self.assertEqual((await subscribe()).status_code, 429)
+
+    @mock.patch('pages.views.render', return_value=HttpResponse())
+    def test_invalid_contact_posts_are_limited(self, render):
+        ip = '198.51.100.9'
+        self._clear_windows('contact:ip', ip)
+        url = reverse('pages:contact')
+        for _ in range(5):
+            response = self.client.post(url, {'email': 'not-an-email'}, REMOTE_ADDR=ip)
+            self.assertEqual(response.status_code, 200)
+
+        response = self.client.post(url, {'email': 'not-an-email'}, REMOTE_ADDR=ip)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(render.call_count, 5)
+
+
+@override_settings(PAGE_CACHE_ENABLED=True)
+class AnonymousPageCacheTests(TestCase):
+    """Full-page cache for anonymous visitors never stores visitor-specific pages"""
+
+    template = engines['django'].from_string(
+        '<p>Page</p>{% for message in messages %}<p>{{ message }}</p>{% endfor %}'
+    )
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.path = f'/page-cache-test/{uuid.uuid4().hex}/'
+
+        @anonymous_page_cache()
+        def view(request):
+            return HttpResponse(self.template.render({'messages': messages.get_messages(request)}, request))
+        self.view = view
+
+    def _request(self, flash=None):
+        request = self.factory.get(self.path)
+        request.user = AnonymousUser()
+        request.session = SessionStore()
+        if flash:
+            # A message stored in the session by a previous request
+            SessionStorage(request)._store([messages.storage.base.Message(messages.INFO, flash)], None)
+        request._messages = SessionStorage(request)
+        self.addCleanup(cache.delete, _page_cache_key(request))
+        return request
+
+    def test_plain_page_is_stored(self):
+        self.assertEqual(self.view(self._request())['X-Page-Cache'], 'MISS')
+        self.assertEqual(self.view(self._request())['X-Page-Cache'], 'HIT')
+
+    def test_page_showing_session_messages_is_not_stored(self):
+        response = self.view(self._request(flash='Only for you'))
+        self.assertContains(response, 'Only for you')
+
+        response = self.view(self._request())
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+        self.assertNotContains(response, 'Only for you')
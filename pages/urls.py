@@ -9,6 +9,8 @@ Author: Isaac
 
 from django.urls import path
 from . import views
+from .async_helpers import for_deployment
+from .cache import cache_policy
 
 app_name = "pages"
 
@@ -18,18 +20,18 @@ urlpatterns = [
     # ========================================================================
     
     # Homepage
-    path('', views.home, name='home'),
+    path('', cache_policy(max_age=300, s_maxage=900)(for_deployment(views.home, views.ahome)), name='home'),
     
     # Company Pages
-    path('about/', views.about, name='about'),
-    path('services/', views.services, name='services'),
-    path('contact/', views.contact, name='contact'),
-    path('faq/', views.faq, name='faq'),
+    path('about/', cache_policy(max_age=600, s_maxage=3600)(views.about), name='about'),
+    path('services/', cache_policy(max_age=600, s_maxage=3600)(views.services), name='services'),
+    path('contact/', cache_policy(max_age=0)(views.contact), name='contact'),
+    path('faq/', cache_policy(max_age=600, s_maxage=3600)(views.faq), name='faq'),
     
     # Legal Pages
-    path('privacy-policy/', views.privacy, name='privacy'),
-    path('terms-and-conditions/', views.terms, name='terms'),
-    path('return-policy/', views.return_policy, name='return_policy'),
+    path('privacy-policy/', cache_policy(max_age=3600, s_maxage=86400)(views.privacy), name='privacy'),
+    path('terms-and-conditions/', cache_policy(max_age=3600, s_maxage=86400)(views.terms), name='terms'),
+    path('return-policy/', cache_policy(max_age=3600, s_maxage=86400)(views.return_policy), name='return_policy'),
     
     # ========================================================================
     # AJAX ENDPOINTS
@@ -8,8 +8,12 @@ Includes SEO optimization and error handlers.
 Author: Isaac
 """
 
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect
-from django.http import HttpResponse, JsonResponse
+from django.http import Http404, HttpResponse, JsonResponse
+from django.core.paginator import EmptyPage, PageNotAnInteger
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
 from django.contrib import messages
 from django.views.decorators.cache import cache_page
 from django.views.decorators.csrf import csrf_exempt
@@ -17,12 +21,17 @@ from django.views.decorators.http import require_http_methods
 from django.core.mail import send_mail
 from django.conf import settings
 from django.utils import timezone
-from django.db.models import Count
 import json
 import logging
 
-from users.models import WebsiteQuote, Newsletter
+from users.models import Newsletter
 from users.forms import ContactForm, NewsletterForm
+from users.stats import get_homepage_stats
+
+from . import sitemaps
+from .async_helpers import arender
+from .cache import anonymous_page_cache
+from .ratelimit import get_ratelimit_stats, ratelimit
 
 logger = logging.getLogger(__name__)
 
@@ -31,19 +40,11 @@ logger = logging.getLogger(__name__)
 # MAIN WEBSITE PAGES
 # ============================================================================
 
-# @cache_page(60 * 15)  # Cache for 15 minutes
-def home(request):
-    """
-    Homepage - Main landing page for Onehux Web Service
-    """
-    # Get some statistics for the homepage
-    total_projects = WebsiteQuote.objects.filter(status='completed').count()
-    active_projects = WebsiteQuote.objects.filter(status__in=['approved', 'in_progress']).count()
-    
-    # Popular website types
-    popular_types = WebsiteQuote.objects.values('website_type').annotate(
-        count=Count('website_type')
-    ).order_by('-count')[:3]
+def _home_context(quote_stats):
+    """Homepage context around the stats from users.stats.get_homepage_stats()"""
+    total_projects = quote_stats['total_projects']
+    active_projects = quote_stats['active_projects']
+    popular_types = quote_stats['popular_types']
     
     # SEO metadata
     page_title = "Professional Website Development Services - Onehux Web Service"
@@ -134,9 +135,26 @@ def home(request):
         ],
     }
     
-    return render(request, 'pages/home.html', context)
+    return context
+
+
+@anonymous_page_cache()
+def home(request):
+    """
+    Homepage - Main landing page for Onehux Web Service
+    """
+    # Get some statistics for the homepage (single read from the stats store)
+    return render(request, 'pages/home.html', _home_context(get_homepage_stats()))
+
 
+@anonymous_page_cache()
+async def ahome(request):
+    """Async version of home (ASGI deployment)"""
+    quote_stats = await sync_to_async(get_homepage_stats, thread_sensitive=False)()
+    return await arender(request, 'pages/home.html', _home_context(quote_stats))
 
+
+@anonymous_page_cache()
 def about(request):
     """About page with company information"""
     page_title = "About Onehux Web Service - Expert Web Development Team"
@@ -186,6 +204,7 @@ def about(request):
     return render(request, 'pages/about.html', context)
 
 
+@anonymous_page_cache()
 def services(request):
     """Services page detailing all offerings"""
     page_title = "Web Development Services - Custom Websites & Applications"
@@ -277,6 +296,8 @@ def services(request):
     return render(request, 'pages/services.html', context)
 
 
+@anonymous_page_cache()
+@ratelimit('contact', {'ip': '5/h', 'post:email': '3/h'})
 def contact(request):
     """Contact page with form and company information"""
     page_title = "Contact Onehux Web Service - Get Your Free Consultation"
@@ -352,6 +373,7 @@ def contact(request):
     return render(request, 'pages/contact.html', context)
 
 
+@anonymous_page_cache()
 def faq(request):
     """FAQ page with common questions and answers"""
     page_title = "Frequently Asked Questions - Web Development Services"
@@ -439,6 +461,7 @@ def faq(request):
     return render(request, 'pages/faq.html', context)
 
 
+@anonymous_page_cache()
 def privacy(request):
     """Privacy policy page"""
     page_title = "Privacy Policy - Onehux Web Service"
@@ -454,6 +477,7 @@ def privacy(request):
     return render(request, 'pages/privacy.html', context)
 
 
+@anonymous_page_cache()
 def terms(request):
     """Terms and conditions page"""
     page_title = "Terms and Conditions - Onehux Web Service"
@@ -469,6 +493,7 @@ def terms(request):
     return render(request, 'pages/terms.html', context)
 
 
+@anonymous_page_cache()
 def return_policy(request):
     """Return/refund policy page"""
     page_title = "Return Policy - Onehux Web Service"
@@ -490,6 +515,7 @@ def return_policy(request):
 
 @require_http_methods(["POST"])
 @csrf_exempt
+@ratelimit('newsletter', {'ip': '10/h', 'json:email': '3/h'})
 def quick_newsletter_signup(request):
     """Quick newsletter signup via AJAX"""
     try:
@@ -530,6 +556,61 @@ def quick_newsletter_signup(request):
         return JsonResponse({'success': False, 'message': 'An error occurred'})
 
 
+# ============================================================================
+# MONITORING
+# ============================================================================
+
+def ratelimit_stats(request):
+    """Allowed/blocked counters per rate limit rule (wrapped in admin_view in urls.py)"""
+    return JsonResponse({'rules': get_ratelimit_stats()})
+
+
+# ============================================================================
+# SITEMAPS
+# ============================================================================
+
+def _sitemap_response(request, entry):
+    """Cached sitemap XML with ETag/Last-Modified (304 when unchanged)"""
+    response = HttpResponse(entry['xml'], content_type='application/xml')
+    response['ETag'] = quote_etag(entry['etag'])
+    if entry['last_modified']:
+        response['Last-Modified'] = http_date(entry['last_modified'])
+    patch_cache_control(response, public=True, max_age=3600)
+    return get_conditional_response(
+        request,
+        etag=response['ETag'],
+        last_modified=int(entry['last_modified']) if entry['last_modified'] else None,
+        response=response,
+    )
+
+
+@require_http_methods(["GET", "HEAD"])
+def sitemap_index(request):
+    """Sitemap index (/sitemap.xml) listing every child sitemap"""
+    return _sitemap_response(request, sitemaps.get_index())
+
+
+@require_http_methods(["GET", "HEAD"])
+def sitemap_section(request, section):
+    """One page of a child sitemap (/sitemap-<section>.xml?p=<page>)"""
+    if section not in sitemaps.SITEMAPS:
+        raise Http404('Unknown sitemap section')
+    try:
+        page = int(request.GET.get('p', 1))
+    except ValueError:
+        raise Http404('Invalid sitemap page')
+    
+    entry = sitemaps.get_cached_section(section, page)
+    if entry is None:
+        # Not cached yet: generate (and cache) it. Not streamed: under ASGI a
+        # sync generator is buffered in full anyway.
+        try:
+            entry = sitemaps.build_section(section, page)
+        except (EmptyPage, PageNotAnInteger):
+            raise Http404('Invalid sitemap page')
+    return _sitemap_response(request, entry)
+
+
 # ============================================================================
 # ERROR HANDLERS
 # ============================================================================
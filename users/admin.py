@@ -12,15 +12,23 @@ from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
-from django.db.models import Count, Q
+from django.db.models import Count, F, Func, IntegerField, OuterRef, Q, Subquery
 from django.utils.translation import gettext_lazy as _
 from django.contrib.admin import SimpleListFilter
+from django.contrib import messages
 from django.utils import timezone
+from django.core.cache import cache
+from django.conf import settings
+from django.shortcuts import render
 from datetime import timedelta
 import json
 
 from .models import User, WebsiteQuote, Newsletter
 from .tasks import send_quote_email, send_newsletter_email
+from .pagination import EstimatedCountPaginator
+from .search import search_quotes
+from .transitions import bulk_transition
+from .dispatch import enqueue_chunked
 
 
 # ============================================================================
@@ -120,6 +128,10 @@ class UserAdmin(BaseUserAdmin):
     search_fields = ('email', 'first_name', 'last_name', 'company_name', 'phone_number')
     ordering = ('-date_joined',)
     
+    # Estimated counts instead of COUNT(*) on large tables (users.pagination)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    
     # Fieldsets for user detail view
     fieldsets = (
         (None, {
@@ -176,11 +188,22 @@ class UserAdmin(BaseUserAdmin):
     get_full_name_display.short_description = 'Name'
     get_full_name_display.admin_order_field = 'first_name'
     
+    def get_queryset(self, request):
+        """Annotate quote counts in the changelist query (no query per row)"""
+        quote_counts = WebsiteQuote.objects.filter(
+            user=OuterRef('pk')
+        ).order_by().annotate(
+            count=Func(F('pk'), function='COUNT')
+        ).values('count')
+        return super().get_queryset(request).annotate(
+            _quotes_count=Subquery(quote_counts, output_field=IntegerField())
+        )
+    
     def quotes_count(self, obj):
         """Display number of quotes for this user"""
-        count = WebsiteQuote.objects.filter(
-            Q(user=obj) | Q(email=obj.email)
-        ).count()
+        count = getattr(obj, '_quotes_count', None)
+        if count is None:
+            count = WebsiteQuote.objects.filter(user=obj).count()
         if count > 0:
             url = reverse('admin:users_websitequote_changelist')
             return format_html(
@@ -189,6 +212,7 @@ class UserAdmin(BaseUserAdmin):
             )
         return '0 quotes'
     quotes_count.short_description = 'Quotes'
+    quotes_count.admin_order_field = '_quotes_count'
     
     # Custom actions
     actions = ['verify_users', 'send_newsletter_to_users']
@@ -235,6 +259,21 @@ class WebsiteQuoteAdmin(admin.ModelAdmin):
     
     ordering = ('-created_at',)
     
+    # Estimated counts instead of COUNT(*) on large tables (users.pagination)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    
+    def get_search_results(self, request, queryset, search_term):
+        """Ranked full-text/trigram search on PostgreSQL (users.search)"""
+        if search_term:
+            results = search_quotes(queryset, search_term)
+            if results is not None:
+                # Best matches first unless a column ordering was chosen
+                if 'o' not in request.GET:
+                    results = results.order_by('-search_rank', *queryset.query.order_by)
+                return results, False
+        return super().get_search_results(request, queryset, search_term)
+    
     # Fieldsets
     fieldsets = (
         (_('Client Information'), {
@@ -313,35 +352,38 @@ class WebsiteQuoteAdmin(admin.ModelAdmin):
     # Custom actions
     actions = ['mark_as_contacted', 'mark_as_quoted', 'resend_confirmation_email']
     
-    def mark_as_contacted(self, request, queryset):
-        """Mark quotes as contacted"""
-        updated = queryset.update(
-            status='contacted',
-            contacted_at=timezone.now()
-        )
+    def _transition(self, request, queryset, status, label):
+        """Apply a validated bulk status change and report the outcome"""
+        result = bulk_transition(queryset, status, actor=request.user)
         self.message_user(
             request,
-            f'{updated} quotes were marked as contacted.'
+            f'{result.updated} quotes were marked as {label}.'
         )
+        if result.skipped:
+            self.message_user(
+                request,
+                f'{result.skipped} quotes were skipped (already {label} or cannot move to that status).',
+                level=messages.WARNING
+            )
+    
+    def mark_as_contacted(self, request, queryset):
+        """Mark quotes as contacted"""
+        self._transition(request, queryset, 'contacted', 'contacted')
     mark_as_contacted.short_description = 'Mark selected quotes as contacted'
     
     def mark_as_quoted(self, request, queryset):
         """Mark quotes as quoted"""
-        updated = queryset.update(status='quoted')
-        self.message_user(
-            request,
-            f'{updated} quotes were marked as quoted.'
-        )
+        self._transition(request, queryset, 'quoted', 'quoted')
     mark_as_quoted.short_description = 'Mark selected quotes as quoted'
     
     def resend_confirmation_email(self, request, queryset):
         """Resend confirmation emails"""
-        for quote in queryset:
-            send_quote_email.delay(quote.id)
+        quote_ids = [str(pk) for pk in queryset.values_list('pk', flat=True)]
+        enqueue_chunked(send_quote_email, [(pk,) for pk in quote_ids])
         
         self.message_user(
             request,
-            f'Confirmation emails are being sent for {queryset.count()} quotes.'
+            f'Confirmation emails are being sent for {len(quote_ids)} quotes.'
         )
     resend_confirmation_email.short_description = 'Resend confirmation emails'
     
@@ -368,6 +410,10 @@ class NewsletterAdmin(admin.ModelAdmin):
     search_fields = ('email', 'name')
     ordering = ('-subscribed_at',)
     
+    # Estimated counts instead of COUNT(*) on large tables (users.pagination)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    
     readonly_fields = ('subscribed_at', 'unsubscribed_at')
     
     # Custom actions
@@ -376,6 +422,7 @@ class NewsletterAdmin(admin.ModelAdmin):
     def activate_subscriptions(self, request, queryset):
         """Activate selected subscriptions"""
         updated = queryset.update(is_active=True, unsubscribed_at=None)
+        cache.delete(DASHBOARD_STATS_KEY)  # update() bypasses the signals
         self.message_user(
             request,
             f'{updated} subscriptions were activated.'
@@ -385,6 +432,7 @@ class NewsletterAdmin(admin.ModelAdmin):
     def deactivate_subscriptions(self, request, queryset):
         """Deactivate selected subscriptions"""
         updated = queryset.update(is_active=False, unsubscribed_at=timezone.now())
+        cache.delete(DASHBOARD_STATS_KEY)  # update() bypasses the signals
         self.message_user(
             request,
             f'{updated} subscriptions were deactivated.'
@@ -418,14 +466,40 @@ admin.site.site_header = 'Onehux Web Service Administration'
 admin.site.site_title = 'Onehux Admin'
 admin.site.index_title = 'Welcome to Onehux Administration'
 
-# Custom admin dashboard stats (if you want to add dashboard widgets)
-def admin_dashboard_stats():
-    """Generate dashboard statistics"""
+DASHBOARD_STATS_KEY = 'dashboard_stats'
+
+
+# Custom admin dashboard stats (rendered by the widget on admin/custom_index.html)
+def admin_dashboard_stats(use_cache=True):
+    """
+    Generate dashboard statistics: one aggregate query per table, cached
+    until a user/quote/newsletter change invalidates it (see users.signals)
+    """
+    if use_cache:
+        stats = cache.get(DASHBOARD_STATS_KEY)
+        if stats is not None:
+            return stats
+    
     stats = {
-        'total_users': User.objects.count(),
-        'active_users': User.objects.filter(is_active=True).count(),
-        'total_quotes': WebsiteQuote.objects.count(),
-        'pending_quotes': WebsiteQuote.objects.filter(status='new').count(),
-        'newsletter_subscribers': Newsletter.objects.filter(is_active=True).count(),
+        **User.objects.aggregate(
+            total_users=Count('pk'),
+            active_users=Count('pk', filter=Q(is_active=True)),
+        ),
+        **WebsiteQuote.objects.aggregate(
+            total_quotes=Count('pk'),
+            pending_quotes=Count('pk', filter=Q(status='new')),
+        ),
+        **Newsletter.objects.aggregate(
+            newsletter_subscribers=Count('pk', filter=Q(is_active=True)),
+        ),
     }
-    return stats
\ No newline at end of file
+    cache.set(DASHBOARD_STATS_KEY, stats, getattr(settings, 'DASHBOARD_STATS_TIMEOUT', 300))
+    return stats
+
+
+def dashboard_stats_widget(request):
+    """HTMX partial with the dashboard counters (wrapped in admin_view in urls.py)"""
+    return render(request, 'admin/partials/dashboard_stats.html', {
+        'stats': admin_dashboard_stats(),
+        'refresh_interval': getattr(settings, 'DASHBOARD_STATS_REFRESH', 30),
+    })
\ No newline at end of file
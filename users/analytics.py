@@ -0,0 +1,136 @@
+# users/analytics.py
+"""
+Analytics counters for users app
+================================
+Lock-free daily counters kept in Redis.
+
+- Quote counts by type/budget: one hash per day, updated with HINCRBY
+- Daily logins: INCR
+- Unique daily users: HyperLogLog (PFADD / PFCOUNT)
+
+Every write is a single pipelined round-trip, so concurrent gevent workers
+never lose increments. Read with get_daily_analytics() / get_analytics_range().
+
+Author: Isaac
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django_redis import get_redis_connection
+from datetime import timedelta
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _retention_seconds():
+    """Keep counters long enough for the weekly report (and a bit of history)"""
+    return getattr(settings, 'ANALYTICS_RETENTION_DAYS', 35) * 86400
+
+
+def _key(day, name):
+    """Fully prefixed Redis key for a daily counter"""
+    return cache.make_key(f'analytics:{day.isoformat()}:{name}')
+
+
+def _decode(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+# ============================================================================
+# WRITE API (called from users.signals)
+# ============================================================================
+
+def track_quote(quote):
+    """Count a new quote by day, website type and budget range"""
+    today = timezone.now().date()
+    key = _key(today, 'quotes')
+    try:
+        pipe = get_redis_connection('default').pipeline(transaction=False)
+        pipe.hincrby(key, 'total', 1)
+        pipe.hincrby(key, f'type:{quote.website_type}', 1)
+        pipe.hincrby(key, f'budget:{quote.budget_range}', 1)
+        pipe.expire(key, _retention_seconds())
+        pipe.execute()
+    except Exception as e:
+        logger.error(f"Failed to track quote analytics: {e}")
+
+
+def track_login(user):
+    """Count a login and add the user to the day's unique-user HyperLogLog"""
+    today = timezone.now().date()
+    logins_key = _key(today, 'logins')
+    users_key = _key(today, 'unique_users')
+    try:
+        pipe = get_redis_connection('default').pipeline(transaction=False)
+        pipe.incr(logins_key)
+        pipe.pfadd(users_key, str(user.pk))
+        pipe.expire(logins_key, _retention_seconds())
+        pipe.expire(users_key, _retention_seconds())
+        pipe.execute()
+    except Exception as e:
+        logger.error(f"Failed to track login analytics: {e}")
+
+
+# ============================================================================
+# QUERY API (admin dashboard, users.tasks.generate_weekly_analytics)
+# ============================================================================
+
+def _empty_totals():
+    return {
+        'quotes': 0,
+        'quotes_by_type': {},
+        'quotes_by_budget': {},
+        'logins': 0,
+    }
+
+
+def _merge_quote_hash(totals, raw_hash):
+    for field, value in raw_hash.items():
+        field, value = _decode(field), int(value)
+        if field == 'total':
+            totals['quotes'] += value
+        elif field.startswith('type:'):
+            name = field.split(':', 1)[1]
+            totals['quotes_by_type'][name] = totals['quotes_by_type'].get(name, 0) + value
+        elif field.startswith('budget:'):
+            name = field.split(':', 1)[1]
+            totals['quotes_by_budget'][name] = totals['quotes_by_budget'].get(name, 0) + value
+
+
+def get_analytics_range(start_date, end_date):
+    """
+    Aggregate counters for every day from start_date to end_date (inclusive)
+    in one round-trip. unique_users is the HyperLogLog union over the range.
+    """
+    days = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+    totals = _empty_totals()
+    totals['period'] = f"{start_date} to {end_date}"
+    totals['unique_users'] = 0
+    if not days:
+        return totals
+
+    try:
+        pipe = get_redis_connection('default').pipeline(transaction=False)
+        for day in days:
+            pipe.hgetall(_key(day, 'quotes'))
+            pipe.get(_key(day, 'logins'))
+        pipe.pfcount(*[_key(day, 'unique_users') for day in days])
+        results = pipe.execute()
+    except Exception as e:
+        logger.error(f"Failed to read analytics: {e}")
+        return totals
+
+    for quote_hash, logins in zip(results[0:-1:2], results[1:-1:2]):
+        _merge_quote_hash(totals, quote_hash)
+        totals['logins'] += int(logins or 0)
+    totals['unique_users'] = results[-1]
+
+    return totals
+
+
+def get_daily_analytics(day=None):
+    """Counters for a single day (defaults to today)"""
+    day = day or timezone.now().date()
+    return get_analytics_range(day, day)
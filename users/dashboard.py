@@ -0,0 +1,135 @@
+# users/dashboard.py
+"""
+User dashboard data
+===================
+Everything users.views.dashboard shows, built with two queries:
+
+- one aggregate with conditional counts over the user's whole quote history
+- the five most recent quotes
+
+The result is cached per user (USER_DASHBOARD_CACHE_TIMEOUT) and dropped by
+the quote signals whenever one of that user's quotes changes. The cache uses
+the JSON serializer, so recent quotes are stored as column values and turned
+back into WebsiteQuote instances on read. Every column is cached: a deferred
+field would be loaded lazily while rendering, a query per quote that the
+async dashboard view cannot run on the event loop.
+
+Author: Isaac
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+import logging
+
+from .models import WebsiteQuote
+
+logger = logging.getLogger(__name__)
+
+# v2: rows hold every column (v1 rows held six)
+USER_DASHBOARD_KEY = 'user_dashboard:v2:{user_id}'
+
+ACTIVE_STATUSES = ('approved', 'in_progress')
+
+RECENT_QUOTES_LIMIT = 5
+
+# Cached columns of the recent quotes: all of them, so no field is deferred
+RECENT_QUOTE_FIELDS = tuple(field.attname for field in WebsiteQuote._meta.concrete_fields)
+
+
+def _cache_key(user_id):
+    return USER_DASHBOARD_KEY.format(user_id=user_id)
+
+
+def _load_quotes(rows):
+    """Fully loaded WebsiteQuote instances from cached RECENT_QUOTE_FIELDS value lists"""
+    fields = [WebsiteQuote._meta.get_field(name) for name in RECENT_QUOTE_FIELDS]
+    return [
+        WebsiteQuote.from_db(
+            'default', RECENT_QUOTE_FIELDS,
+            [field.to_python(value) for field, value in zip(fields, row)],
+        )
+        for row in rows
+    ]
+
+
+def _stats_aggregates():
+    return {
+        'total_quotes': Count('pk'),
+        'active_projects': Count('pk', filter=Q(status__in=ACTIVE_STATUSES)),
+        'completed_projects': Count('pk', filter=Q(status='completed')),
+    }
+
+
+def _recent_rows(quotes):
+    return quotes.order_by('-created_at').values_list(*RECENT_QUOTE_FIELDS)[:RECENT_QUOTES_LIMIT]
+
+
+def build_user_dashboard(user):
+    """Stats and recent quote rows for `user`, straight from the database"""
+    quotes = WebsiteQuote.objects.filter(user=user)
+    return {
+        'stats': quotes.order_by().aggregate(**_stats_aggregates()),
+        'recent_quotes': list(_recent_rows(quotes)),
+    }
+
+
+async def abuild_user_dashboard(user):
+    """Async version of build_user_dashboard (async ORM)"""
+    quotes = WebsiteQuote.objects.filter(user=user)
+    return {
+        'stats': await quotes.order_by().aaggregate(**_stats_aggregates()),
+        'recent_quotes': [row async for row in _recent_rows(quotes)],
+    }
+
+
+def get_user_dashboard(user):
+    """
+    Dashboard data for `user`: {'stats': {...}, 'recent_quotes': [WebsiteQuote]}
+    served from the per-user cache when present
+    """
+    key = _cache_key(user.pk)
+    data = None
+    try:
+        data = cache.get(key)
+    except Exception as e:
+        logger.error(f"Failed to read dashboard cache for user {user.pk}: {e}")
+
+    if data is None:
+        data = build_user_dashboard(user)
+        try:
+            cache.set(key, data, getattr(settings, 'USER_DASHBOARD_CACHE_TIMEOUT', 300))
+        except Exception as e:
+            logger.error(f"Failed to cache dashboard for user {user.pk}: {e}")
+
+    return {'stats': data['stats'], 'recent_quotes': _load_quotes(data['recent_quotes'])}
+
+
+async def aget_user_dashboard(user):
+    """Async version of get_user_dashboard (async cache and ORM calls)"""
+    key = _cache_key(user.pk)
+    data = None
+    try:
+        data = await cache.aget(key)
+    except Exception as e:
+        logger.error(f"Failed to read dashboard cache for user {user.pk}: {e}")
+
+    if data is None:
+        data = await abuild_user_dashboard(user)
+        try:
+            await cache.aset(key, data, getattr(settings, 'USER_DASHBOARD_CACHE_TIMEOUT', 300))
+        except Exception as e:
+            logger.error(f"Failed to cache dashboard for user {user.pk}: {e}")
+
+    return {'stats': data['stats'], 'recent_quotes': _load_quotes(data['recent_quotes'])}
+
+
+def invalidate_user_dashboard(*user_ids):
+    """Drop the cached dashboards of the given users (None ids are ignored)"""
+    keys = [_cache_key(user_id) for user_id in set(user_ids) if user_id is not None]
+    if not keys:
+        return
+    try:
+        cache.delete_many(keys)
+    except Exception as e:
+        logger.error(f"Failed to clear dashboard cache: {e}")
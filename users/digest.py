@@ -0,0 +1,69 @@
+# users/digest.py
+"""
+Admin quote notification digest
+===============================
+With QUOTE_DIGEST_ENABLED, admin notifications for new quotes are appended
+to a Redis stream instead of being emailed one by one. The
+send_quote_digest beat task drains the stream every
+QUOTE_DIGEST_INTERVAL_MINUTES and sends a single email for the batch.
+
+Quotes whose budget is in QUOTE_DIGEST_IMMEDIATE_BUDGETS (default 10000+)
+are always notified immediately.
+
+Author: Isaac
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django_redis import get_redis_connection
+import logging
+
+logger = logging.getLogger(__name__)
+
+STREAM_KEY = 'quote_admin_digest'
+STREAM_MAXLEN = 10000
+
+
+def _stream_key():
+    return cache.make_key(STREAM_KEY)
+
+
+def _decode(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def should_queue(quote):
+    """Whether the admin notification for `quote` goes into the digest"""
+    if not getattr(settings, 'QUOTE_DIGEST_ENABLED', False):
+        return False
+    immediate = getattr(settings, 'QUOTE_DIGEST_IMMEDIATE_BUDGETS', ['10000+'])
+    return quote.budget_range not in immediate
+
+
+def queue_quote_notification(quote):
+    """Append a quote to the digest stream"""
+    get_redis_connection('default').xadd(
+        _stream_key(),
+        {'quote_id': str(quote.pk)},
+        maxlen=STREAM_MAXLEN,
+        approximate=True,
+    )
+    logger.info(f"Quote {quote.pk} queued for admin digest")
+
+
+def read_pending(limit=500):
+    """Return [(entry_id, quote_id), ...] oldest first"""
+    entries = get_redis_connection('default').xrange(_stream_key(), count=limit)
+    return [(_decode(entry_id), _decode(fields.get(b'quote_id', fields.get('quote_id'))))
+            for entry_id, fields in entries]
+
+
+def acknowledge(entry_ids):
+    """Remove sent entries from the stream"""
+    if entry_ids:
+        get_redis_connection('default').xdel(_stream_key(), *entry_ids)
+
+
+def entry_timestamp(entry_id):
+    """Stream entry ids start with the unix time in milliseconds"""
+    return int(entry_id.split('-', 1)[0]) / 1000
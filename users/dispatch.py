@@ -0,0 +1,86 @@
+# users/dispatch.py
+"""
+Idempotent task dispatch for users app
+======================================
+Queue a Celery task exactly once per event.
+
+- The task is sent from transaction.on_commit, so it never runs against a
+  row that was rolled back (or not yet visible to the worker).
+- A dedup key is claimed in Redis with cache.add() right before sending;
+  any further dispatch of the same task/event within `ttl` is dropped.
+
+Usage:
+    enqueue_once(send_welcome_email, user.id, event=f'user:{user.id}')
+    enqueue_chunked(send_quote_email, [(pk,) for pk in quote_ids])
+
+Author: Isaac
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEDUP_KEY_PREFIX = 'task_dedup'
+
+
+def _dedup_key(task, event):
+    return f'{DEDUP_KEY_PREFIX}:{task.name}:{event}'
+
+
+def enqueue_once(task, *args, event=None, ttl=None, using=None, **kwargs):
+    """
+    Send `task.delay(*args, **kwargs)` once the current transaction commits,
+    unless the same task was already dispatched for `event`.
+
+    `event` defaults to the positional arguments. Returns immediately; the
+    actual send happens on commit (or right away outside a transaction).
+    """
+    if event is None:
+        event = ':'.join(str(arg) for arg in args)
+    key = _dedup_key(task, event)
+    timeout = ttl or getattr(settings, 'TASK_DEDUP_TTL', 3600)
+
+    def _send():
+        try:
+            if not cache.add(key, 1, timeout):
+                logger.debug(f"Skipped duplicate dispatch of {task.name} for {event}")
+                return
+        except Exception as e:
+            # Redis down: prefer sending over silently dropping the email
+            logger.error(f"Task dedup check failed for {task.name}: {e}")
+
+        try:
+            task.delay(*args, **kwargs)
+            logger.info(f"Queued {task.name} for {event}")
+        except Exception as e:
+            logger.error(f"Failed to queue {task.name} for {event}: {e}")
+            # Release the key so a later attempt can still send
+            try:
+                cache.delete(key)
+            except Exception:
+                pass
+
+    transaction.on_commit(_send, using=using)
+
+
+def enqueue_chunked(task, args_list, chunk_size=None, using=None):
+    """
+    Queue `task` once per argument tuple in `args_list`, packed into
+    TASK_CHUNK_SIZE-sized chunks sent as one Celery group (on commit).
+    """
+    args_list = [tuple(args) for args in args_list]
+    if not args_list:
+        return
+    chunk_size = chunk_size or getattr(settings, 'TASK_CHUNK_SIZE', 50)
+
+    def _send():
+        try:
+            task.chunks(args_list, chunk_size).group().apply_async()
+            logger.info(f"Queued {task.name} for {len(args_list)} items in chunks of {chunk_size}")
+        except Exception as e:
+            logger.error(f"Failed to queue {task.name} in chunks: {e}")
+
+    transaction.on_commit(_send, using=using)
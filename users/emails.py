@@ -0,0 +1,149 @@
+# users/emails.py
+"""
+Email rendering pipeline for users app
+======================================
+Every transactional email is made of three templates in templates/emails/:
+
+    <name>.html        static shell (<head>, CSS, wrapper) with {{ email_body }}
+    <name>_body.html   per-recipient fragment
+    <name>.txt         plain-text alternative (no strip_tags pass)
+
+- Compiled templates are kept per process and warmed when a Celery worker
+  starts (see website/celery.py).
+- The shell is rendered once per process with the static site context and
+  only the body fragment is rendered per message.
+- render_email(..., cache_key=...) keeps the finished message in Redis so
+  task retries and resends reuse it.
+
+Usage:
+    message = build_email('welcome_email', subject, {'user': user}, [user.email])
+    message.send()
+
+Author: Isaac
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMultiAlternatives
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+from functools import lru_cache
+import logging
+
+logger = logging.getLogger(__name__)
+
+EMAIL_TEMPLATES = (
+    'welcome_email',
+    'quote_confirmation',
+    'quote_admin_notification',
+    'quote_admin_digest',
+    'analytics_report',
+)
+
+# Marker the shell is rendered with; split on it to get the (head, tail) halves
+BODY_MARKER = '<!--email-body-->'
+
+
+# ============================================================================
+# CACHED BUILDING BLOCKS
+# ============================================================================
+
+@lru_cache(maxsize=None)
+def _get_template(template_name):
+    """Compiled template, loaded once per process"""
+    return get_template(template_name)
+
+
+@lru_cache(maxsize=None)
+def get_static_email_context():
+    """Site-wide values shared by every email"""
+    company = settings.ONEHUX_COMPANY_INFO
+    return {
+        'site_name': company.get('NAME', 'Onehux Web Service'),
+        'site_url': settings.BASE_URL,
+        'login_url': f"{settings.BASE_URL}/login/",
+        'dashboard_url': f"{settings.BASE_URL}/dashboard/",
+        'contact_email': company['CONTACT_EMAIL'],
+        'support_phone': company['PHONE_SUPPORT'],
+    }
+
+
+@lru_cache(maxsize=None)
+def _render_shell(name):
+    """Render the static shell once and split it around the body"""
+    context = dict(get_static_email_context(), email_body=mark_safe(BODY_MARKER))
+    html = _get_template(f'emails/{name}.html').render(context)
+    head, _, tail = html.partition(BODY_MARKER)
+    return head, tail
+
+
+@receiver(setting_changed)
+def reset_email_templates(**kwargs):
+    """Drop cached templates/context when settings change (tests)"""
+    _get_template.cache_clear()
+    get_static_email_context.cache_clear()
+    _render_shell.cache_clear()
+
+
+def warm_email_templates():
+    """Compile every email template and pre-render the shells"""
+    for name in EMAIL_TEMPLATES:
+        try:
+            _get_template(f'emails/{name}_body.html')
+            _get_template(f'emails/{name}.txt')
+            _render_shell(name)
+        except Exception as e:
+            logger.error(f"Failed to warm email template {name}: {e}")
+
+
+# ============================================================================
+# RENDERING
+# ============================================================================
+
+def render_email(name, context, cache_key=None):
+    """
+    Return (text, html) for the email `name` rendered with `context`.
+    With `cache_key` the result is cached for EMAIL_RENDER_CACHE_TIMEOUT.
+    """
+    if cache_key:
+        cache_key = f'email_render:{name}:{cache_key}'
+        try:
+            cached = cache.get(cache_key)
+        except Exception as e:
+            logger.error(f"Email render cache read failed: {e}")
+            cached = None
+        if cached:
+            return cached['text'], cached['html']
+
+    context = {**get_static_email_context(), **context}
+    head, tail = _render_shell(name)
+    html = head + _get_template(f'emails/{name}_body.html').render(context) + tail
+    text = _get_template(f'emails/{name}.txt').render(context).strip() + '\n'
+
+    if cache_key:
+        try:
+            cache.set(
+                cache_key,
+                {'text': text, 'html': html},
+                getattr(settings, 'EMAIL_RENDER_CACHE_TIMEOUT', 3600)
+            )
+        except Exception as e:
+            logger.error(f"Email render cache write failed: {e}")
+
+    return text, html
+
+
+def build_email(name, subject, context, to, from_email=None, cache_key=None, connection=None):
+    """Build a multipart EmailMultiAlternatives from the email `name`"""
+    text, html = render_email(name, context, cache_key=cache_key)
+    email = EmailMultiAlternatives(
+        subject=subject,
+        body=text,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=to,
+        connection=connection,
+    )
+    email.attach_alternative(html, "text/html")
+    return email
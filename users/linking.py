@@ -0,0 +1,67 @@
+# users/linking.py
+"""
+Quote ownership linking
+=======================
+Quotes submitted anonymously are attached to the account with the same
+email, so "my quotes" lookups can use the single indexed predicate
+`user = ?` (index on user, created_at) instead of `user = ? OR email = ?`.
+
+Links are made:
+    - when a user signs up (users.signals.user_post_save)
+    - when a quote is submitted with a registered email (quote_pre_save)
+    - for historical rows by the backfill_quote_users task / command
+
+Author: Isaac
+"""
+
+from django.contrib.auth import get_user_model
+from django.db.models import OuterRef, Subquery
+import logging
+
+from .models import WebsiteQuote
+from .dashboard import invalidate_user_dashboard
+
+logger = logging.getLogger(__name__)
+
+
+def find_user_for_email(email):
+    """Registered user owning `email`, if any"""
+    if not email:
+        return None
+    return get_user_model().objects.filter(email=email).only('pk').first()
+
+
+def link_quotes_to_user(user):
+    """Attach the user's unlinked quotes (matched by email); returns the count"""
+    linked = WebsiteQuote.objects.filter(user__isnull=True, email=user.email).update(user=user)
+    if linked:
+        invalidate_user_dashboard(user.pk)  # update() bypasses the quote signals
+        logger.info(f"Linked {linked} quotes to user {user.email}")
+    return linked
+
+
+def backfill_quote_users(batch_size=1000):
+    """
+    Link every unlinked quote whose email belongs to a registered user.
+    Works in batches of primary keys to keep each UPDATE (and its locks) short.
+    Returns the number of quotes linked.
+    """
+    User = get_user_model()
+    owner = User.objects.filter(email=OuterRef('email')).values('pk')[:1]
+    total = 0
+
+    while True:
+        batch = list(
+            WebsiteQuote.objects.filter(
+                user__isnull=True,
+                email__in=User.objects.values('email'),
+            ).values_list('pk', flat=True)[:batch_size]
+        )
+        if not batch:
+            break
+        linked = WebsiteQuote.objects.filter(pk__in=batch)
+        total += linked.update(user=Subquery(owner))
+        invalidate_user_dashboard(*linked.values_list('user_id', flat=True).distinct())
+
+    logger.info(f"Quote user backfill linked {total} quotes")
+    return total
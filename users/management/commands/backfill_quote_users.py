@@ -0,0 +1,37 @@
+# users/management/commands/backfill_quote_users.py
+"""
+Link historical quotes to user accounts
+=======================================
+Attaches anonymous quotes to the account registered with the same email.
+Run once after deploying the (user, created_at) index; new quotes and
+signups are linked automatically.
+
+Usage:
+    python manage.py backfill_quote_users
+    python manage.py backfill_quote_users --async   # queue on Celery instead
+
+Author: Isaac
+"""
+
+from django.core.management.base import BaseCommand
+
+from users import linking
+from users.tasks import backfill_quote_users
+
+
+class Command(BaseCommand):
+    help = 'Link anonymous quotes to the user accounts registered with their email'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--async', action='store_true', dest='run_async',
+                            help='Queue the backfill as a Celery task')
+
+    def handle(self, *args, **options):
+        if options['run_async']:
+            backfill_quote_users.delay()
+            self.stdout.write(self.style.SUCCESS("Quote user backfill queued"))
+            return
+
+        linked = linking.backfill_quote_users(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Linked {linked} quotes to user accounts"))
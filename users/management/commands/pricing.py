@@ -0,0 +1,54 @@
+# users/management/commands/pricing.py
+"""
+Publish cost estimator pricing at runtime
+=========================================
+Stores a pricing table (QUOTE_PRICING format, as JSON) in the default cache.
+Every web worker picks it up within PRICING_CHECK_INTERVAL seconds, no
+redeploy needed. `reset` goes back to settings.QUOTE_PRICING.
+
+Usage:
+    python manage.py pricing publish prices.json
+    python manage.py pricing reset
+    python manage.py pricing status
+
+Author: Isaac
+"""
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+import json
+
+from users.pricing import (
+    PUBLISHED_PRICING_KEY, get_pricing_table, publish_pricing, reload_pricing, unpublish_pricing,
+)
+
+
+class Command(BaseCommand):
+    help = 'Publish, reset or show the live cost estimator pricing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['publish', 'reset', 'status'])
+        parser.add_argument('file', nargs='?', help='JSON pricing file (publish)')
+
+    def handle(self, *args, **options):
+        action = options['action']
+
+        if action == 'publish':
+            if not options['file']:
+                raise CommandError('publish needs a JSON pricing file')
+            try:
+                with open(options['file']) as f:
+                    pricing = json.load(f)
+                publish_pricing(pricing)
+            except (OSError, ValueError, TypeError, AttributeError) as e:
+                raise CommandError(f'Invalid pricing file: {e}')
+        elif action == 'reset':
+            unpublish_pricing()
+        else:
+            reload_pricing()
+
+        table = get_pricing_table()
+        source = 'published' if cache.get(PUBLISHED_PRICING_KEY) else 'settings'
+        self.stdout.write(self.style.SUCCESS(
+            f'Pricing {table.version} ({source}, {len(table.features)} features)'
+        ))
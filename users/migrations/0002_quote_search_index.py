@@ -0,0 +1,53 @@
+# users/migrations/0002_quote_search_index.py
+"""
+Full-text and trigram search indexes for WebsiteQuote (PostgreSQL only).
+The search_vector column is not a model field; it is maintained by the
+database and queried from WebsiteQuoteAdmin.get_search_results().
+"""
+
+from django.db import migrations
+
+FORWARD_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    ALTER TABLE users_website_quote
+    ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(full_name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(company_name, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(project_description, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS users_quote_search_vector_gin "
+    "ON users_website_quote USING gin (search_vector)",
+    "CREATE INDEX IF NOT EXISTS users_quote_email_trgm "
+    "ON users_website_quote USING gin (email gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS users_quote_phone_trgm "
+    "ON users_website_quote USING gin (phone gin_trgm_ops)",
+]
+
+REVERSE_SQL = [
+    "DROP INDEX IF EXISTS users_quote_phone_trgm",
+    "DROP INDEX IF EXISTS users_quote_email_trgm",
+    "DROP INDEX IF EXISTS users_quote_search_vector_gin",
+    "ALTER TABLE users_website_quote DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def _run(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(FORWARD_SQL), _run(REVERSE_SQL)),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-18 01:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_quote_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='websitequote',
+            index=models.Index(fields=['user', '-created_at'], name='users_quote_user_created_idx'),
+        ),
+    ]
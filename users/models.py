@@ -15,6 +15,80 @@ from django.urls import reverse
 import uuid
 
 
+# ============================================================================
+# FIELD CHANGE TRACKING
+# ============================================================================
+
+class TrackedFieldsMixin:
+    """
+    Remember the database values of `tracked_fields` when an instance is
+    loaded, so signals and save() can tell what changed without re-reading
+    the row.
+
+    Usage:
+        class MyModel(TrackedFieldsMixin, models.Model):
+            tracked_fields = ('status',)
+
+        obj.has_changed('status')    # True / False
+        obj.get_previous('status')   # value loaded from the database
+        obj.changed_fields()         # {'status': (old, new)}
+
+    The snapshot is still the pre-save state inside pre_save/post_save
+    handlers and is reset once save() returns. Deferred fields are not
+    snapshotted; QuerySet.update() bypasses tracking entirely.
+    """
+
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._reset_tracked_fields()
+        return instance
+
+    def _reset_tracked_fields(self, fields=None):
+        """Snapshot current values of the (loaded) tracked fields"""
+        snapshot = self.__dict__.setdefault('_tracked_initial', {})
+        for name in self.tracked_fields if fields is None else fields:
+            attname = self._meta.get_field(name).attname
+            if attname in self.__dict__:
+                snapshot[name] = self.__dict__[attname]
+
+    def has_snapshot(self, field):
+        """Whether the database value of `field` is known"""
+        return field in self.__dict__.get('_tracked_initial', {})
+
+    def get_previous(self, field):
+        """Value of `field` when loaded (None for new/unloaded instances)"""
+        return self.__dict__.get('_tracked_initial', {}).get(field)
+
+    def has_changed(self, field):
+        """True if `field` differs from its loaded value (always True when unknown)"""
+        if not self.has_snapshot(field):
+            return True
+        return self.get_previous(field) != getattr(self, self._meta.get_field(field).attname)
+
+    def changed_fields(self):
+        """{field: (previous, current)} for every changed tracked field"""
+        return {
+            name: (self.get_previous(name), getattr(self, self._meta.get_field(name).attname))
+            for name in self.tracked_fields
+            if self.has_changed(name)
+        }
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            self._reset_tracked_fields()
+        else:
+            self._reset_tracked_fields([f for f in self.tracked_fields if f in update_fields])
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._reset_tracked_fields()
+
+
 class User(AbstractUser):
     """
     Custom User model extending Django's AbstractUser
@@ -126,11 +200,13 @@ class User(AbstractUser):
         return self.email[0].upper()
 
 
-class WebsiteQuote(models.Model):
+class WebsiteQuote(TrackedFieldsMixin, models.Model):
     """
     Model to store website development quote requests
     """
     
+    tracked_fields = ('status', 'website_type', 'user')
+    
     WEBSITE_TYPES = [
         ('business', _('Business Website')),
         ('ecommerce', _('E-commerce Store')),
@@ -274,6 +350,8 @@ class WebsiteQuote(models.Model):
             models.Index(fields=['status']),
             models.Index(fields=['created_at']),
             models.Index(fields=['email']),
+            # "My quotes" lookups: WHERE user_id = ? ORDER BY created_at DESC
+            models.Index(fields=['user', '-created_at'], name='users_quote_user_created_idx'),
         ]
     
     def __str__(self):
@@ -293,11 +371,13 @@ class WebsiteQuote(models.Model):
         return "Not estimated"
 
 
-class Newsletter(models.Model):
+class Newsletter(TrackedFieldsMixin, models.Model):
     """
     Model to store newsletter subscriptions
     """
     
+    tracked_fields = ('is_active',)
+    
     email = models.EmailField(unique=True)
     name = models.CharField(max_length=255, blank=True)
     is_active = models.BooleanField(default=True)
@@ -0,0 +1,232 @@
+# users/pagination.py
+"""
+Paginators for users app
+========================
+KeysetPaginator walks a queryset newest-first by (created_at, id) using
+opaque cursors, with no OFFSET and no COUNT query:
+
+    page = KeysetPaginator(quotes, 10).get_page(request.GET.get('cursor'))
+    page.object_list, page.has_next(), page.next_cursor
+
+EstimatedCountPaginator avoids `SELECT COUNT(*)` over large tables in the
+admin changelists (PostgreSQL only, other databases count exactly):
+
+- Unfiltered listings use the planner estimate from pg_class.reltuples once
+  the table is larger than ADMIN_COUNT_ESTIMATE_THRESHOLD rows.
+- Filtered listings are counted exactly within ADMIN_COUNT_TIMEOUT_MS; if the
+  count is cancelled the EXPLAIN row estimate is used instead.
+
+Enable per ModelAdmin:
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+Author: Isaac
+"""
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import OperationalError, connections, transaction
+from django.db.models import Q
+from django.utils.functional import cached_property
+import base64
+import binascii
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator using PostgreSQL estimates instead of exact COUNT(*) on big tables"""
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not hasattr(queryset, 'query') or connections[queryset.db].vendor != 'postgresql':
+            return super().count
+
+        if self._is_unfiltered(queryset):
+            estimate = self._table_estimate(queryset)
+            threshold = getattr(settings, 'ADMIN_COUNT_ESTIMATE_THRESHOLD', 10000)
+            if estimate is not None and estimate >= threshold:
+                return estimate
+
+        return self._count_with_budget(queryset)
+
+    @staticmethod
+    def _is_unfiltered(queryset):
+        query = queryset.query
+        return not (
+            query.where or query.distinct or query.combinator
+            or query.low_mark or query.high_mark is not None
+        )
+
+    @staticmethod
+    def _table_estimate(queryset):
+        """Row estimate maintained by ANALYZE/autovacuum (None if never analyzed)"""
+        try:
+            with connections[queryset.db].cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [queryset.model._meta.db_table]
+                )
+                row = cursor.fetchone()
+        except Exception as e:
+            logger.error(f"Failed to read row estimate for {queryset.model._meta.db_table}: {e}")
+            return None
+        # -1 means the table has never been analyzed
+        if not row or row[0] < 0:
+            return None
+        return int(row[0])
+
+    @staticmethod
+    def _plan_estimate(queryset):
+        """Planner row estimate for a filtered queryset"""
+        try:
+            sql, params = queryset.order_by().query.sql_with_params()
+            with connections[queryset.db].cursor() as cursor:
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+                plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]['Plan']['Plan Rows'])
+        except Exception as e:
+            logger.error(f"Failed to estimate changelist count: {e}")
+            return None
+
+    def _count_with_budget(self, queryset):
+        """Exact count, cancelled after ADMIN_COUNT_TIMEOUT_MS"""
+        timeout_ms = getattr(settings, 'ADMIN_COUNT_TIMEOUT_MS', 200)
+        try:
+            with transaction.atomic(using=queryset.db):
+                with connections[queryset.db].cursor() as cursor:
+                    cursor.execute(
+                        "SELECT current_setting('statement_timeout'), "
+                        "set_config('statement_timeout', %s, true)",
+                        [str(timeout_ms)]
+                    )
+                    previous = cursor.fetchone()[0]
+                    count = queryset.count()
+                    # SET LOCAL outlives a released savepoint, so restore it
+                    # for the rest of an enclosing transaction
+                    cursor.execute("SELECT set_config('statement_timeout', %s, true)", [previous])
+                return count
+        except OperationalError:
+            logger.warning(
+                f"Exact count for {queryset.model._meta.label} exceeded {timeout_ms}ms, using estimate"
+            )
+
+        estimate = self._plan_estimate(queryset)
+        if estimate is None:
+            return queryset.count()
+        return estimate
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class KeysetPage:
+    """One page of a KeysetPaginator: iterate it, or use object_list"""
+
+    def __init__(self, object_list, next_cursor, cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.cursor = cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __repr__(self):
+        return f'<KeysetPage of {len(self.object_list)} after {self.cursor or "start"}>'
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.cursor is not None
+
+
+class KeysetPaginator:
+    """
+    Cursor pagination over (`key_field`, pk), newest first.
+
+    Each page reads `per_page + 1` rows after the cursor position; the extra
+    row only tells whether there is a next page. The cursor is the url-safe
+    base64 JSON of the last row's (key_field, pk), so it is opaque to clients
+    and stable while rows are inserted. Back it with an index ending in
+    (key_field DESC), e.g. (user, -created_at) for a user's quotes.
+    """
+
+    def __init__(self, queryset, per_page, key_field='created_at'):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.key_field = key_field
+        self._key = queryset.model._meta.get_field(key_field)
+        self._pk = queryset.model._meta.pk
+
+    def encode_cursor(self, obj):
+        values = [
+            self._key.value_to_string(obj),
+            self._pk.value_to_string(obj),
+        ]
+        return base64.urlsafe_b64encode(json.dumps(values, separators=(',', ':')).encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """(key_value, pk_value) from a cursor; raises InvalidCursor"""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            key_value, pk_value = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            key_value = self._key.to_python(key_value)
+            pk_value = self._pk.to_python(pk_value)
+        except (TypeError, ValueError, binascii.Error, ValidationError) as e:
+            raise InvalidCursor(f"Invalid cursor: {cursor!r}") from e
+        if key_value is None or pk_value is None:
+            raise InvalidCursor(f"Invalid cursor: {cursor!r}")
+        return key_value, pk_value
+
+    def _page_queryset(self, cursor):
+        queryset = self.queryset.order_by(f'-{self.key_field}', '-pk')
+        if cursor:
+            key_value, pk_value = self.decode_cursor(cursor)
+            # key <= k AND (key < k OR pk < p): the first term is an index range
+            queryset = queryset.filter(
+                Q(**{f'{self.key_field}__lte': key_value}),
+                Q(**{f'{self.key_field}__lt': key_value}) | Q(pk__lt=pk_value, **{self.key_field: key_value}),
+            )
+        return queryset[:self.per_page + 1]
+
+    def _make_page(self, rows, cursor):
+        next_cursor = None
+        if len(rows) > self.per_page:
+            rows = rows[:self.per_page]
+            next_cursor = self.encode_cursor(rows[-1])
+        return KeysetPage(rows, next_cursor, cursor=cursor or None)
+
+    def page(self, cursor=None):
+        """Rows after `cursor` (the first page when None); raises InvalidCursor"""
+        return self._make_page(list(self._page_queryset(cursor)), cursor)
+
+    async def apage(self, cursor=None):
+        """Async version of page() for async views"""
+        return self._make_page([obj async for obj in self._page_queryset(cursor)], cursor)
+
+    def get_page(self, cursor=None):
+        """Like page(), but an unreadable cursor returns the first page"""
+        try:
+            return self.page(cursor)
+        except InvalidCursor:
+            logger.warning(f"Ignoring invalid pagination cursor: {cursor!r}")
+            return self.page()
+
+    async def aget_page(self, cursor=None):
+        """Async version of get_page()"""
+        try:
+            return await self.apage(cursor)
+        except InvalidCursor:
+            logger.warning(f"Ignoring invalid pagination cursor: {cursor!r}")
+            return await self.apage()
@@ -0,0 +1,208 @@
+# users/pricing.py
+"""
+Cost estimator pricing table
+============================
+Immutable, per-process pricing model behind users.views.estimate_cost.
+
+- Built from settings.QUOTE_PRICING, or from pricing published at runtime
+  with publish_pricing() / `python manage.py pricing publish prices.json`.
+  Published pricing lives in the default cache (no expiry); every worker
+  re-checks it at most every PRICING_CHECK_INTERVAL seconds and rebuilds
+  its table when the published version changes, no redeploy needed.
+- Features are numbered in a fixed order; a combination of features is a
+  bitmask, and the total for every website type x feature combination is
+  precomputed, so an estimate is a single tuple lookup.
+- `version` is a hash of the pricing data. Responses are cached by
+  browsers/nginx per version, so changing a price invalidates them.
+
+Usage:
+    table = get_pricing_table()          # await aget_pricing_table() in async views
+    table.estimate('business', ['cms', 'seo'])
+
+Author: Isaac
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from functools import lru_cache
+from types import MappingProxyType
+import hashlib
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+PUBLISHED_PRICING_KEY = 'pricing:published'
+
+# Above this many features the 2**n matrix is not precomputed
+MAX_PRECOMPUTED_FEATURES = 16
+
+
+class PricingTable:
+    """Read-only pricing data with precomputed combination totals"""
+
+    __slots__ = ('default_base', 'base_costs', 'feature_costs', 'features', 'feature_bits', 'version', '_totals')
+
+    def __init__(self, base_costs, feature_costs, default_base):
+        self.default_base = int(default_base)
+        self.base_costs = MappingProxyType({key: int(value) for key, value in base_costs.items()})
+        self.feature_costs = MappingProxyType({key: int(value) for key, value in feature_costs.items()})
+        self.features = tuple(sorted(self.feature_costs))
+        self.feature_bits = MappingProxyType({name: 1 << index for index, name in enumerate(self.features)})
+        self.version = hashlib.md5(json.dumps(
+            [self.default_base, dict(self.base_costs), dict(self.feature_costs)], sort_keys=True
+        ).encode()).hexdigest()[:12]
+        self._totals = self._precompute() if len(self.features) <= MAX_PRECOMPUTED_FEATURES else None
+
+    def _precompute(self):
+        """{website_type: tuple of totals indexed by feature bitmask}"""
+        costs = [self.feature_costs[name] for name in self.features]
+        extras = [0] * (1 << len(costs))
+        for mask in range(1, len(extras)):
+            # Reuse the total without the lowest set bit
+            low = mask & -mask
+            extras[mask] = extras[mask ^ low] + costs[low.bit_length() - 1]
+
+        totals = {
+            website_type: tuple(base + extra for extra in extras)
+            for website_type, base in self.base_costs.items()
+        }
+        totals[None] = tuple(self.default_base + extra for extra in extras)
+        return MappingProxyType(totals)
+
+    def mask_for(self, features):
+        """Bitmask of the known features (unknown ones are ignored)"""
+        mask = 0
+        for name in features:
+            mask |= self.feature_bits.get(name, 0)
+        return mask
+
+    def total(self, website_type, mask):
+        base = self.base_costs.get(website_type, self.default_base)
+        if self._totals is None:
+            return base + sum(self.feature_costs[name] for name, bit in self.feature_bits.items() if mask & bit)
+        row = self._totals.get(website_type if website_type in self.base_costs else None)
+        return row[mask]
+
+    def estimate(self, website_type, features):
+        """The estimate_cost payload for one type/features combination"""
+        base_cost = self.base_costs.get(website_type, self.default_base)
+        total_estimate = self.total(website_type, self.mask_for(features))
+        return {
+            'base_cost': base_cost,
+            'additional_cost': total_estimate - base_cost,
+            'total_estimate': total_estimate,
+            'formatted_estimate': f"${total_estimate:,}",
+        }
+
+
+def build_pricing_table(pricing):
+    """PricingTable from a QUOTE_PRICING-style dict"""
+    return PricingTable(
+        pricing.get('BASE_COSTS', {}),
+        pricing.get('FEATURE_COSTS', {}),
+        pricing.get('DEFAULT_BASE_COST', 1000),
+    )
+
+
+@lru_cache(maxsize=1)
+def _settings_table():
+    table = build_pricing_table(getattr(settings, 'QUOTE_PRICING', {}))
+    logger.info(f"Pricing table {table.version} loaded from settings ({len(table.features)} features)")
+    return table
+
+
+# Per-process table and the time the published pricing was last checked
+_table = None
+_checked_at = 0.0
+
+
+def _check_due():
+    """Whether this process should look for published pricing now"""
+    global _checked_at
+    now = time.monotonic()
+    if _table is not None and now - _checked_at < getattr(settings, 'PRICING_CHECK_INTERVAL', 30):
+        return False
+    _checked_at = now
+    return True
+
+
+def _use_published(published):
+    """Switch to `published` pricing (settings when None) unless already on it"""
+    global _table
+    if published is None:
+        _table = _settings_table()
+    elif _table is None or _table.version != published['version']:
+        _table = build_pricing_table(published['pricing'])
+        logger.info(f"Pricing table {_table.version} loaded from published pricing")
+    return _table
+
+
+def get_pricing_table():
+    """
+    The current PricingTable: published pricing if any, settings otherwise.
+    The cache is read at most once per PRICING_CHECK_INTERVAL seconds.
+    """
+    if not _check_due():
+        return _table
+    try:
+        published = cache.get(PUBLISHED_PRICING_KEY)
+    except Exception as e:
+        logger.error(f"Failed to read published pricing: {e}")
+        return _table or _settings_table()
+    return _use_published(published)
+
+
+async def aget_pricing_table():
+    """Async version of get_pricing_table() (async cache read)"""
+    if not _check_due():
+        return _table
+    try:
+        published = await cache.aget(PUBLISHED_PRICING_KEY)
+    except Exception as e:
+        logger.error(f"Failed to read published pricing: {e}")
+        return _table or _settings_table()
+    return _use_published(published)
+
+
+def publish_pricing(pricing):
+    """
+    Make `pricing` (QUOTE_PRICING format) the live pricing for every worker.
+    Returns the new PricingTable; raises ValueError/TypeError on bad prices.
+    """
+    table = build_pricing_table(pricing)
+    cache.set(PUBLISHED_PRICING_KEY, {
+        'version': table.version,
+        'pricing': {
+            'DEFAULT_BASE_COST': table.default_base,
+            'BASE_COSTS': dict(table.base_costs),
+            'FEATURE_COSTS': dict(table.feature_costs),
+        },
+    }, None)
+    reload_pricing()
+    logger.warning(f"Pricing {table.version} published")
+    return table
+
+
+def unpublish_pricing():
+    """Drop published pricing; workers fall back to settings.QUOTE_PRICING"""
+    cache.delete(PUBLISHED_PRICING_KEY)
+    reload_pricing()
+    logger.warning("Published pricing removed, using settings")
+
+
+def reload_pricing():
+    """Drop this process's table; the next lookup rebuilds it"""
+    global _table, _checked_at
+    _table = None
+    _checked_at = 0.0
+    _settings_table.cache_clear()
+
+
+@receiver(setting_changed)
+def reset_pricing(setting, **kwargs):
+    if setting == 'QUOTE_PRICING':
+        reload_pricing()
@@ -0,0 +1,58 @@
+# users/search.py
+"""
+Quote search for users app
+==========================
+Ranked PostgreSQL search over WebsiteQuote, backed by the indexes from
+migration 0002_quote_search_index:
+
+- search_vector (GIN): full name (A), company (B), project description (C),
+  matched with prefix queries so partial words work in the admin
+- email / phone (trigram GIN): substring matches via ILIKE
+
+Other databases return None so callers can fall back to Django's search.
+
+Author: Isaac
+"""
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField
+from django.db.models.expressions import RawSQL
+import re
+
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+QUOTE_TABLE = 'users_website_quote'
+
+
+def build_prefix_query(term):
+    """'john sm' -> 'john:* & sm:*' (only word characters, safe for to_tsquery)"""
+    return ' & '.join(f'{word}:*' for word in _WORD_RE.findall(term.lower()))
+
+
+def search_quotes(queryset, term):
+    """
+    Filter `queryset` to quotes matching `term`, annotated with `search_rank`.
+    Returns None when full-text search is not available (non-PostgreSQL).
+    """
+    if connections[queryset.db].vendor != 'postgresql':
+        return None
+
+    term = term.strip()
+    like = '%{}%'.format(term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_'))
+    tsquery = build_prefix_query(term)
+
+    conditions = [f'"{QUOTE_TABLE}"."email" ILIKE %s', f'"{QUOTE_TABLE}"."phone" ILIKE %s']
+    params = [like, like]
+    if tsquery:
+        conditions.insert(0, f'"{QUOTE_TABLE}"."search_vector" @@ to_tsquery(\'simple\', %s)')
+        params.insert(0, tsquery)
+        rank = RawSQL(
+            f'ts_rank("{QUOTE_TABLE}"."search_vector", to_tsquery(\'simple\', %s))',
+            [tsquery], output_field=FloatField()
+        )
+    else:
+        rank = RawSQL('0', [], output_field=FloatField())
+
+    return queryset.filter(
+        RawSQL(' OR '.join(f'({c})' for c in conditions), params, output_field=BooleanField())
+    ).annotate(search_rank=rank)
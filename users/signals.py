@@ -17,6 +17,10 @@ import logging
 
 from .models import WebsiteQuote, Newsletter
 from .tasks import send_quote_email, send_welcome_email
+from . import stats, analytics, linking
+from .dashboard import invalidate_user_dashboard
+from .dispatch import enqueue_once
+from .transitions import quotes_transitioned
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -33,17 +37,18 @@ def user_post_save(sender, instance, created, **kwargs):
     """
     if created:
         # Send welcome email for new users
-        try:
-            send_welcome_email.delay(instance.id)
-            logger.info(f"Welcome email queued for user {instance.email}")
-        except Exception as e:
-            logger.error(f"Failed to queue welcome email for {instance.email}: {e}")
+        # (single source of truth: queued once, after the transaction commits)
+        enqueue_once(send_welcome_email, instance.id, event=f'user:{instance.pk}')
+        
+        # Attach quotes submitted with this email before signing up
+        linking.link_quotes_to_user(instance)
         
         # Clear user-related cache
         cache.delete_many([
             'user_count',
             'recent_users',
-            'user_stats'
+            'user_stats',
+            'dashboard_stats'
         ])
         
         logger.info(f"New user created: {instance.email}")
@@ -51,6 +56,20 @@ def user_post_save(sender, instance, created, **kwargs):
     else:
         # Handle user updates
         logger.debug(f"User updated: {instance.email}")
+        
+        # Active user count only changes when is_active may have been saved
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'is_active' in update_fields:
+            cache.delete('dashboard_stats')
+
+
+@receiver(post_delete, sender=User)
+def user_post_delete(sender, instance, **kwargs):
+    """
+    Handle post-delete actions for User model
+    """
+    clear_user_cache()
+    cache.delete('dashboard_stats')
 
 
 @receiver(user_logged_in)
@@ -97,31 +116,46 @@ def quote_post_save(sender, instance, created, **kwargs):
     """
     if created:
         # Send quote emails for new quotes
-        try:
-            send_quote_email.delay(instance.id)
-            logger.info(f"Quote emails queued for quote {instance.id}")
-        except Exception as e:
-            logger.error(f"Failed to queue quote emails for {instance.id}: {e}")
+        # (single source of truth: queued once, after the transaction commits)
+        enqueue_once(send_quote_email, instance.id, event=f'quote:{instance.pk}')
         
         # Clear quote-related cache
         cache.delete_many([
             'quote_count',
             'recent_quotes',
             'quote_stats',
-            'popular_website_types'
+            'popular_website_types',
+            'dashboard_stats'
         ])
         
+        # Update homepage counters
+        stats.record_quote_created(instance)
+        invalidate_user_dashboard(instance.user_id)
+        
         logger.info(f"New quote created: {instance.id} from {instance.email}")
     
     else:
         # Handle quote updates
         logger.debug(f"Quote updated: {instance.id} - Status: {instance.status}")
         
+        # Move the quote between homepage counters
+        if instance.has_snapshot('status') and instance.has_snapshot('website_type'):
+            if instance.has_changed('status') or instance.has_changed('website_type'):
+                stats.record_quote_changed(
+                    instance,
+                    instance.get_previous('status'),
+                    instance.get_previous('website_type'),
+                )
+        
         # Clear cache when quote status changes
         cache.delete_many([
             'quote_stats',
-            'recent_quotes'
+            'recent_quotes',
+            'dashboard_stats'
         ])
+        
+        # Owner's dashboard (and the previous owner's, if reassigned)
+        invalidate_user_dashboard(instance.user_id, instance.get_previous('user'))
 
 
 @receiver(pre_save, sender=WebsiteQuote)
@@ -129,20 +163,17 @@ def quote_pre_save(sender, instance, **kwargs):
     """
     Handle pre-save actions for WebsiteQuote model
     """
-    if instance.pk:  # Existing quote
-        try:
-            old_instance = WebsiteQuote.objects.get(pk=instance.pk)
-            
-            # Log status changes
-            if old_instance.status != instance.status:
-                logger.info(f"Quote {instance.id} status changed: {old_instance.status} -> {instance.status}")
-                
-                # Set contacted_at when status changes to contacted
-                if instance.status == 'contacted' and not instance.contacted_at:
-                    instance.contacted_at = timezone.now()
+    # New quote from a registered email: link it to the account
+    if instance._state.adding and instance.user_id is None:
+        instance.user = linking.find_user_for_email(instance.email)
+    
+    # Compare against the values loaded from the database (no extra query)
+    if instance.has_snapshot('status') and instance.has_changed('status'):
+        logger.info(f"Quote {instance.id} status changed: {instance.get_previous('status')} -> {instance.status}")
         
-        except WebsiteQuote.DoesNotExist:
-            pass
+        # Set contacted_at when status changes to contacted
+        if instance.status == 'contacted' and not instance.contacted_at:
+            instance.contacted_at = timezone.now()
 
 
 @receiver(post_delete, sender=WebsiteQuote)
@@ -152,15 +183,38 @@ def quote_post_delete(sender, instance, **kwargs):
     """
     logger.info(f"Quote deleted: {instance.id} from {instance.email}")
     
+    # Update homepage counters
+    stats.record_quote_deleted(instance)
+    invalidate_user_dashboard(instance.user_id)
+    
     # Clear quote-related cache
     cache.delete_many([
         'quote_count',
         'recent_quotes',
         'quote_stats',
-        'popular_website_types'
+        'popular_website_types',
+        'dashboard_stats'
     ])
 
 
+@receiver(quotes_transitioned)
+def quotes_transitioned_handler(sender, quote_ids, from_counts, to_status, actor=None, user_ids=(), **kwargs):
+    """
+    Handle bulk status changes made by users.transitions.bulk_transition
+    """
+    changes = ', '.join(f'{count} {status}' for status, count in from_counts.items())
+    logger.info(
+        f"{len(quote_ids)} quotes moved to {to_status} ({changes})"
+        f"{f' by {actor.email}' if actor else ''}"
+    )
+    
+    # Move the quotes between homepage counters
+    stats.record_quotes_transitioned(from_counts, to_status)
+    invalidate_user_dashboard(*user_ids)
+    
+    clear_quote_cache()
+
+
 # ============================================================================
 # NEWSLETTER SIGNALS
 # ============================================================================
@@ -174,12 +228,14 @@ def newsletter_post_save(sender, instance, created, **kwargs):
         logger.info(f"New newsletter subscription: {instance.email}")
         
         # Clear newsletter cache
-        cache.delete('newsletter_count')
-        cache.delete('newsletter_stats')
+        cache.delete_many(['newsletter_count', 'newsletter_stats', 'dashboard_stats'])
     
     else:
         # Handle newsletter updates
         logger.debug(f"Newsletter subscription updated: {instance.email} - Active: {instance.is_active}")
+        
+        if instance.has_changed('is_active'):
+            cache.delete('dashboard_stats')
 
 
 @receiver(post_delete, sender=Newsletter)
@@ -190,8 +246,7 @@ def newsletter_post_delete(sender, instance, **kwargs):
     logger.info(f"Newsletter subscription deleted: {instance.email}")
     
     # Clear newsletter cache
-    cache.delete('newsletter_count')
-    cache.delete('newsletter_stats')
+    cache.delete_many(['newsletter_count', 'newsletter_stats', 'dashboard_stats'])
 
 
 # ============================================================================
@@ -215,7 +270,8 @@ def clear_quote_cache():
         'recent_quotes',
         'quote_stats',
         'popular_website_types',
-        'pending_quotes'
+        'pending_quotes',
+        'dashboard_stats'
     ])
 
 
@@ -287,48 +343,15 @@ def handle_user_creation_errors(sender, instance, created, **kwargs):
 @receiver(post_save, sender=WebsiteQuote)
 def track_quote_analytics(sender, instance, created, **kwargs):
     """
-    Track analytics for quote requests
+    Track analytics for quote requests (atomic Redis counters)
     """
     if created:
-        try:
-            # Track quote by type
-            cache_key = f"quote_type_count_{instance.website_type}"
-            current_count = cache.get(cache_key, 0)
-            cache.set(cache_key, current_count + 1, 86400)  # 24 hours
-            
-            # Track quote by budget range
-            cache_key = f"quote_budget_count_{instance.budget_range}"
-            current_count = cache.get(cache_key, 0)
-            cache.set(cache_key, current_count + 1, 86400)  # 24 hours
-            
-            # Track daily quote count
-            today = timezone.now().date()
-            cache_key = f"daily_quotes_{today}"
-            current_count = cache.get(cache_key, 0)
-            cache.set(cache_key, current_count + 1, 86400)  # 24 hours
-            
-        except Exception as e:
-            logger.error(f"Failed to track quote analytics: {e}")
+        analytics.track_quote(instance)
 
 
 @receiver(user_logged_in)
 def track_login_analytics(sender, request, user, **kwargs):
     """
-    Track login analytics
+    Track login analytics (atomic counter + HyperLogLog of unique users)
     """
-    try:
-        # Track daily logins
-        today = timezone.now().date()
-        cache_key = f"daily_logins_{today}"
-        current_count = cache.get(cache_key, 0)
-        cache.set(cache_key, current_count + 1, 86400)  # 24 hours
-        
-        # Track unique daily users
-        cache_key = f"daily_unique_users_{today}"
-        user_set = cache.get(cache_key, set())
-        user_set.add(user.id)
-        cache.set(cache_key, user_set, 86400)  # 24 hours
-        
-    except Exception as e:
-        logger.error(f"Failed to track login analytics: {e}")
-
+    analytics.track_login(user)
@@ -0,0 +1,186 @@
+# users/stats.py
+"""
+Quote statistics store
+======================
+Incrementally maintained quote counters kept in a single Redis hash.
+
+The quote signals update the counters in O(1) with HINCRBY once the
+transaction commits (a rolled-back save never moves them), and the
+homepage reads all of them with one HGETALL, so rendering the homepage
+never touches the quotes table. A periodic rebuild reconciles any drift.
+
+Author: Isaac
+"""
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from django_redis import get_redis_connection
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Cache keys (prefixed with the default cache KEY_PREFIX)
+STATS_HASH_KEY = 'quote_stats_hash'
+REBUILD_LOCK_KEY = 'quote_stats_rebuild_lock'
+
+# Hash field marking a fully built store
+BUILT_FIELD = '_built'
+
+ACTIVE_STATUSES = ('approved', 'in_progress')
+COMPLETED_STATUS = 'completed'
+
+
+def _hash_key():
+    """Return the fully prefixed Redis key of the stats hash"""
+    return cache.make_key(STATS_HASH_KEY)
+
+
+def _status_field(status):
+    return f'status:{status}'
+
+
+def _type_field(website_type):
+    return f'type:{website_type}'
+
+
+def _apply(increments):
+    """
+    Apply a list of (field, amount) increments in one round-trip once the
+    current transaction commits (right away outside a transaction)
+    """
+    transaction.on_commit(lambda: _write(increments))
+
+
+def _write(increments):
+    try:
+        pipe = get_redis_connection('default').pipeline(transaction=False)
+        key = _hash_key()
+        for field, amount in increments:
+            pipe.hincrby(key, field, amount)
+        pipe.execute()
+    except Exception as e:
+        logger.error(f"Failed to update quote stats: {e}")
+
+
+# ============================================================================
+# WRITE API (called from users.signals)
+# ============================================================================
+
+def record_quote_created(quote):
+    """Count a newly created quote"""
+    _apply([
+        (_status_field(quote.status), 1),
+        (_type_field(quote.website_type), 1),
+    ])
+
+
+def record_quote_changed(quote, previous_status, previous_type):
+    """Move an updated quote between status/type buckets"""
+    increments = []
+    if previous_status != quote.status:
+        increments += [
+            (_status_field(previous_status), -1),
+            (_status_field(quote.status), 1),
+        ]
+    if previous_type != quote.website_type:
+        increments += [
+            (_type_field(previous_type), -1),
+            (_type_field(quote.website_type), 1),
+        ]
+    if increments:
+        _apply(increments)
+
+
+def record_quotes_transitioned(from_counts, to_status):
+    """Move a batch of quotes from their previous statuses to `to_status`"""
+    increments = []
+    for from_status, count in from_counts.items():
+        if from_status != to_status:
+            increments += [
+                (_status_field(from_status), -count),
+                (_status_field(to_status), count),
+            ]
+    if increments:
+        _apply(increments)
+
+
+def record_quote_deleted(quote):
+    """Remove a deleted quote from the counters"""
+    _apply([
+        (_status_field(quote.status), -1),
+        (_type_field(quote.website_type), -1),
+    ])
+
+
+def rebuild_quote_stats():
+    """
+    Recompute every counter from the database and atomically replace the hash.
+    Runs in Celery (see users.tasks.rebuild_quote_stats), never in a request.
+    """
+    from .models import WebsiteQuote
+
+    mapping = {BUILT_FIELD: 1}
+    for row in WebsiteQuote.objects.order_by().values('status').annotate(count=Count('pk')):
+        mapping[_status_field(row['status'])] = row['count']
+    for row in WebsiteQuote.objects.order_by().values('website_type').annotate(count=Count('pk')):
+        mapping[_type_field(row['website_type'])] = row['count']
+
+    key = _hash_key()
+    pipe = get_redis_connection('default').pipeline(transaction=True)
+    pipe.delete(key)
+    pipe.hset(key, mapping=mapping)
+    pipe.execute()
+
+    logger.info(f"Quote stats rebuilt: {mapping}")
+    return mapping
+
+
+# ============================================================================
+# READ API (called from pages.views.home)
+# ============================================================================
+
+def _schedule_rebuild():
+    """Queue a single rebuild when the store is missing"""
+    try:
+        if cache.add(REBUILD_LOCK_KEY, 1, 300):
+            from .tasks import rebuild_quote_stats as rebuild_task
+            rebuild_task.delay()
+    except Exception as e:
+        logger.error(f"Failed to queue quote stats rebuild: {e}")
+
+
+def get_homepage_stats():
+    """
+    Return homepage counters with a single HGETALL.
+    Returns zeros (and queues a rebuild) if the store has not been built yet.
+    """
+    try:
+        raw = get_redis_connection('default').hgetall(_hash_key())
+    except Exception as e:
+        logger.error(f"Failed to read quote stats: {e}")
+        raw = {}
+
+    counts = {
+        field.decode() if isinstance(field, bytes) else field: int(value)
+        for field, value in raw.items()
+    }
+
+    if BUILT_FIELD not in counts:
+        _schedule_rebuild()
+
+    popular_types = sorted(
+        (
+            {'website_type': field.split(':', 1)[1], 'count': count}
+            for field, count in counts.items()
+            if field.startswith('type:') and count > 0
+        ),
+        key=lambda item: item['count'],
+        reverse=True,
+    )[:3]
+
+    return {
+        'total_projects': counts.get(_status_field(COMPLETED_STATUS), 0),
+        'active_projects': sum(counts.get(_status_field(s), 0) for s in ACTIVE_STATUSES),
+        'popular_types': popular_types,
+    }
@@ -7,19 +7,25 @@ Asynchronous tasks for sending emails, user management, and system maintenance.
 Author: Isaac
 """
 
-from celery import shared_task
-from django.core.mail import send_mail, EmailMultiAlternatives
-from django.template.loader import render_to_string
+from celery import shared_task, chord
+from django.core.mail import send_mail, EmailMultiAlternatives, get_connection
 from django.utils.html import strip_tags
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.db.models import Q
-from datetime import timedelta
+from django.core.cache import cache
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import islice
 import logging
 import json
+import time
 
 from .models import WebsiteQuote, Newsletter
+from . import stats
+from .analytics import get_analytics_range
+from .emails import build_email
+from . import digest, linking
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -39,26 +45,8 @@ def send_welcome_email(self, user_id):
         
         subject = 'Welcome to Onehux Web Service!'
         
-        # HTML email content
-        html_content = render_to_string('emails/welcome_email.html', {
-            'user': user,
-            'site_name': 'Onehux Web Service',
-            'site_url': settings.BASE_URL,
-            'login_url': f"{settings.BASE_URL}/login/",
-            'dashboard_url': f"{settings.BASE_URL}/dashboard/",
-        })
-        
-        # Plain text version
-        text_content = strip_tags(html_content)
-        
-        # Create email
-        email = EmailMultiAlternatives(
-            subject=subject,
-            body=text_content,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=[user.email]
-        )
-        email.attach_alternative(html_content, "text/html")
+        # Create email (site-wide context comes from users.emails)
+        email = build_email('welcome_email', subject, {'user': user}, [user.email])
         
         # Send email
         email.send()
@@ -91,8 +79,17 @@ def send_quote_email(self, quote_id):
         # Send confirmation to client
         client_result = send_quote_confirmation_to_client(quote)
         
-        # Send notification to admin
-        admin_result = send_quote_notification_to_admin(quote)
+        # Notify admin now, or queue for the periodic digest. A queue failure
+        # must not fail the task: a retry would re-send the client email.
+        admin_result = None
+        if digest.should_queue(quote):
+            try:
+                digest.queue_quote_notification(quote)
+                admin_result = "Queued for digest"
+            except Exception as e:
+                logger.error(f"Failed to queue quote {quote_id} for digest, notifying admin now: {e}")
+        if admin_result is None:
+            admin_result = send_quote_notification_to_admin(quote)
         
         logger.info(f"Quote emails sent for quote {quote_id}")
         return f"Quote emails sent for {quote.full_name} - Client: {client_result}, Admin: {admin_result}"
@@ -111,6 +108,11 @@ def send_quote_email(self, quote_id):
         return f"Failed to send quote emails after {self.max_retries} retries"
 
 
+def _quote_render_key(quote):
+    """Render-cache key for a quote's emails; changes whenever the quote is saved"""
+    return f"{quote.pk}:{quote.updated_at.timestamp()}"
+
+
 def send_quote_confirmation_to_client(quote):
     """Send quote confirmation email to client"""
     try:
@@ -127,27 +129,15 @@ def send_quote_confirmation_to_client(quote):
         
         estimated_timeline = timeline_map.get(quote.timeline, 'To be determined')
         
-        # HTML email content
-        html_content = render_to_string('emails/quote_confirmation.html', {
-            'quote': quote,
-            'estimated_timeline': estimated_timeline,
-            'site_name': 'Onehux Web Service',
-            'site_url': settings.BASE_URL,
-            'contact_email': settings.ONEHUX_COMPANY_INFO['CONTACT_EMAIL'],
-            'support_phone': settings.ONEHUX_COMPANY_INFO['PHONE_SUPPORT'],
-        })
-        
-        # Plain text version
-        text_content = strip_tags(html_content)
-        
-        # Create email
-        email = EmailMultiAlternatives(
-            subject=subject,
-            body=text_content,
+        # Create email (rendered once per quote revision, reused on retries)
+        email = build_email(
+            'quote_confirmation',
+            subject,
+            {'quote': quote, 'estimated_timeline': estimated_timeline},
+            [quote.email],
             from_email=settings.ONEHUX_COMPANY_INFO['CONTACT_EMAIL'],
-            to=[quote.email]
+            cache_key=_quote_render_key(quote),
         )
-        email.attach_alternative(html_content, "text/html")
         
         # Send email
         email.send()
@@ -176,31 +166,24 @@ def send_quote_notification_to_admin(quote):
         
         budget_display = budget_values.get(quote.budget_range, 'Unknown')
         
-        # HTML email content
-        html_content = render_to_string('emails/quote_admin_notification.html', {
-            'quote': quote,
-            'budget_display': budget_display,
-            'site_url': settings.BASE_URL,
-            'admin_url': f"{settings.BASE_URL}/admin/users/websitequote/{quote.id}/change/",
-            'features_list': ', '.join(quote.features_needed) if quote.features_needed else 'None specified',
-        })
-        
-        # Plain text version
-        text_content = strip_tags(html_content)
-        
         # Send to admin emails
         admin_emails = [admin[1] for admin in settings.ADMINS]
         if not admin_emails:
             admin_emails = [settings.ONEHUX_COMPANY_INFO['CONTACT_EMAIL']]
         
-        # Create email
-        email = EmailMultiAlternatives(
-            subject=subject,
-            body=text_content,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=admin_emails
+        # Create email (rendered once per quote revision, reused on retries)
+        email = build_email(
+            'quote_admin_notification',
+            subject,
+            {
+                'quote': quote,
+                'budget_display': budget_display,
+                'admin_url': f"{settings.BASE_URL}/admin/users/websitequote/{quote.id}/change/",
+                'features_list': ', '.join(quote.features_needed) if quote.features_needed else 'None specified',
+            },
+            admin_emails,
+            cache_key=_quote_render_key(quote),
         )
-        email.attach_alternative(html_content, "text/html")
         
         # Send email
         email.send()
@@ -212,41 +195,47 @@ def send_quote_notification_to_admin(quote):
         return f"Failed: {str(e)}"
 
 
+def _iter_chunks(iterable, size):
+    """Yield lists of at most `size` items from an iterator"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
 @shared_task(bind=True, max_retries=2)
 def send_newsletter_email(self, subscriber_ids, subject, content_html, content_text=None):
     """
-    Send newsletter email to list of subscribers
+    Send newsletter email to list of subscribers (None = all active subscribers)
+    
+    Streams subscriber emails in chunks of NEWSLETTER_CHUNK_SIZE and fans them
+    out as parallel send_newsletter_chunk subtasks; the totals are reported by
+    report_newsletter_results once every chunk has finished.
     """
     try:
-        subscribers = Newsletter.objects.filter(
-            id__in=subscriber_ids,
-            is_active=True
-        )
+        chunk_size = getattr(settings, 'NEWSLETTER_CHUNK_SIZE', 200)
         
-        sent_count = 0
-        failed_count = 0
+        subscribers = Newsletter.objects.filter(is_active=True)
+        if subscriber_ids is not None:
+            subscribers = subscribers.filter(id__in=subscriber_ids)
+        emails = subscribers.order_by().values_list('email', flat=True).iterator(chunk_size=chunk_size)
         
-        for subscriber in subscribers:
-            try:
-                # Create personalized email
-                email = EmailMultiAlternatives(
-                    subject=subject,
-                    body=content_text or strip_tags(content_html),
-                    from_email=settings.ONEHUX_COMPANY_INFO['CONTACT_EMAIL'],
-                    to=[subscriber.email]
-                )
-                
-                if content_html:
-                    email.attach_alternative(content_html, "text/html")
-                
-                email.send()
-                sent_count += 1
-                
-            except Exception as e:
-                logger.error(f"Failed to send newsletter to {subscriber.email}: {e}")
-                failed_count += 1
+        # Render the plain-text body once instead of once per subscriber
+        content_text = content_text or strip_tags(content_html)
         
-        result = f"Newsletter sent: {sent_count} successful, {failed_count} failed"
+        header = [
+            send_newsletter_chunk.s(chunk, subject, content_html, content_text, index)
+            for index, chunk in enumerate(_iter_chunks(emails, chunk_size))
+        ]
+        if not header:
+            logger.info("Newsletter not sent: no active subscribers")
+            return "Newsletter not sent: no active subscribers"
+        
+        chord(header)(report_newsletter_results.s(subject))
+        
+        result = f"Newsletter queued: {len(header)} chunks of up to {chunk_size} recipients"
         logger.info(result)
         return result
         
@@ -259,6 +248,126 @@ def send_newsletter_email(self, subscriber_ids, subject, content_html, content_t
         return f"Newsletter task failed after retries: {exc}"
 
 
+@shared_task(bind=True, max_retries=2)
+def send_newsletter_chunk(self, emails, subject, content_html, content_text, chunk_index=0):
+    """
+    Send one chunk of a newsletter over a single SMTP connection
+    """
+    started = time.monotonic()
+    sent_count = 0
+    failed_count = 0
+    
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as exc:
+        # Nothing has been sent yet, so the whole chunk can be retried safely
+        logger.error(f"Newsletter chunk {chunk_index}: SMTP connection failed: {exc}")
+        if self.request.retries < self.max_retries:
+            raise self.retry(countdown=60)
+        return {'chunk': chunk_index, 'sent': 0, 'failed': len(emails), 'seconds': 0}
+    
+    try:
+        for address in emails:
+            email = EmailMultiAlternatives(
+                subject=subject,
+                body=content_text,
+                from_email=settings.ONEHUX_COMPANY_INFO['CONTACT_EMAIL'],
+                to=[address],
+                connection=connection,
+            )
+            if content_html:
+                email.attach_alternative(content_html, "text/html")
+            
+            try:
+                sent_count += connection.send_messages([email]) or 0
+            except Exception as e:
+                logger.error(f"Failed to send newsletter to {address}: {e}")
+                failed_count += 1
+    finally:
+        connection.close()
+    
+    seconds = round(time.monotonic() - started, 3)
+    rate = round(sent_count / seconds, 1) if seconds else sent_count
+    logger.info(
+        f"Newsletter chunk {chunk_index}: {sent_count} sent, {failed_count} failed "
+        f"in {seconds}s ({rate} emails/s)"
+    )
+    return {'chunk': chunk_index, 'sent': sent_count, 'failed': failed_count, 'seconds': seconds}
+
+
+@shared_task
+def report_newsletter_results(results, subject):
+    """
+    Summarize a newsletter run once all chunks have finished
+    """
+    sent_count = sum(r['sent'] for r in results)
+    failed_count = sum(r['failed'] for r in results)
+    # Chunks run in parallel, so wall-clock time is roughly the slowest chunk
+    slowest = max((r['seconds'] for r in results), default=0)
+    
+    result = (
+        f"Newsletter '{subject}' sent: {sent_count} successful, {failed_count} failed "
+        f"across {len(results)} chunks (slowest chunk {slowest}s)"
+    )
+    logger.info(result)
+    return result
+
+
+@shared_task
+def send_quote_digest():
+    """
+    Send one admin email for every quote queued since the last digest
+    """
+    lock_key = 'quote_digest_lock'
+    if not cache.add(lock_key, 1, 600):
+        return "Quote digest already running"
+    
+    try:
+        entries = digest.read_pending()
+        if not entries:
+            return "No quotes pending for digest"
+        
+        quotes_by_id = {
+            str(pk): quote
+            for pk, quote in WebsiteQuote.objects.in_bulk([quote_id for _, quote_id in entries]).items()
+        }
+        quotes = [quotes_by_id[q] for q in dict.fromkeys(quote_id for _, quote_id in entries)
+                  if q in quotes_by_id]
+        entry_ids = [entry_id for entry_id, _ in entries]
+        
+        if quotes:
+            admin_emails = [admin[1] for admin in settings.ADMINS]
+            if not admin_emails:
+                admin_emails = [settings.ONEHUX_COMPANY_INFO['CONTACT_EMAIL']]
+            
+            email = build_email(
+                'quote_admin_digest',
+                f'{len(quotes)} New Website Quote Request{"s" if len(quotes) != 1 else ""}',
+                {
+                    'quotes': quotes,
+                    'period_start': datetime.fromtimestamp(digest.entry_timestamp(entry_ids[0]), tz=dt_timezone.utc),
+                    'period_end': datetime.fromtimestamp(digest.entry_timestamp(entry_ids[-1]), tz=dt_timezone.utc),
+                },
+                admin_emails,
+            )
+            email.send()
+        
+        # Only drop entries once the email is out (deleted quotes are dropped too)
+        digest.acknowledge(entry_ids)
+        
+        result = f"Quote digest sent: {len(quotes)} quotes"
+        logger.info(result)
+        return result
+        
+    except Exception as e:
+        logger.error(f"Quote digest failed: {e}")
+        return f"Quote digest failed: {e}"
+    
+    finally:
+        cache.delete(lock_key)
+
+
 # ============================================================================
 # SYSTEM MAINTENANCE TASKS
 # ============================================================================
@@ -363,12 +472,19 @@ def generate_weekly_analytics():
             subscribed_at__range=(start_date, end_date)
         ).count()
         
+        # Activity counters from Redis (logins, unique users, quote mix)
+        activity = get_analytics_range(start_date.date(), end_date.date())
+        
         analytics = {
             'period': f"{start_date.date()} to {end_date.date()}",
             'new_users': new_users,
             'new_quotes': new_quotes,
             'completed_projects': completed_projects,
             'newsletter_signups': newsletter_signups,
+            'logins': activity['logins'],
+            'unique_users': activity['unique_users'],
+            'quotes_by_type': activity['quotes_by_type'],
+            'quotes_by_budget': activity['quotes_by_budget'],
         }
         
         logger.info(f"Weekly analytics: {json.dumps(analytics)}")
@@ -392,22 +508,9 @@ def send_analytics_email(analytics_data):
     try:
         subject = f"Weekly Analytics Report - {analytics_data['period']}"
         
-        html_content = render_to_string('emails/analytics_report.html', {
-            'analytics': analytics_data,
-            'site_name': 'Onehux Web Service',
-        })
-        
-        text_content = strip_tags(html_content)
-        
         admin_emails = [admin[1] for admin in settings.ADMINS]
         
-        email = EmailMultiAlternatives(
-            subject=subject,
-            body=text_content,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=admin_emails
-        )
-        email.attach_alternative(html_content, "text/html")
+        email = build_email('analytics_report', subject, {'analytics': analytics_data}, admin_emails)
         
         email.send()
         
@@ -418,6 +521,33 @@ def send_analytics_email(analytics_data):
         return f"Failed to send analytics email: {e}"
 
 
+@shared_task
+def backfill_quote_users():
+    """
+    Link historical anonymous quotes to the accounts registered with their email
+    """
+    try:
+        linked = linking.backfill_quote_users()
+        return f"Quote user backfill: {linked} quotes linked"
+    except Exception as e:
+        logger.error(f"Quote user backfill failed: {e}")
+        return f"Quote user backfill failed: {e}"
+
+
+@shared_task
+def rebuild_quote_stats():
+    """
+    Rebuild the homepage quote counters from the database
+    """
+    try:
+        counters = stats.rebuild_quote_stats()
+        return f"Quote stats rebuilt: {len(counters) - 1} counters"
+        
+    except Exception as e:
+        logger.error(f"Quote stats rebuild failed: {e}")
+        return f"Quote stats rebuild failed: {e}"
+
+
 @shared_task
 def worker_health_check():
     """
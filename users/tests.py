@@ -1,3 +1,664 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.template import Context, Template
+from django.db import OperationalError, connection, transaction
+from django_redis import get_redis_connection
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from types import SimpleNamespace
+from unittest import mock
+from itertools import combinations
+import base64
+import json
+import threading
 
-# Create your tests here.
+from pages.async_helpers import for_deployment
+
+from . import analytics, digest, pricing, stats, views
+from .dashboard import aget_user_dashboard, get_user_dashboard, invalidate_user_dashboard
+from .dispatch import enqueue_once
+from .models import WebsiteQuote
+from .pagination import EstimatedCountPaginator, InvalidCursor, KeysetPaginator
+from .tasks import send_quote_digest, send_quote_email
+from .transitions import ALLOWED_TRANSITIONS, bulk_transition, can_transition, quotes_transitioned
+
+User = get_user_model()
+
+
+def _create_quote(**fields):
+    values = dict(
+        full_name='Test Client', email='client@example.com', phone='+1234567890',
+        website_type='business', project_description='Test project',
+        budget_range='1000-2500', timeline='flexible',
+    )
+    values.update(fields)
+    return WebsiteQuote.objects.create(**values)
+
+
+class UserAdminChangelistTests(TestCase):
+    """The user changelist must not run a quote count query per row"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='password'
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin_user)
+
+    def _create_users(self, count, start=0):
+        for i in range(start, start + count):
+            user = User.objects.create_user(
+                username=f'user{i}', email=f'user{i}@example.com', password='password'
+            )
+            WebsiteQuote.objects.create(
+                full_name=f'User {i}', email=user.email, phone='+1234567890',
+                website_type='business', project_description='Test project',
+                budget_range='1000-2500', timeline='flexible', user=user,
+            )
+            # Matched by email only
+            WebsiteQuote.objects.create(
+                full_name=f'User {i}', email=user.email, phone='+1234567890',
+                website_type='blog', project_description='Test project',
+                budget_range='500-1000', timeline='flexible',
+            )
+
+    def _changelist_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('admin:users_user_changelist'))
+        self.assertEqual(response.status_code, 200)
+        return response, len(ctx)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        self._create_users(2)
+        _, few = self._changelist_queries()
+
+        self._create_users(20, start=2)
+        response, many = self._changelist_queries()
+
+        self.assertEqual(few, many)
+        self.assertContains(response, '2 quotes', count=22)
+
+
+class AnalyticsCounterTests(TestCase):
+    """Daily analytics counters are atomic Redis increments"""
+
+    day = date(2001, 1, 1)
+
+    def setUp(self):
+        self._clear()
+        self.addCleanup(self._clear)
+        now = mock.patch('users.analytics.timezone.now',
+                         return_value=datetime(2001, 1, 1, 12, tzinfo=dt_timezone.utc))
+        now.start()
+        self.addCleanup(now.stop)
+
+    def _clear(self):
+        cache.delete_many([f'analytics:{self.day.isoformat()}:{name}'
+                           for name in ('quotes', 'logins', 'unique_users')])
+
+    def test_concurrent_quote_increments_are_not_lost(self):
+        quote = WebsiteQuote(website_type='blog', budget_range='500-1000')
+
+        def track():
+            for _ in range(25):
+                analytics.track_quote(quote)
+
+        threads = [threading.Thread(target=track) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        totals = analytics.get_daily_analytics(self.day)
+        self.assertEqual(totals['quotes'], 200)
+        self.assertEqual(totals['quotes_by_type'], {'blog': 200})
+        self.assertEqual(totals['quotes_by_budget'], {'500-1000': 200})
+
+    def test_logins_and_unique_users(self):
+        for pk in ('a', 'b', 'a'):
+            analytics.track_login(SimpleNamespace(pk=pk))
+
+        totals = analytics.get_analytics_range(self.day, self.day + timedelta(days=1))
+        self.assertEqual(totals['logins'], 3)
+        self.assertEqual(totals['unique_users'], 2)
+
+
+class TrackedFieldsTests(TestCase):
+    """TrackedFieldsMixin reports changes against the loaded values"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.quote_id = _create_quote().pk
+
+    def test_loaded_instance_is_unchanged(self):
+        quote = WebsiteQuote.objects.get(pk=self.quote_id)
+        self.assertFalse(quote.has_changed('status'))
+        self.assertEqual(quote.changed_fields(), {})
+
+    def test_changed_fields(self):
+        quote = WebsiteQuote.objects.get(pk=self.quote_id)
+        quote.status = 'contacted'
+        self.assertTrue(quote.has_changed('status'))
+        self.assertEqual(quote.get_previous('status'), 'new')
+        self.assertEqual(quote.changed_fields(), {'status': ('new', 'contacted')})
+
+    def test_save_resets_snapshot(self):
+        quote = WebsiteQuote.objects.get(pk=self.quote_id)
+        quote.status = 'contacted'
+        quote.save()
+        self.assertFalse(quote.has_changed('status'))
+        self.assertEqual(quote.get_previous('status'), 'contacted')
+
+    def test_save_with_update_fields_keeps_other_changes(self):
+        quote = WebsiteQuote.objects.get(pk=self.quote_id)
+        quote.status = 'contacted'
+        quote.website_type = 'blog'
+        quote.save(update_fields=['status'])
+        self.assertEqual(quote.changed_fields(), {'website_type': ('business', 'blog')})
+
+    def test_new_and_deferred_fields_count_as_changed(self):
+        self.assertTrue(WebsiteQuote(status='new').has_changed('status'))
+
+        quote = WebsiteQuote.objects.only('pk').get(pk=self.quote_id)
+        self.assertFalse(quote.has_snapshot('status'))
+        self.assertTrue(quote.has_changed('status'))
+
+    def test_refresh_from_db_takes_new_snapshot(self):
+        quote = WebsiteQuote.objects.get(pk=self.quote_id)
+        WebsiteQuote.objects.filter(pk=self.quote_id).update(status='quoted')
+        quote.refresh_from_db()
+        self.assertEqual(quote.get_previous('status'), 'quoted')
+        self.assertFalse(quote.has_changed('status'))
+
+
+class EnqueueOnceTests(TestCase):
+    """enqueue_once sends a task after commit, once per event"""
+
+    def setUp(self):
+        self.task = mock.Mock()
+        self.task.name = 'users.tests.fake_task'
+        self.addCleanup(cache.delete, f'task_dedup:{self.task.name}:quote:1')
+
+    def test_sent_on_commit_only(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            enqueue_once(self.task, 1, event='quote:1')
+        self.task.delay.assert_not_called()
+
+        callbacks[0]()
+        self.task.delay.assert_called_once_with(1)
+
+    def test_duplicate_dispatch_is_dropped(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            enqueue_once(self.task, 1, event='quote:1')
+            enqueue_once(self.task, 1, event='quote:1')
+        with self.captureOnCommitCallbacks(execute=True):
+            enqueue_once(self.task, 1, event='quote:1')
+
+        self.assertEqual(self.task.delay.call_count, 1)
+
+    def test_failed_send_releases_event(self):
+        self.task.delay.side_effect = [ConnectionError('broker down'), None]
+        with self.captureOnCommitCallbacks(execute=True):
+            enqueue_once(self.task, 1, event='quote:1')
+        with self.captureOnCommitCallbacks(execute=True):
+            enqueue_once(self.task, 1, event='quote:1')
+
+        self.assertEqual(self.task.delay.call_count, 2)
+
+
+@override_settings(QUOTE_DIGEST_ENABLED=True, ADMINS=[('Admin', 'admin@example.com')])
+class QuoteDigestTests(TestCase):
+    """Admin quote notifications batched through the Redis stream"""
+
+    def setUp(self):
+        cache.delete(digest.STREAM_KEY)
+        self.addCleanup(cache.delete, digest.STREAM_KEY)
+
+    def test_should_queue(self):
+        self.assertTrue(digest.should_queue(WebsiteQuote(budget_range='1000-2500')))
+        self.assertFalse(digest.should_queue(WebsiteQuote(budget_range='10000+')))
+        with self.settings(QUOTE_DIGEST_ENABLED=False):
+            self.assertFalse(digest.should_queue(WebsiteQuote(budget_range='1000-2500')))
+
+    def test_stream_round_trip(self):
+        first, second = _create_quote(), _create_quote()
+        digest.queue_quote_notification(first)
+        digest.queue_quote_notification(second)
+
+        entries = digest.read_pending()
+        self.assertEqual([quote_id for _, quote_id in entries], [str(first.pk), str(second.pk)])
+
+        digest.acknowledge([entries[0][0]])
+        self.assertEqual([quote_id for _, quote_id in digest.read_pending()], [str(second.pk)])
+
+    def test_digest_sends_one_email_and_drains_stream(self):
+        first, second, deleted = _create_quote(), _create_quote(), _create_quote()
+        for quote in (first, second, first, deleted):
+            digest.queue_quote_notification(quote)
+        deleted.delete()
+
+        send_quote_digest()
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].subject, '2 New Website Quote Requests')
+        self.assertEqual(mail.outbox[0].to, ['admin@example.com'])
+        self.assertEqual(digest.read_pending(), [])
+
+    def test_empty_digest_sends_nothing(self):
+        send_quote_digest()
+        self.assertEqual(mail.outbox, [])
+
+    def test_queue_failure_notifies_admin_immediately(self):
+        quote = _create_quote()
+        with mock.patch.object(digest, 'queue_quote_notification', side_effect=ConnectionError('redis down')):
+            send_quote_email(quote.pk)
+
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(digest.read_pending(), [])
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    """Large admin changelists use row estimates instead of COUNT(*)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        for _ in range(3):
+            _create_quote()
+
+    def _count(self, queryset):
+        return EstimatedCountPaginator(queryset, 10).count
+
+    def _as_postgres(self):
+        vendor = mock.patch.object(connection, 'vendor', 'postgresql')
+        vendor.start()
+        self.addCleanup(vendor.stop)
+
+    def _exact_count_times_out(self):
+        return mock.patch('users.pagination.transaction.atomic',
+                          side_effect=OperationalError('canceling statement due to statement timeout'))
+
+    def test_small_table_counts_exactly(self):
+        self.assertEqual(self._count(WebsiteQuote.objects.all()), 3)
+
+    @override_settings(ADMIN_COUNT_ESTIMATE_THRESHOLD=10000)
+    def test_large_unfiltered_table_uses_table_estimate(self):
+        self._as_postgres()
+        with mock.patch.object(EstimatedCountPaginator, '_table_estimate', return_value=250000):
+            self.assertEqual(self._count(WebsiteQuote.objects.all()), 250000)
+
+    @override_settings(ADMIN_COUNT_ESTIMATE_THRESHOLD=10000)
+    def test_estimate_below_threshold_counts_exactly(self):
+        self._as_postgres()
+        with mock.patch.object(EstimatedCountPaginator, '_table_estimate', return_value=3), \
+                mock.patch.object(EstimatedCountPaginator, '_count_with_budget', return_value=3) as exact:
+            self.assertEqual(self._count(WebsiteQuote.objects.all()), 3)
+        exact.assert_called_once()
+
+    def test_timed_out_filtered_count_uses_plan_estimate(self):
+        self._as_postgres()
+        with self._exact_count_times_out(), \
+                mock.patch.object(EstimatedCountPaginator, '_plan_estimate', return_value=1234):
+            self.assertEqual(self._count(WebsiteQuote.objects.filter(status='new')), 1234)
+
+    def test_missing_plan_estimate_counts_exactly(self):
+        self._as_postgres()
+        with self._exact_count_times_out(), \
+                mock.patch.object(EstimatedCountPaginator, '_plan_estimate', return_value=None):
+            self.assertEqual(self._count(WebsiteQuote.objects.filter(status='new')), 3)
+
+
+class BulkTransitionTests(TestCase):
+    """Admin bulk status changes only apply allowed transitions"""
+
+    def setUp(self):
+        self.new = _create_quote()
+        self.completed = _create_quote(status='completed')
+        self.contacted_at = timezone.now() - timedelta(days=3)
+        self.quoted = _create_quote(status='quoted', contacted_at=self.contacted_at)
+
+    def test_transition_table_covers_every_status(self):
+        statuses = {status for status, _ in WebsiteQuote.STATUS_CHOICES}
+        self.assertEqual(set(ALLOWED_TRANSITIONS), statuses)
+        for targets in ALLOWED_TRANSITIONS.values():
+            self.assertLessEqual(targets, statuses)
+        self.assertFalse(can_transition('completed', 'new'))
+        self.assertTrue(can_transition('new', 'contacted'))
+
+    def test_only_allowed_quotes_are_updated(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            result = bulk_transition(WebsiteQuote.objects.all(), 'contacted')
+
+        self.assertEqual((result.updated, result.skipped), (2, 1))
+        self.assertCountEqual(result.quote_ids, [self.new.pk, self.quoted.pk])
+        self.assertEqual(
+            dict(WebsiteQuote.objects.values_list('pk', 'status')),
+            {self.new.pk: 'contacted', self.completed.pk: 'completed', self.quoted.pk: 'contacted'},
+        )
+
+    def test_contacted_at_is_set_once(self):
+        bulk_transition(WebsiteQuote.objects.all(), 'contacted')
+
+        self.new.refresh_from_db()
+        self.quoted.refresh_from_db()
+        self.assertIsNotNone(self.new.contacted_at)
+        self.assertEqual(self.quoted.contacted_at, self.contacted_at)
+
+    def test_unknown_status_is_rejected(self):
+        with self.assertRaises(ValueError):
+            bulk_transition(WebsiteQuote.objects.all(), 'archived')
+
+    def test_signal_sent_once_after_commit(self):
+        received = []
+
+        def receiver(sender, **kwargs):
+            received.append(kwargs)
+
+        quotes_transitioned.connect(receiver)
+        self.addCleanup(quotes_transitioned.disconnect, receiver)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_transition(WebsiteQuote.objects.all(), 'cancelled')
+            self.assertEqual(received, [])
+
+        self.assertEqual(len(received), 1)
+        self.assertEqual(received[0]['to_status'], 'cancelled')
+        self.assertEqual(received[0]['from_counts'], {'new': 1, 'quoted': 1})
+
+    def test_nothing_eligible_sends_no_signal(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            result = bulk_transition(WebsiteQuote.objects.filter(pk=self.completed.pk), 'contacted')
+        self.assertEqual((result.updated, result.skipped), (0, 1))
+        self.assertEqual(callbacks, [])
+
+
+class KeysetPaginatorTests(TestCase):
+    """Cursor pagination walks every quote exactly once, newest first"""
+
+    @classmethod
+    def setUpTestData(cls):
+        start = timezone.now() - timedelta(days=1)
+        # Three quotes share a timestamp, so the pk breaks the tie
+        for minutes in (0, 1, 2, 2, 2, 5, 6):
+            quote = _create_quote()
+            WebsiteQuote.objects.filter(pk=quote.pk).update(created_at=start + timedelta(minutes=minutes))
+        cls.expected = list(WebsiteQuote.objects.order_by('-created_at', '-pk').values_list('pk', flat=True))
+
+    def _paginator(self):
+        return KeysetPaginator(WebsiteQuote.objects.all(), 3)
+
+    def _cursor(self, values):
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def test_pages_cover_every_row_once(self):
+        paginator = self._paginator()
+        seen, cursor, pages = [], None, 0
+        while True:
+            page = paginator.page(cursor)
+            seen += [quote.pk for quote in page]
+            pages += 1
+            if not page.has_next():
+                break
+            cursor = page.next_cursor
+
+        self.assertEqual(seen, self.expected)
+        self.assertEqual(pages, 3)
+        self.assertTrue(page.has_previous())
+
+    def test_cursor_round_trip(self):
+        paginator = self._paginator()
+        quote = WebsiteQuote.objects.get(pk=self.expected[2])
+        key_value, pk_value = paginator.decode_cursor(paginator.encode_cursor(quote))
+        self.assertEqual((key_value, pk_value), (quote.created_at, quote.pk))
+
+    def test_invalid_cursors_raise(self):
+        paginator = self._paginator()
+        for cursor in ('not-a-cursor', self._cursor([1]), self._cursor(['2024-01-01', None]), self._cursor(['x', 'y'])):
+            with self.subTest(cursor=cursor), self.assertRaises(InvalidCursor):
+                paginator.page(cursor)
+
+    def test_get_page_falls_back_to_first_page(self):
+        page = self._paginator().get_page('not-a-cursor')
+        self.assertFalse(page.has_previous())
+        self.assertEqual([quote.pk for quote in page], self.expected[:3])
+
+    async def test_async_page_matches_sync_page(self):
+        paginator = self._paginator()
+        first = await paginator.aget_page()
+        second = await paginator.apage(first.next_cursor)
+        self.assertEqual([quote.pk for quote in second], self.expected[3:6])
+
+
+TEST_PRICING = {
+    'DEFAULT_BASE_COST': 1000,
+    'BASE_COSTS': {'business': 2000, 'blog': 800},
+    'FEATURE_COSTS': {'cms': 500, 'seo': 300, 'ecommerce': 1500, 'blog': 200},
+}
+
+
+def _restore_published_pricing(published):
+    if published is None:
+        cache.delete(pricing.PUBLISHED_PRICING_KEY)
+    else:
+        cache.set(pricing.PUBLISHED_PRICING_KEY, published, None)
+    pricing.reload_pricing()
+
+
+@override_settings(QUOTE_PRICING=TEST_PRICING, PRICING_CHECK_INTERVAL=30)
+class PricingTableTests(TestCase):
+    """Precomputed estimates match the plain sum and follow published pricing"""
+
+    def setUp(self):
+        published = cache.get(pricing.PUBLISHED_PRICING_KEY)
+        cache.delete(pricing.PUBLISHED_PRICING_KEY)
+        self.addCleanup(_restore_published_pricing, published)
+        pricing.reload_pricing()
+
+    def _naive_total(self, data, website_type, features):
+        base = data['BASE_COSTS'].get(website_type, data['DEFAULT_BASE_COST'])
+        return base + sum(data['FEATURE_COSTS'].get(name, 0) for name in features)
+
+    def _assert_matches_naive_sum(self, table, data):
+        names = list(data['FEATURE_COSTS'])
+        for website_type in ('business', 'blog', 'custom'):
+            for size in range(len(names) + 1):
+                for features in combinations(names, size):
+                    self.assertEqual(
+                        table.estimate(website_type, features)['total_estimate'],
+                        self._naive_total(data, website_type, features),
+                    )
+
+    def test_totals_match_naive_sum(self):
+        self._assert_matches_naive_sum(pricing.build_pricing_table(TEST_PRICING), TEST_PRICING)
+
+    def test_totals_without_precomputed_matrix(self):
+        with mock.patch.object(pricing, 'MAX_PRECOMPUTED_FEATURES', 2):
+            table = pricing.build_pricing_table(TEST_PRICING)
+        self._assert_matches_naive_sum(table, TEST_PRICING)
+
+    def test_estimate_payload(self):
+        estimate = pricing.build_pricing_table(TEST_PRICING).estimate('business', ['cms', 'seo', 'unknown'])
+        self.assertEqual(estimate, {
+            'base_cost': 2000,
+            'additional_cost': 800,
+            'total_estimate': 2800,
+            'formatted_estimate': '$2,800',
+        })
+
+    def test_version_follows_prices(self):
+        changed = dict(TEST_PRICING, FEATURE_COSTS=dict(TEST_PRICING['FEATURE_COSTS'], seo=350))
+        self.assertEqual(
+            pricing.build_pricing_table(TEST_PRICING).version,
+            pricing.build_pricing_table(dict(TEST_PRICING)).version,
+        )
+        self.assertNotEqual(
+            pricing.build_pricing_table(TEST_PRICING).version,
+            pricing.build_pricing_table(changed).version,
+        )
+
+    def test_publish_and_unpublish(self):
+        settings_version = pricing.get_pricing_table().version
+        changed = dict(TEST_PRICING, DEFAULT_BASE_COST=1200)
+
+        published = pricing.publish_pricing(changed)
+        self.assertEqual(pricing.get_pricing_table().version, published.version)
+        self.assertNotEqual(published.version, settings_version)
+
+        pricing.unpublish_pricing()
+        self.assertEqual(pricing.get_pricing_table().version, settings_version)
+
+    def test_other_workers_reload_after_check_interval(self):
+        with mock.patch.object(pricing.time, 'monotonic', return_value=1000.0) as monotonic:
+            settings_version = pricing.get_pricing_table().version
+            # Published by another process: this one only sees the cache entry
+            published = pricing.publish_pricing(dict(TEST_PRICING, DEFAULT_BASE_COST=1200))
+            pricing._table, pricing._checked_at = pricing._settings_table(), 1000.0
+
+            self.assertEqual(pricing.get_pricing_table().version, settings_version)
+            monotonic.return_value = 1031.0
+            self.assertEqual(pricing.get_pricing_table().version, published.version)
+
+
+@override_settings(QUOTE_PRICING=TEST_PRICING)
+class EstimateCostViewTests(TestCase):
+    """Sync and async estimate views answer alike, with pricing-version ETags"""
+
+    query = {'type': 'business', 'features[]': ['cms', 'seo']}
+
+    def setUp(self):
+        published = cache.get(pricing.PUBLISHED_PRICING_KEY)
+        cache.delete(pricing.PUBLISHED_PRICING_KEY)
+        self.addCleanup(_restore_published_pricing, published)
+        pricing.reload_pricing()
+
+    def test_estimate_and_revalidation(self):
+        response = views.estimate_cost(RequestFactory().get('/', self.query))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['total_estimate'], 2800)
+
+        etag = response['ETag']
+        response = views.estimate_cost(RequestFactory().get('/', self.query, HTTP_IF_NONE_MATCH=etag))
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_batch_validation(self):
+        response = views.estimate_cost_batch(RequestFactory().get('/'))
+        self.assertEqual(response.status_code, 400)
+
+    async def test_async_views_match_sync_views(self):
+        sync_response = views.estimate_cost_batch(RequestFactory().get('/', {'combo': ['business:cms,seo', 'blog']}))
+        # The event loop must not block on the sync cache API
+        with mock.patch.object(pricing, 'cache') as pricing_cache:
+            pricing_cache.get.side_effect = AssertionError('sync cache read')
+            pricing_cache.aget = mock.AsyncMock(return_value=None)
+            pricing.reload_pricing()
+            async_response = await views.aestimate_cost_batch(
+                AsyncRequestFactory().get('/', {'combo': ['business:cms,seo', 'blog']})
+            )
+        pricing_cache.aget.assert_awaited_once()
+        self.assertEqual(async_response.content, sync_response.content)
+        self.assertEqual(async_response['ETag'], sync_response['ETag'])
+
+    def test_for_deployment(self):
+        with self.settings(ASGI_DEPLOYMENT=False):
+            self.assertIs(for_deployment(views.estimate_cost, views.aestimate_cost), views.estimate_cost)
+        with self.settings(ASGI_DEPLOYMENT=True):
+            self.assertIs(for_deployment(views.estimate_cost, views.aestimate_cost), views.aestimate_cost)
+
+
+class UserDashboardCacheTests(TestCase):
+    """Cached dashboard quotes render without touching the database"""
+
+    template = Template(
+        '{% for quote in quotes %}{{ quote }}|{{ quote.get_status_display }}|'
+        '{{ quote.get_budget_range_display }}|{{ quote.estimated_cost_display }}|'
+        '{{ quote.company_name }}|{{ quote.features_needed|join:"," }}|'
+        '{{ quote.get_absolute_url }}|{{ quote.created_at|date:"Y-m-d H:i:s" }}\n{% endfor %}'
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='client', email='client@example.com', password='password')
+        for i in range(3):
+            _create_quote(full_name=f'Client {i}', company_name='Acme', features_needed=['cms', 'seo'],
+                          estimated_cost='2500.00', user=cls.user)
+
+    def setUp(self):
+        invalidate_user_dashboard(self.user.pk)
+        self.addCleanup(invalidate_user_dashboard, self.user.pk)
+
+    def _render(self, quotes):
+        return self.template.render(Context({'quotes': quotes}))
+
+    def test_cached_quotes_match_database(self):
+        expected = self._render(WebsiteQuote.objects.filter(user=self.user).order_by('-created_at'))
+        self.assertEqual(self._render(get_user_dashboard(self.user)['recent_quotes']), expected)
+
+        with self.assertNumQueries(0):
+            data = get_user_dashboard(self.user)
+            self.assertEqual(self._render(data['recent_quotes']), expected)
+        self.assertEqual(data['stats']['total_quotes'], 3)
+
+    async def test_cached_quotes_render_on_the_event_loop(self):
+        await aget_user_dashboard(self.user)
+        # Any lazy field load would raise SynchronousOnlyOperation here
+        data = await aget_user_dashboard(self.user)
+        rendered = self._render(data['recent_quotes'])
+        self.assertIn('Client 2 - Business Website|New Request|', rendered)
+        self.assertIn('|$2,500.00|Acme|cms,seo|/quote/', rendered)
+
+
+class EmailPreviewTests(TestCase):
+    """Development email previews show the emails as they are sent"""
+
+    def test_quote_confirmation_preview(self):
+        response = self.client.get(reverse('users:test_quote_email'))
+        self.assertContains(response, 'Thank you, John Doe!')
+        self.assertContains(response, 'Business Website')
+        self.assertContains(response, '</html>')
+
+    def test_welcome_preview_text_part(self):
+        response = self.client.get(reverse('users:test_welcome_email'), {'format': 'text'})
+        self.assertEqual(response['Content-Type'], 'text/plain; charset=utf-8')
+        self.assertContains(response, 'John')
+
+
+class QuoteStatsTests(TestCase):
+    """Homepage counters move only when the quote change is committed"""
+
+    def setUp(self):
+        key = mock.patch.object(stats, 'STATS_HASH_KEY', f'quote_stats_hash:test:{self.id()}')
+        key.start()
+        self.addCleanup(key.stop)
+        self.addCleanup(lambda: cache.delete(stats.STATS_HASH_KEY))
+
+    def _count(self, field):
+        return int(get_redis_connection('default').hget(stats._hash_key(), field) or 0)
+
+    def test_committed_changes_are_counted(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            quote = _create_quote(website_type='landing')
+        self.assertEqual(self._count('type:landing'), 1)
+        self.assertEqual(self._count('status:new'), 1)
+
+        quote = WebsiteQuote.objects.get(pk=quote.pk)
+        quote.status = 'contacted'
+        with self.captureOnCommitCallbacks(execute=True):
+            quote.save()
+        self.assertEqual((self._count('status:new'), self._count('status:contacted')), (0, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            quote.delete()
+        self.assertEqual((self._count('type:landing'), self._count('status:contacted')), (0, 0))
+
+    def test_rolled_back_save_is_not_counted(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                _create_quote(website_type='landing')
+                raise RuntimeError('rollback')
+        self.assertEqual(self._count('type:landing'), 0)
@@ -0,0 +1,88 @@
+# users/transitions.py
+"""
+Bulk quote status transitions
+=============================
+Applies validated status changes to many quotes with one SELECT and one
+UPDATE, then sends a single `quotes_transitioned` signal (after commit)
+instead of per-row pre_save/post_save signals.
+
+Receivers (see users.signals) get:
+    quote_ids     list of updated primary keys
+    user_ids      owners of the updated quotes (None for anonymous quotes)
+    from_counts   {previous_status: number_of_quotes}
+    to_status     the new status
+    actor         user who triggered the change (or None)
+
+Usage:
+    result = bulk_transition(queryset, 'contacted', actor=request.user)
+    result.updated, result.skipped
+
+Author: Isaac
+"""
+
+from django.db import transaction
+from django.db.models.functions import Coalesce
+from django.dispatch import Signal
+from django.utils import timezone
+from collections import Counter, namedtuple
+import logging
+
+from .models import WebsiteQuote
+
+logger = logging.getLogger(__name__)
+
+quotes_transitioned = Signal()
+
+# Allowed status changes: current status -> statuses it may move to
+ALLOWED_TRANSITIONS = {
+    'new': {'contacted', 'quoted', 'cancelled'},
+    'contacted': {'quoted', 'cancelled'},
+    'quoted': {'contacted', 'approved', 'cancelled'},
+    'approved': {'in_progress', 'cancelled'},
+    'in_progress': {'completed', 'cancelled'},
+    'completed': set(),
+    'cancelled': {'new'},
+}
+
+TransitionResult = namedtuple('TransitionResult', ['updated', 'skipped', 'quote_ids'])
+
+
+def can_transition(from_status, to_status):
+    return to_status in ALLOWED_TRANSITIONS.get(from_status, ())
+
+
+def bulk_transition(queryset, to_status, actor=None):
+    """
+    Move every quote in `queryset` that may legally change to `to_status`.
+    Quotes already in `to_status` or in a state that cannot move there are
+    skipped.
+    """
+    if to_status not in ALLOWED_TRANSITIONS:
+        raise ValueError(f"Unknown quote status: {to_status}")
+
+    now = timezone.now()
+    with transaction.atomic():
+        rows = list(
+            queryset.order_by().select_for_update().values_list('pk', 'status', 'user_id')
+        )
+        eligible = [row for row in rows if can_transition(row[1], to_status)]
+        quote_ids = [pk for pk, _, _ in eligible]
+
+        if quote_ids:
+            changes = {'status': to_status, 'updated_at': now}
+            if to_status == 'contacted':
+                changes['contacted_at'] = Coalesce('contacted_at', now)
+            WebsiteQuote.objects.filter(pk__in=quote_ids).update(**changes)
+
+            from_counts = dict(Counter(status for _, status, _ in eligible))
+            user_ids = {user_id for _, _, user_id in eligible}
+            transaction.on_commit(lambda: quotes_transitioned.send(
+                sender=WebsiteQuote,
+                quote_ids=quote_ids,
+                user_ids=user_ids,
+                from_counts=from_counts,
+                to_status=to_status,
+                actor=actor,
+            ))
+
+    return TransitionResult(len(quote_ids), len(rows) - len(quote_ids), quote_ids)
@@ -9,6 +9,8 @@ Author: Isaac
 
 from django.urls import path
 from django.contrib.auth import views as auth_views
+from pages.async_helpers import for_deployment
+from pages.cache import cache_policy
 from . import views
 
 app_name = 'users'
@@ -71,7 +73,7 @@ urlpatterns = [
     # ========================================================================
     
     # Dashboard
-    path('dashboard/', views.dashboard, name='dashboard'),
+    path('dashboard/', for_deployment(views.dashboard, views.adashboard), name='dashboard'),
     
     # Profile Management
     path('profile/', views.profile, name='profile'),
@@ -86,55 +88,38 @@ urlpatterns = [
     path('quote/success/', views.quote_success, name='quote_success'),
     
     # User's Quotes
-    path('my-quotes/', views.my_quotes, name='my_quotes'),
-    path('quote/<uuid:pk>/', views.quote_detail, name='quote_detail'),
+    path('my-quotes/', for_deployment(views.my_quotes, views.amy_quotes), name='my_quotes'),
+    path('quote/<uuid:pk>/', for_deployment(views.quote_detail, views.aquote_detail), name='quote_detail'),
     
     # ========================================================================
     # AJAX & API ENDPOINTS
     # ========================================================================
     
     # Newsletter Subscription
-    path('api/newsletter/subscribe/', views.newsletter_subscribe, name='newsletter_subscribe'),
+    path('api/newsletter/subscribe/', for_deployment(views.newsletter_subscribe, views.anewsletter_subscribe), name='newsletter_subscribe'),
     
     # Cost Estimation
-    path('api/estimate-cost/', views.estimate_cost, name='estimate_cost'),
+    path('api/estimate-cost/', for_deployment(views.estimate_cost, views.aestimate_cost), name='estimate_cost'),
+    path('api/estimate-cost/batch/', for_deployment(views.estimate_cost_batch, views.aestimate_cost_batch), name='estimate_cost_batch'),
     
     # ========================================================================
     # UTILITY URLS
     # ========================================================================
     
-    # Service Worker for PWA
-    path('sw.js', views.service_worker, name='service_worker'),
+    # Service Worker for PWA (always revalidated so updates ship promptly)
+    path('sw.js', cache_policy(max_age=0, per_user=False)(views.service_worker), name='service_worker'),
     
     # SEO Files
-    path('robots.txt', views.robots_txt, name='robots_txt'),
+    path('robots.txt', cache_policy(max_age=86400, per_user=False)(views.robots_txt), name='robots_txt'),
 ]
 
 # Additional URL patterns for development/testing
 if __debug__:
     # These URLs are only available in development mode
     test_patterns = [
-        # Test email templates
-        path('test/email/welcome/', 
-             lambda request: views.render(request, 'emails/welcome_email.html', {
-                 'user': request.user if request.user.is_authenticated else None,
-                 'site_name': 'Onehux Web Service',
-                 'site_url': 'http://localhost:8000',
-             }), 
-             name='test_welcome_email'),
-        
-        path('test/email/quote-confirmation/', 
-             lambda request: views.render(request, 'emails/quote_confirmation.html', {
-                 'quote': {
-                     'full_name': 'John Doe',
-                     'email': 'john@example.com',
-                     'website_type': 'business',
-                     'project_description': 'A professional business website',
-                 },
-                 'estimated_timeline': '2-4 weeks',
-                 'site_name': 'Onehux Web Service',
-             }), 
-             name='test_quote_email'),
+        # Email previews, rendered through users.emails like the real emails
+        path('test/email/welcome/', views.preview_welcome_email, name='test_welcome_email'),
+        path('test/email/quote-confirmation/', views.preview_quote_email, name='test_quote_email'),
     ]
     
     urlpatterns += test_patterns
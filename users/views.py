@@ -7,7 +7,7 @@ Handles user registration, login, profile management, and quote requests.
 Author: Isaac
 """
 
-from django.shortcuts import render, redirect, get_object_or_404
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
 from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
@@ -17,16 +17,23 @@ from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 from django.views.generic import CreateView, DetailView, UpdateView
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.core.paginator import Paginator
-from django.db.models import Q
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
 from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
 import json
 import logging
 from django.http import HttpResponse
 
+from pages.async_helpers import aget_user, arender
+from pages.ratelimit import ratelimit
+
 from .models import User, WebsiteQuote, Newsletter
+from .dashboard import aget_user_dashboard, get_user_dashboard
+from .emails import render_email
+from .pagination import KeysetPaginator
+from .pricing import aget_pricing_table, get_pricing_table
 from .forms import (
     UserRegistrationForm, 
     UserLoginForm, 
@@ -34,7 +41,6 @@ from .forms import (
     WebsiteQuoteForm,
     NewsletterForm
 )
-from .tasks import send_quote_email, send_welcome_email
 
 logger = logging.getLogger(__name__)
 
@@ -55,8 +61,7 @@ def register(request):
         if form.is_valid():
             user = form.save()
             
-            # Send welcome email asynchronously
-            send_welcome_email.delay(user.id)
+            # Welcome email is queued by the user_post_save signal
             
             # Log the user in
             username = form.cleaned_data.get('email')
@@ -132,28 +137,35 @@ def logout_view(request):
 @login_required
 def dashboard(request):
     """User dashboard with overview of quotes and activity"""
-    user_quotes = WebsiteQuote.objects.filter(
-        Q(user=request.user) | Q(email=request.user.email)
-    ).order_by('-created_at')[:5]
-    
-    # Statistics
-    total_quotes = user_quotes.count()
-    active_projects = user_quotes.filter(status__in=['approved', 'in_progress']).count()
-    completed_projects = user_quotes.filter(status='completed').count()
+    # One aggregate query + the recent quotes, cached per user (users.dashboard)
+    data = get_user_dashboard(request.user)
     
     context = {
         'page_title': 'Dashboard - Onehux',
-        'user_quotes': user_quotes,
-        'stats': {
-            'total_quotes': total_quotes,
-            'active_projects': active_projects,
-            'completed_projects': completed_projects,
-        }
+        'user_quotes': data['recent_quotes'],
+        'stats': data['stats'],
     }
     
     return render(request, 'users/dashboard.html', context)
 
 
+@login_required
+async def adashboard(request):
+    """Async version of dashboard (ASGI deployment)"""
+    user = await aget_user(request)
+    
+    # One aggregate query + the recent quotes, cached per user (users.dashboard)
+    data = await aget_user_dashboard(user)
+    
+    context = {
+        'page_title': 'Dashboard - Onehux',
+        'user_quotes': data['recent_quotes'],
+        'stats': data['stats'],
+    }
+    
+    return await arender(request, 'users/dashboard.html', context)
+
+
 @login_required
 def profile(request):
     """User profile view and edit"""
@@ -178,6 +190,7 @@ def profile(request):
 # WEBSITE QUOTE VIEWS
 # ============================================================================
 
+@ratelimit('quote_request', {'ip': '10/h', 'post:email': '3/h'})
 def quote_request(request):
     """Website quote request form"""
     if request.method == 'POST':
@@ -191,8 +204,7 @@ def quote_request(request):
             
             quote.save()
             
-            # Send quote email asynchronously
-            send_quote_email.delay(quote.id)
+            # Quote emails are queued by the quote_post_save signal
             
             messages.success(
                 request, 
@@ -234,23 +246,42 @@ def quote_success(request):
 @login_required
 def my_quotes(request):
     """Display user's quote requests"""
-    quotes = WebsiteQuote.objects.filter(
-        Q(user=request.user) | Q(email=request.user.email)
-    ).order_by('-created_at')
+    quotes = WebsiteQuote.objects.filter(user=request.user)
     
-    # Pagination
-    paginator = Paginator(quotes, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Keyset pagination: no OFFSET / COUNT, "load more" via HTMX
+    page = KeysetPaginator(quotes, 10).get_page(request.GET.get('cursor'))
     
     context = {
-        'page_obj': page_obj,
+        'page_obj': page,
         'page_title': 'My Quote Requests - Onehux',
     }
     
+    if request.htmx:
+        return render(request, 'users/partials/quote_list_page.html', context)
+    
     return render(request, 'users/my_quotes.html', context)
 
 
+@login_required
+async def amy_quotes(request):
+    """Async version of my_quotes (ASGI deployment)"""
+    user = await aget_user(request)
+    quotes = WebsiteQuote.objects.filter(user=user)
+    
+    # Keyset pagination: no OFFSET / COUNT, "load more" via HTMX
+    page = await KeysetPaginator(quotes, 10).aget_page(request.GET.get('cursor'))
+    
+    context = {
+        'page_obj': page,
+        'page_title': 'My Quote Requests - Onehux',
+    }
+    
+    if request.htmx:
+        return await arender(request, 'users/partials/quote_list_page.html', context)
+    
+    return await arender(request, 'users/my_quotes.html', context)
+
+
 @login_required
 def quote_detail(request, pk):
     """Detailed view of a specific quote request"""
@@ -268,44 +299,67 @@ def quote_detail(request, pk):
     return render(request, 'users/quote_detail.html', context)
 
 
+@login_required
+async def aquote_detail(request, pk):
+    """Async version of quote_detail (ASGI deployment)"""
+    user = await aget_user(request)
+    quote = await aget_object_or_404(
+        WebsiteQuote,
+        pk=pk,
+        user=user
+    )
+    
+    context = {
+        'quote': quote,
+        'page_title': f'Quote #{quote.pk} - Onehux',
+    }
+    
+    return await arender(request, 'users/quote_detail.html', context)
+
+
 # ============================================================================
 # AJAX & API VIEWS
 # ============================================================================
 
+def _newsletter_response(created, was_active):
+    """JSON reply for a subscription attempt"""
+    if created:
+        return JsonResponse({
+            'success': True, 
+            'message': 'Thank you for subscribing to our newsletter!'
+        })
+    if was_active:
+        return JsonResponse({
+            'success': False, 
+            'message': 'You are already subscribed to our newsletter.'
+        })
+    return JsonResponse({
+        'success': True, 
+        'message': 'Welcome back! Your subscription has been reactivated.'
+    })
+
+
 @require_http_methods(["POST"])
+@ratelimit('newsletter', {'ip': '10/h', 'json:email': '3/h'})
 def newsletter_subscribe(request):
     """AJAX endpoint for newsletter subscription"""
     try:
         data = json.loads(request.body)
         email = data.get('email')
-        name = data.get('name', '')
         
         if not email:
             return JsonResponse({'success': False, 'message': 'Email is required'})
         
         newsletter, created = Newsletter.objects.get_or_create(
             email=email,
-            defaults={'name': name}
+            defaults={'name': data.get('name', '')}
         )
+        was_active = newsletter.is_active
+        if not created and not was_active:
+            newsletter.is_active = True
+            newsletter.save()
         
-        if created:
-            return JsonResponse({
-                'success': True, 
-                'message': 'Thank you for subscribing to our newsletter!'
-            })
-        else:
-            if newsletter.is_active:
-                return JsonResponse({
-                    'success': False, 
-                    'message': 'You are already subscribed to our newsletter.'
-                })
-            else:
-                newsletter.is_active = True
-                newsletter.save()
-                return JsonResponse({
-                    'success': True, 
-                    'message': 'Welcome back! Your subscription has been reactivated.'
-                })
+        return _newsletter_response(created, was_active)
                 
     except json.JSONDecodeError:
         return JsonResponse({'success': False, 'message': 'Invalid data format'})
@@ -314,48 +368,117 @@ def newsletter_subscribe(request):
         return JsonResponse({'success': False, 'message': 'An error occurred. Please try again.'})
 
 
-@require_http_methods(["GET"])
-def estimate_cost(request):
-    """AJAX endpoint to provide cost estimates based on project type"""
-    website_type = request.GET.get('type')
-    features = request.GET.getlist('features[]')
-    
-    # Base costs for different website types
-    base_costs = {
-        'business': 1200,
-        'ecommerce': 2500,
-        'portfolio': 800,
-        'blog': 600,
-        'landing': 500,
-        'web_app': 3500,
-        'custom': 2000,
-    }
-    
-    # Additional feature costs
-    feature_costs = {
-        'cms': 300,
-        'ecommerce': 800,
-        'booking': 500,
-        'payment': 400,
-        'membership': 600,
-        'api': 800,
-        'mobile_app': 1500,
-        'seo': 200,
-        'analytics': 150,
-        'social': 100,
-    }
+@require_http_methods(["POST"])
+@ratelimit('newsletter', {'ip': '10/h', 'json:email': '3/h'})
+async def anewsletter_subscribe(request):
+    """Async version of newsletter_subscribe (ASGI deployment)"""
+    try:
+        data = json.loads(request.body)
+        email = data.get('email')
+        
+        if not email:
+            return JsonResponse({'success': False, 'message': 'Email is required'})
+        
+        newsletter, created = await Newsletter.objects.aget_or_create(
+            email=email,
+            defaults={'name': data.get('name', '')}
+        )
+        was_active = newsletter.is_active
+        if not created and not was_active:
+            newsletter.is_active = True
+            await newsletter.asave()
+        
+        return _newsletter_response(created, was_active)
+                
+    except json.JSONDecodeError:
+        return JsonResponse({'success': False, 'message': 'Invalid data format'})
+    except Exception as e:
+        logger.error(f"Newsletter subscription error: {e}")
+        return JsonResponse({'success': False, 'message': 'An error occurred. Please try again.'})
+
+
+def _pricing_cache_control(request, response, version):
+    """
+    Long-lived, shareable caching for URLs pinned to the current pricing
+    version (?v=<version>); a short lifetime plus ETag revalidation otherwise
+    """
+    if request.GET.get('v') == version:
+        patch_cache_control(
+            response, public=True, immutable=True,
+            max_age=getattr(settings, 'ESTIMATE_CACHE_MAX_AGE', 60 * 60 * 24 * 365),
+        )
+    else:
+        patch_cache_control(response, public=True, max_age=300)
+    return response
+
+
+def _estimate_response(request, table, build):
+    """
+    build(request, table) as a conditional response: the ETag is the pricing
+    version, so a revalidation is answered with a 304 without building it
+    """
+    etag = quote_etag(table.version)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = build(request, table)
+    response['ETag'] = etag
+    return _pricing_cache_control(request, response, table.version)
+
+
+def _estimate(request, table):
+    # Precomputed lookup (users.pricing)
+    data = table.estimate(request.GET.get('type'), request.GET.getlist('features[]'))
+    data['pricing_version'] = table.version
+    return JsonResponse(data)
+
+
+def _estimate_batch(request, table):
+    combos = request.GET.getlist('combo')
+    limit = getattr(settings, 'ESTIMATE_BATCH_LIMIT', 50)
     
-    base_cost = base_costs.get(website_type, 1000)
-    additional_cost = sum(feature_costs.get(feature, 0) for feature in features)
+    if not combos:
+        return JsonResponse({'success': False, 'message': 'At least one combo is required'}, status=400)
+    if len(combos) > limit:
+        return JsonResponse({'success': False, 'message': f'At most {limit} combos per request'}, status=400)
     
-    total_estimate = base_cost + additional_cost
+    estimates = []
+    for combo in combos:
+        website_type, _, features = combo.partition(':')
+        features = [name for name in features.split(',') if name]
+        estimates.append({
+            'type': website_type,
+            'features': features,
+            **table.estimate(website_type, features),
+        })
     
-    return JsonResponse({
-        'base_cost': base_cost,
-        'additional_cost': additional_cost,
-        'total_estimate': total_estimate,
-        'formatted_estimate': f"${total_estimate:,}"
-    })
+    return JsonResponse({'pricing_version': table.version, 'estimates': estimates})
+
+
+@require_http_methods(["GET"])
+def estimate_cost(request):
+    """AJAX endpoint to provide cost estimates based on project type"""
+    return _estimate_response(request, get_pricing_table(), _estimate)
+
+
+@require_http_methods(["GET"])
+async def aestimate_cost(request):
+    """Async version of estimate_cost (ASGI deployment)"""
+    return _estimate_response(request, await aget_pricing_table(), _estimate)
+
+
+@require_http_methods(["GET"])
+def estimate_cost_batch(request):
+    """
+    Cost estimates for many combinations in one call:
+        ?combo=business:cms,seo&combo=blog&combo=web_app:api
+    """
+    return _estimate_response(request, get_pricing_table(), _estimate_batch)
+
+
+@require_http_methods(["GET"])
+async def aestimate_cost_batch(request):
+    """Async version of estimate_cost_batch (ASGI deployment)"""
+    return _estimate_response(request, await aget_pricing_table(), _estimate_batch)
 
 
 # ============================================================================
@@ -377,3 +500,34 @@ def robots_txt(request):
     return HttpResponse("\n".join(lines), content_type="text/plain")
 
 
+# ============================================================================
+# EMAIL PREVIEWS (development, see users/urls.py)
+# ============================================================================
+
+def _email_preview(request, name, context):
+    """The email `name` exactly as users.emails sends it; ?format=text for the plain part"""
+    text, html = render_email(name, context)
+    if request.GET.get('format') == 'text':
+        return HttpResponse(text, content_type='text/plain; charset=utf-8')
+    return HttpResponse(html)
+
+
+def preview_welcome_email(request):
+    """Welcome email for the logged-in user (or a sample user)"""
+    user = request.user if request.user.is_authenticated else User(
+        username='johndoe', first_name='John', last_name='Doe', email='john@example.com'
+    )
+    return _email_preview(request, 'welcome_email', {'user': user})
+
+
+def preview_quote_email(request):
+    """Quote confirmation email for a sample quote"""
+    quote = WebsiteQuote(
+        full_name='John Doe',
+        email='john@example.com',
+        website_type='business',
+        project_description='A professional business website',
+        budget_range='1000-2500',
+        timeline='1_month',
+    )
+    return _email_preview(request, 'quote_confirmation', {'quote': quote, 'estimated_timeline': '2-4 weeks'})
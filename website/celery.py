@@ -11,7 +11,7 @@ Author: Isaac
 import os
 from celery import Celery
 from django.conf import settings
-from celery.signals import setup_logging
+from celery.signals import setup_logging, worker_process_init
 import logging
 
 # Set the default Django settings module for the 'celery' program.
@@ -37,17 +37,29 @@ def config_loggers(*args, **kwargs):
     if hasattr(settings, 'LOGGING'):
         dictConfig(settings.LOGGING)
 
+# Keep compiled email templates warm in every worker process
+@worker_process_init.connect
+def warm_email_templates(*args, **kwargs):
+    """Compile email templates and pre-render their static shells"""
+    from users.emails import warm_email_templates as warm
+    warm()
+
 # Celery worker optimization
 app.conf.update(
     # Task routing
     task_routes={
         'users.tasks.send_welcome_email': {'queue': 'email'},
         'users.tasks.send_quote_email': {'queue': 'email'},
+        'users.tasks.send_quote_digest': {'queue': 'email'},
         'users.tasks.send_newsletter_email': {'queue': 'email'},
+        'users.tasks.send_newsletter_chunk': {'queue': 'email'},
+        'users.tasks.report_newsletter_results': {'queue': 'email'},
         'users.tasks.cleanup_expired_sessions': {'queue': 'maintenance'},
         'users.tasks.analyze_user_activity_patterns': {'queue': 'analytics'},
         'users.tasks.generate_weekly_analytics': {'queue': 'analytics'},
+        'users.tasks.rebuild_quote_stats': {'queue': 'analytics'},
         'users.tasks.database_maintenance': {'queue': 'maintenance'},
+        'users.tasks.backfill_quote_users': {'queue': 'maintenance'},
     },
     
     # Task priorities
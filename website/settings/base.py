@@ -67,13 +67,13 @@ MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # For static files in production
+    'pages.middleware.MaintenanceMiddleware',  # Before sessions/auth so maintenance costs ~nothing
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'pages.middleware.MaintenanceMiddleware',
     'django_htmx.middleware.HtmxMiddleware',
     'django.middleware.locale.LocaleMiddleware',
 ]
@@ -210,6 +210,36 @@ ONEHUX_COLORS = {
     'INFO': '#3b82f6',  # Light Blue
 }
 
+# Cost estimator pricing (users.pricing). Any change gets a new pricing
+# version, which invalidates browser/nginx copies of cached estimates.
+# `manage.py pricing publish` overrides it at runtime; workers check for
+# published pricing every PRICING_CHECK_INTERVAL seconds.
+PRICING_CHECK_INTERVAL = env.int('PRICING_CHECK_INTERVAL', default=30)
+QUOTE_PRICING = {
+    'DEFAULT_BASE_COST': 1000,
+    'BASE_COSTS': {
+        'business': 1200,
+        'ecommerce': 2500,
+        'portfolio': 800,
+        'blog': 600,
+        'landing': 500,
+        'web_app': 3500,
+        'custom': 2000,
+    },
+    'FEATURE_COSTS': {
+        'cms': 300,
+        'ecommerce': 800,
+        'booking': 500,
+        'payment': 400,
+        'membership': 600,
+        'api': 800,
+        'mobile_app': 1500,
+        'seo': 200,
+        'analytics': 150,
+        'social': 100,
+    },
+}
+
 # ============================================================================
 # REDIS CONFIGURATION
 # ============================================================================
@@ -285,6 +315,66 @@ CACHES = {
     }
 }
 
+# Full-page cache for anonymous visitors (pages.cache)
+PAGE_CACHE_ENABLED = env.bool('PAGE_CACHE_ENABLED', default=True)
+PAGE_CACHE_TIMEOUT = env.int('PAGE_CACHE_TIMEOUT', default=60 * 15)
+PAGE_CACHE_VERSION = env.str('PAGE_CACHE_VERSION', default='1')
+# Query parameters that change a cached page (kept in the key); tracking
+# parameters below (and utm_*) are ignored, anything else bypasses the cache
+PAGE_CACHE_QUERY_PARAMS = env.list('PAGE_CACHE_QUERY_PARAMS', default=[])
+PAGE_CACHE_IGNORED_PARAMS = ['fbclid', 'gclid', 'msclkid', 'mc_cid', 'mc_eid', 'ref']
+
+# Precomputed XML sitemaps (pages.sitemaps): URLs per child sitemap and
+# cache lifetime (rebuilt on deploy by `manage.py build_sitemaps`)
+SITEMAP_PAGE_SIZE = env.int('SITEMAP_PAGE_SIZE', default=5000)
+SITEMAP_CACHE_TIMEOUT = env.int('SITEMAP_CACHE_TIMEOUT', default=60 * 60 * 24)
+# Date each static page's content last changed (sitemap <lastmod>, ISO
+# dates). Bump a page's date when its content changes; every page in the
+# static sitemap must be listed or `build_sitemaps` fails.
+SITEMAP_LASTMOD = {
+    'pages:home': '2026-10-18',
+    'pages:about': '2026-10-18',
+    'pages:services': '2026-10-18',
+    'pages:contact': '2026-10-18',
+    'pages:faq': '2026-10-18',
+    'pages:privacy': '2026-10-18',
+    'pages:terms': '2026-10-18',
+    'users:quote_request': '2026-10-18',
+    'users:register': '2026-10-18',
+    'users:login': '2026-10-18',
+}
+
+# Daily analytics counters kept in Redis (users.analytics)
+ANALYTICS_RETENTION_DAYS = env.int('ANALYTICS_RETENTION_DAYS', default=35)
+
+# Admin changelist counts (users.pagination.EstimatedCountPaginator)
+ADMIN_COUNT_ESTIMATE_THRESHOLD = env.int('ADMIN_COUNT_ESTIMATE_THRESHOLD', default=10000)
+ADMIN_COUNT_TIMEOUT_MS = env.int('ADMIN_COUNT_TIMEOUT_MS', default=200)
+
+# Admin home dashboard widget (users.admin.admin_dashboard_stats)
+DASHBOARD_STATS_TIMEOUT = env.int('DASHBOARD_STATS_TIMEOUT', default=60 * 5)
+DASHBOARD_STATS_REFRESH = env.int('DASHBOARD_STATS_REFRESH', default=30)
+
+# Cost estimate responses (users.views.estimate_cost / estimate_cost_batch):
+# lifetime when the request carries the current pricing version, and max
+# number of combinations per batch request
+ESTIMATE_CACHE_MAX_AGE = env.int('ESTIMATE_CACHE_MAX_AGE', default=60 * 60 * 24 * 365)
+ESTIMATE_BATCH_LIMIT = env.int('ESTIMATE_BATCH_LIMIT', default=50)
+
+# Serve the hot views as async views (pages.async_helpers.for_deployment).
+# Set by deploy/onehux-web-asgi.service; the gevent WSGI service keeps the
+# sync views, which avoid an async_to_sync hop per request.
+ASGI_DEPLOYMENT = env.bool('ASGI_DEPLOYMENT', default=False)
+
+# Per-user dashboard stats and recent quotes (users.dashboard)
+USER_DASHBOARD_CACHE_TIMEOUT = env.int('USER_DASHBOARD_CACHE_TIMEOUT', default=60 * 5)
+
+# Window in which a repeated dispatch of the same task/event is dropped (users.dispatch)
+TASK_DEDUP_TTL = env.int('TASK_DEDUP_TTL', default=60 * 60)
+
+# Items per Celery chunk for bulk dispatches (users.dispatch.enqueue_chunked)
+TASK_CHUNK_SIZE = env.int('TASK_CHUNK_SIZE', default=50)
+
 # Session Configuration
 SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
 SESSION_CACHE_ALIAS = 'sessions'
@@ -300,10 +390,16 @@ MANAGERS = ADMINS
 MAINTENANCE_MODE = env.bool("MAINTENANCE_MODE", default=False)
 ALLOWED_IP_TO_ADMIN_PAGE = env.list("ALLOWED_IP_TO_ADMIN_PAGE", default=[])
 ALLOWED_IP_DURING_SITE_MAINTENANCE = env.list("ALLOWED_IP_DURING_SITE_MAINTENANCE", default=[])
+MAINTENANCE_FLAG_CHECK_INTERVAL = env.int("MAINTENANCE_FLAG_CHECK_INTERVAL", default=5)  # seconds
+MAINTENANCE_RETRY_AFTER = env.int("MAINTENANCE_RETRY_AFTER", default=3600)  # seconds
 
 # Rate limiting
 RATELIMIT_ENABLE = env.bool('RATELIMIT_ENABLE', default=True)
 RATELIMIT_USE_CACHE = 'default'
+# Per-rule overrides for pages.ratelimit, e.g. {'quote_request:ip': '20/h'}
+RATELIMIT_RATES = {}
+# Clients never rate limited (IPs or CIDR ranges), e.g. the staging load-test host
+RATELIMIT_EXEMPT_IPS = env.list('RATELIMIT_EXEMPT_IPS', default=[])
 
 # Base logging configuration
 LOG_DIR = os.path.join(BASE_DIR, 'logs')
@@ -366,6 +462,17 @@ EMAIL_HOST_PASSWORD = env.str('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = env.str('DEFAULT_FROM_EMAIL', default='support@onehux.com')
 SERVER_EMAIL = env.str('SERVER_EMAIL', default='support@onehux.com')
 
+# Recipients per newsletter subtask / SMTP connection (users.tasks.send_newsletter_email)
+NEWSLETTER_CHUNK_SIZE = env.int('NEWSLETTER_CHUNK_SIZE', default=200)
+
+# How long rendered quote emails are kept for retries/resends (users.emails)
+EMAIL_RENDER_CACHE_TIMEOUT = env.int('EMAIL_RENDER_CACHE_TIMEOUT', default=60 * 60)
+
+# Coalesce admin quote notifications into one email per interval (users.digest)
+QUOTE_DIGEST_ENABLED = env.bool('QUOTE_DIGEST_ENABLED', default=False)
+QUOTE_DIGEST_INTERVAL_MINUTES = env.int('QUOTE_DIGEST_INTERVAL_MINUTES', default=15)
+QUOTE_DIGEST_IMMEDIATE_BUDGETS = env.list('QUOTE_DIGEST_IMMEDIATE_BUDGETS', default=['10000+'])
+
 # ============================================================================
 # SEO AND METADATA CONFIGURATION
 # ============================================================================
@@ -379,6 +486,11 @@ SITE_META = {
     'twitter_site': '@onehuxweb',
 }
 
+# Count which lazy site_context keys (features, testimonials, common_faqs)
+# each view actually renders (pages.context_processors). Only collected when
+# DEBUG is on; set to False to switch it off there too.
+SITE_CONTEXT_USAGE_TRACKING = env.bool('SITE_CONTEXT_USAGE_TRACKING', default=True)
+
 # ============================================================================
 # SECURITY SETTINGS (Base)
 # ============================================================================
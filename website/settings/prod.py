@@ -3,7 +3,7 @@
 Production Django settings for Onehux Web Service
 ===============================================
 Production-specific settings that inherit from base.py
-Optimized for production deployment with nginx/gunicorn.
+Optimized for production deployment with nginx/gunicorn (WSGI or ASGI).
 
 Author: Isaac
 """
@@ -43,6 +43,12 @@ DATABASES['default'].update({
     'MAX_CONNS': 20,
 })
 
+# ASGI deployment (deploy/onehux-web-asgi.service): the async ORM runs queries
+# in sync_to_async threads, where persistent connections are not cleaned up
+# at the end of a request, so open one per request instead
+if ASGI_DEPLOYMENT:
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+
 # ============================================================================
 # PRODUCTION SECURITY SETTINGS (MAXIMUM SECURITY)
 # ============================================================================
@@ -125,6 +131,17 @@ if CELERY_BEAT_ENABLED:
             'task': 'users.tasks.worker_health_check',
             'schedule': crontab(hour=6, minute=0),
         },
+        # Homepage quote counters reconciliation - Daily at 4 AM
+        f'{SITE_NAME}_rebuild_quote_stats': {
+            'task': 'users.tasks.rebuild_quote_stats',
+            'schedule': crontab(hour=4, minute=0),
+        },
+        # Admin quote digest - Every QUOTE_DIGEST_INTERVAL_MINUTES (no-op when empty);
+        # an interval, so values that don't divide an hour (or exceed it) work too
+        f'{SITE_NAME}_send_quote_digest': {
+            'task': 'users.tasks.send_quote_digest',
+            'schedule': timedelta(minutes=QUOTE_DIGEST_INTERVAL_MINUTES),
+        },
         # Database maintenance - Every Sunday at 3 AM
         f'{SITE_NAME}_database_maintenance': {
             'task': 'users.tasks.database_maintenance',
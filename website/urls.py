@@ -14,24 +14,27 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from django.contrib.sitemaps.views import sitemap
 from django.views.generic import TemplateView
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse
 import os
 
-# Import sitemaps
-from pages.sitemaps import StaticViewSitemap, PagesSitemap
-
-# Sitemap configuration
-sitemaps = {
-    'static': StaticViewSitemap,
-    'pages': PagesSitemap,
-}
+from pages.context_processors import get_context_usage
+from pages.views import ratelimit_stats, sitemap_index, sitemap_section
+from users.admin import dashboard_stats_widget
 
 urlpatterns = [
     # ========================================================================
     # ADMIN URLS
     # ========================================================================
+    # Admin dashboard widget (HTMX partial, staff only); before admin.site.urls
+    path(settings.ADMIN_LOGIN_PATH.strip('/') + '/dashboard-stats/',
+         admin.site.admin_view(dashboard_stats_widget),
+         name='admin_dashboard_stats'),
+    # Rate limiter counters (JSON, staff only)
+    path(settings.ADMIN_LOGIN_PATH.strip('/') + '/ratelimit-stats/',
+         admin.site.admin_view(ratelimit_stats),
+         name='admin_ratelimit_stats'),
+    
     path(settings.ADMIN_LOGIN_PATH.strip('/') + '/', admin.site.urls),
     
     # ========================================================================
@@ -48,9 +51,9 @@ urlpatterns = [
     # SEO AND UTILITY URLS
     # ========================================================================
     
-    # Sitemap
-    path('sitemap.xml', sitemap, {'sitemaps': sitemaps},
-         name='django.contrib.sitemaps.views.sitemap'),
+    # Sitemap index + paginated child sitemaps (sections in pages.sitemaps.SITEMAPS)
+    path('sitemap.xml', sitemap_index, name='sitemap_index'),
+    path('sitemap-<slug:section>.xml', sitemap_section, name='sitemap_section'),
     
     # Robots.txt (handled by users.views.robots_txt)
     path('robots.txt', include('users.urls')),
@@ -145,6 +148,10 @@ if settings.DEBUG:
         # 404 error page test  
         path('dev/test/404/', 
              lambda request: HttpResponse(status=404)),
+        
+        # Which lazy site_context keys each view actually uses
+        path('dev/context-usage/',
+             lambda request: JsonResponse(get_context_usage())),
     ]
 
 # ============================================================================